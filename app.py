@@ -2,6 +2,7 @@ import streamlit as st
 import requests
 from datetime import datetime
 import time
+import importlib
 
 # Helper functions
 from pages.utils import *
@@ -48,18 +49,21 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Import pages
-from pages.dashboard_overview import show_dashboard_overview
-from pages.trading_pairs import show_trading_pairs
-from pages.ai_tokens import show_ai_tokens
-from pages.market_trends import show_market_trends
-from pages.trade_signals import show_trade_signals
+# Pages: label -> (module, render function). Only the selected page's module
+# (and the plotting libraries it uses) is imported on each run.
+PAGES = {
+    "Dashboard Overview": ("pages.dashboard_overview", "show_dashboard_overview"),
+    "Grid Trading Pairs": ("pages.trading_pairs", "show_trading_pairs"),
+    "AI Tokens": ("pages.ai_tokens", "show_ai_tokens"),
+    "Market Trends": ("pages.market_trends", "show_market_trends"),
+    "Trade Signals": ("pages.trade_signals", "show_trade_signals"),
+}
 
 # Sidebar for navigation
 st.sidebar.title("Navigation")
 page = st.sidebar.radio(
     "Select Page",
-    ["Dashboard Overview", "Grid Trading Pairs", "AI Tokens", "Market Trends", "Trade Signals"]
+    list(PAGES)
 )
 
 # Auto-refresh data
@@ -80,16 +84,9 @@ if st.sidebar.checkbox("Auto-refresh data", value=True):
         refresh_placeholder.text(f"Last refresh: {last_refresh.strftime('%H:%M:%S')}")
 
 # Main content based on selected page
-if page == "Dashboard Overview":
-    show_dashboard_overview(API_BASE_URL, CACHE_DURATION)
-elif page == "Grid Trading Pairs":
-    show_trading_pairs(API_BASE_URL, CACHE_DURATION)
-elif page == "AI Tokens":
-    show_ai_tokens(API_BASE_URL, CACHE_DURATION)
-elif page == "Market Trends":
-    show_market_trends(API_BASE_URL, CACHE_DURATION)
-elif page == "Trade Signals":
-    show_trade_signals(API_BASE_URL, CACHE_DURATION)
+module_name, function_name = PAGES[page]
+show_page = getattr(importlib.import_module(module_name), function_name)
+show_page(API_BASE_URL, CACHE_DURATION)
 
 # Footer
 st.sidebar.markdown("---")
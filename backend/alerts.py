@@ -0,0 +1,253 @@
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+import aiohttp
+from collections import deque
+from urllib.parse import urlparse
+from typing import List, Dict, Any, Optional, AsyncIterator, Callable, Awaitable
+import data_fetcher
+import candle_store
+import trading_logic
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Watch lists are stored server-side and survive restarts
+WATCHLIST_FILE = os.environ.get("WATCHLIST_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "watchlists.json"))
+
+ALERT_INTERVALS = ("15m", "1h", "4h", "1d")
+ALERT_CLOSE_GRACE_MS = 3000  # wait for Binance to publish the closed candle
+ALERT_HISTORY = 100  # recent alerts kept per watch list
+SUBSCRIBER_QUEUE_SIZE = 100
+SSE_KEEPALIVE = 15  # seconds between keep-alive comments on idle streams
+WEBHOOK_TIMEOUT = 5  # seconds
+MAX_WATCHLIST_SYMBOLS = 1000
+
+# Webhooks may only target the local machine
+LOCAL_WEBHOOK_HOSTS = {"localhost", "127.0.0.1", "::1"}
+_WATCHLIST_NAME = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+_watchlists: Dict[str, Dict[str, Any]] = {}  # name -> {'symbols', 'interval', 'webhook', 'updated_at'}
+_watchers: Dict[str, Dict[str, set]] = {}    # interval -> symbol -> names of the watch lists holding it
+_last_signal: Dict[tuple, int] = {}          # (symbol, interval) -> signal at the last candle close
+_recent: Dict[str, deque] = {}               # name -> recent alerts
+_subscribers: Dict[str, set] = {}            # name -> queues of connected streams
+_changed = asyncio.Event()                   # wakes the alert loop when watch lists change
+
+def _index_watchlist(name: str, entry: Dict[str, Any]):
+    watchers = _watchers.setdefault(entry['interval'], {})
+    for symbol in entry['symbols']:
+        watchers.setdefault(symbol, set()).add(name)
+
+def _unindex_watchlist(name: str, entry: Dict[str, Any]):
+    watchers = _watchers.get(entry['interval'], {})
+    for symbol in entry['symbols']:
+        names = watchers.get(symbol)
+        if names is None:
+            continue
+        names.discard(name)
+        if not names:
+            del watchers[symbol]
+            _last_signal.pop((symbol, entry['interval']), None)
+
+def load_watchlists():
+    """Load the persisted watch lists and rebuild the symbol index"""
+    try:
+        with open(WATCHLIST_FILE) as f:
+            stored = json.load(f)
+    except FileNotFoundError:
+        return
+    except Exception as e:
+        logger.error(f"Error loading watch lists from {WATCHLIST_FILE}: {str(e)}")
+        return
+    for name, entry in stored.items():
+        _watchlists[name] = entry
+        _index_watchlist(name, entry)
+    _changed.set()
+
+def _write_watchlists(data: Dict[str, Any]):
+    """Atomically replace the watch list file"""
+    tmp_path = f"{WATCHLIST_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, WATCHLIST_FILE)
+
+async def _save_watchlists():
+    try:
+        await asyncio.to_thread(_write_watchlists, dict(_watchlists))
+    except Exception as e:
+        logger.error(f"Error saving watch lists to {WATCHLIST_FILE}: {str(e)}")
+
+def _check_webhook(webhook: Optional[str]):
+    if webhook is None:
+        return
+    parsed = urlparse(webhook)
+    if parsed.scheme not in ("http", "https") or parsed.hostname not in LOCAL_WEBHOOK_HOSTS:
+        raise ValueError(f"Webhooks must be http(s) URLs on {', '.join(sorted(LOCAL_WEBHOOK_HOSTS))}")
+
+async def put_watchlist(name: str, symbols: List[str], interval: str = "1h", webhook: Optional[str] = None) -> Dict[str, Any]:
+    """Create or replace a watch list"""
+    if not _WATCHLIST_NAME.match(name):
+        raise ValueError("Watch list names may only contain letters, digits, '-' and '_' (max 64)")
+    if interval not in ALERT_INTERVALS:
+        raise ValueError(f"Unsupported interval '{interval}', expected one of {', '.join(ALERT_INTERVALS)}")
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+    if len(symbols) > MAX_WATCHLIST_SYMBOLS:
+        raise ValueError(f"A watch list holds at most {MAX_WATCHLIST_SYMBOLS} symbols")
+    _check_webhook(webhook)
+
+    if name in _watchlists:
+        _unindex_watchlist(name, _watchlists[name])
+    entry = {'symbols': symbols, 'interval': interval, 'webhook': webhook, 'updated_at': time.time()}
+    _watchlists[name] = entry
+    _index_watchlist(name, entry)
+    await _save_watchlists()
+    _changed.set()
+    return entry
+
+def get_watchlist(name: str) -> Optional[Dict[str, Any]]:
+    return _watchlists.get(name)
+
+async def delete_watchlist(name: str) -> bool:
+    entry = _watchlists.pop(name, None)
+    if entry is None:
+        return False
+    _unindex_watchlist(name, entry)
+    _recent.pop(name, None)
+    await _save_watchlists()
+    return True
+
+def recent_alerts(name: str, limit: int = ALERT_HISTORY) -> List[Dict[str, Any]]:
+    """Most recent alerts of a watch list, newest first"""
+    return list(_recent.get(name, ()))[::-1][:limit]
+
+def subscribe(name: str) -> asyncio.Queue:
+    queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+    _subscribers.setdefault(name, set()).add(queue)
+    return queue
+
+def unsubscribe(name: str, queue: asyncio.Queue):
+    queues = _subscribers.get(name)
+    if queues is not None:
+        queues.discard(queue)
+        if not queues:
+            del _subscribers[name]
+
+async def alert_events(name: str, is_disconnected: Callable[[], Awaitable[bool]]) -> AsyncIterator[str]:
+    """Server-sent events for the alerts of a watch list, until the client disconnects"""
+    queue = subscribe(name)
+    try:
+        while not await is_disconnected():
+            try:
+                alert = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE)
+                yield f"event: alert\ndata: {json.dumps(alert)}\n\n"
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+    finally:
+        unsubscribe(name, queue)
+
+async def _post_webhook(session: aiohttp.ClientSession, url: str, payload: Dict[str, Any]):
+    try:
+        async with session.post(url, json=payload) as response:
+            if response.status >= 400:
+                logger.error(f"Webhook {url} returned status {response.status}")
+    except Exception as e:
+        logger.error(f"Error calling webhook {url}: {str(e)}")
+
+async def _dispatch(alerts_by_list: Dict[str, List[Dict[str, Any]]]):
+    """Fan alerts out to recent history, connected streams and webhooks"""
+    webhooks = []
+    for name, alerts in alerts_by_list.items():
+        _recent.setdefault(name, deque(maxlen=ALERT_HISTORY)).extend(alerts)
+        for queue in _subscribers.get(name, ()):
+            for alert in alerts:
+                try:
+                    queue.put_nowait(alert)
+                except asyncio.QueueFull:
+                    logger.error(f"Dropping alert for a slow subscriber of watch list {name}")
+        webhook = _watchlists.get(name, {}).get('webhook')
+        if webhook:
+            webhooks.append((webhook, {'watchlist': name, 'alerts': alerts}))
+
+    if webhooks:
+        timeout = aiohttp.ClientTimeout(total=WEBHOOK_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            await asyncio.gather(*[_post_webhook(session, url, payload) for url, payload in webhooks])
+
+async def evaluate_interval(interval: str, symbols: Optional[List[str]] = None) -> int:
+    """
+    Re-evaluate the watched symbols of an interval (all by default) on their
+    latest closed candle and alert the watch lists of symbols whose signal
+    changed. Each symbol is evaluated once, however many lists watch it.
+    Returns the number of alerts raised.
+    """
+    watchers = _watchers.get(interval, {})
+    symbols = list(watchers) if symbols is None else symbols
+    if not symbols:
+        return 0
+
+    klines = await candle_store.get_candles(symbols, interval, trading_logic.MTF_CANDLES)
+    evaluated, arrays = data_fetcher.stack_kline_fields(klines, ('close', 'volume'))
+    if not evaluated or arrays['close'].shape[1] < trading_logic.SLOW_MA_WINDOW:
+        return 0
+    latest = trading_logic.evaluate_latest(arrays['close'], arrays['volume'])
+
+    alerts_by_list: Dict[str, List[Dict[str, Any]]] = {}
+    for i, symbol in enumerate(evaluated):
+        if not latest['valid'][i]:
+            continue
+        signal = int(latest['signal'][i])
+        previous = _last_signal.get((symbol, interval))
+        _last_signal[(symbol, interval)] = signal
+        # The first evaluation only sets the baseline
+        if previous is None or previous == signal:
+            continue
+        alert = {
+            'symbol': symbol,
+            'interval': interval,
+            'signal': trading_logic.SIGNAL_LABELS[signal],
+            'previous_signal': trading_logic.SIGNAL_LABELS[previous],
+            'confidence': round(float(latest['confidence'][i]), 2),
+            'price': float(latest['current_price'][i]),
+            'candle_open_time': int(klines[symbol]['open_time'][-1]),
+            'timestamp': time.time()
+        }
+        for name in watchers.get(symbol, ()):
+            alerts_by_list.setdefault(name, []).append(alert)
+
+    await _dispatch(alerts_by_list)
+    return sum(len(alerts) for alerts in alerts_by_list.values())
+
+async def run_alert_loop():
+    """Evaluate each watched interval right after each of its candle closes"""
+    due: Dict[str, int] = {}
+    while True:
+        changed = _changed.is_set()
+        _changed.clear()
+        now_ms = int(time.time() * 1000)
+        for interval in ALERT_INTERVALS:
+            watchers = _watchers.get(interval)
+            if not watchers:
+                due.pop(interval, None)
+                continue
+            try:
+                if due.get(interval, 0) <= now_ms:
+                    await evaluate_interval(interval)
+                    due[interval] = candle_store.next_close_ms(interval, now_ms) + ALERT_CLOSE_GRACE_MS
+                elif changed:
+                    # Newly watched symbols get their baseline without waiting for the next close
+                    new_symbols = [s for s in watchers if (s, interval) not in _last_signal]
+                    if new_symbols:
+                        await evaluate_interval(interval, new_symbols)
+            except Exception as e:
+                logger.error(f"Error evaluating {interval} alerts: {str(e)}")
+
+        wait_ms = min(due.values(), default=now_ms + 60_000) - int(time.time() * 1000)
+        try:
+            await asyncio.wait_for(_changed.wait(), timeout=max(wait_ms, 0) / 1000)
+        except asyncio.TimeoutError:
+            pass
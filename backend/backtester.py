@@ -0,0 +1,167 @@
+import numpy as np
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional
+import data_fetcher
+import trading_logic
+import ranking
+import indicators
+import workers
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Backtest configuration
+DEFAULT_FEE_RATE = 0.001  # 0.1% per side, Binance spot taker fee
+MIN_SYMBOLS_PER_WORKER = 16
+MIN_CANDLES = trading_logic.SLOW_MA_WINDOW + 1  # no signal before the slow moving average is defined
+MAX_CANDLES = 5000  # five kline pages per symbol, about 7 months of 1h candles
+
+def compute_signals(close: np.ndarray, volume: np.ndarray):
+    """Evaluate the trade signal rules on every candle of a symbol x time array"""
+    sma_fast = indicators.sma(close, trading_logic.FAST_MA_WINDOW)
+    sma_slow = indicators.sma(close, trading_logic.SLOW_MA_WINDOW)
+
+    prev_volume = np.empty_like(volume)
+    prev_volume[..., 0] = np.nan
+    prev_volume[..., 1:] = volume[..., :-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_change = np.where(prev_volume > 0, (volume - prev_volume) / prev_volume * 100, 0.0)
+
+    signal, confidence = trading_logic.apply_signal_rules(close, sma_fast, sma_slow, volume_change)
+
+    # No signal until the slow moving average is defined
+    ready = ~np.isnan(sma_slow)
+    return np.where(ready, signal, 0), np.where(ready, confidence, np.nan)
+
+def simulate(
+    close: np.ndarray,
+    volume: np.ndarray,
+    fee_rate: float = DEFAULT_FEE_RATE,
+    allow_short: bool = False
+) -> Dict[str, np.ndarray]:
+    """
+    Replay the strategy over a symbol x time array of candles.
+
+    Positions are taken on the close of the signal candle, the first price
+    at which the signal is known (no look-ahead), and held until an opposite
+    signal. Returns per-symbol summary arrays.
+    """
+    close = np.atleast_2d(np.asarray(close, dtype=float))
+    volume = np.atleast_2d(np.asarray(volume, dtype=float))
+    signal, _ = compute_signals(close, volume)
+
+    # Forward-fill the last buy/sell signal into a target position
+    short_value = -1 if allow_short else 0
+    target = np.where(signal > 0, 1.0, np.where(signal < 0, short_value, np.nan))
+    time_idx = np.where(~np.isnan(target), np.arange(target.shape[1]), 0)
+    np.maximum.accumulate(time_idx, axis=1, out=time_idx)
+    position = np.take_along_axis(target, time_idx, axis=1)
+    position = np.nan_to_num(position)
+
+    # Filled on the signal candle's close, so the position earns from the next candle on
+    held = np.zeros_like(position)
+    held[:, 1:] = position[:, :-1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.zeros_like(close)
+        returns[:, 1:] = close[:, 1:] / close[:, :-1] - 1
+    returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+    turnover = np.abs(np.diff(held, axis=1, prepend=0.0))
+    strategy_returns = held * returns - turnover * fee_rate
+
+    equity = np.cumprod(1 + strategy_returns, axis=1)
+    drawdown = equity / np.maximum.accumulate(equity, axis=1) - 1
+
+    candles = np.sum(~np.isnan(close), axis=1)
+    return {
+        'total_return': equity[:, -1] - 1,
+        'max_drawdown': drawdown.min(axis=1),
+        'trades': np.count_nonzero(turnover, axis=1),
+        'exposure': np.count_nonzero(held, axis=1) / np.maximum(candles, 1),
+        'buy_and_hold_return': _buy_and_hold(close),
+        'candles': candles,
+    }
+
+def _buy_and_hold(close: np.ndarray) -> np.ndarray:
+    """Return from the first to the last valid close of each symbol"""
+    valid = ~np.isnan(close)
+    first_idx = np.argmax(valid, axis=1)
+    rows = np.arange(close.shape[0])
+    first = close[rows, first_idx]
+    last = close[:, -1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(valid.any(axis=1), last / first - 1, 0.0)
+
+def simulate_parallel(
+    close: np.ndarray,
+    volume: np.ndarray,
+    fee_rate: float = DEFAULT_FEE_RATE,
+    allow_short: bool = False,
+    max_workers: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """Run simulate() over chunks of symbols in the shared worker processes"""
+    n_symbols = close.shape[0]
+    chunks = max(1, min(max_workers or workers.cpu_count(), n_symbols // MIN_SYMBOLS_PER_WORKER))
+
+    if chunks == 1:
+        return simulate(close, volume, fee_rate, allow_short)
+
+    bounds = np.array_split(np.arange(n_symbols), chunks)
+    executor = workers.get_pool()
+    futures = [
+        executor.submit(simulate, close[idx], volume[idx], fee_rate, allow_short)
+        for idx in bounds
+    ]
+    parts = [f.result() for f in futures]
+
+    return {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+
+async def backtest_signals(
+    symbols: Optional[List[str]] = None,
+    interval: str = "1h",
+    candles: int = 1000,
+    fee_rate: float = DEFAULT_FEE_RATE,
+    allow_short: bool = False,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Backtest the trade signal strategy over recent klines for the given symbols
+    (defaults to all USDT pairs), returning the `limit` best by total return.
+    Histories longer than one kline page are fetched page by page.
+    """
+    try:
+        if not symbols:
+            tickers = await data_fetcher.get_binance_tickers()
+            symbols = [t.symbol for t in tickers if t.symbol.endswith('USDT')]
+
+        klines = await data_fetcher.get_binance_kline_history_batch(symbols, interval, candles)
+        symbols, close, volume = data_fetcher.stack_klines(klines)
+
+        if not symbols:
+            return []
+
+        loop = asyncio.get_running_loop()
+        summary = await loop.run_in_executor(
+            None, simulate_parallel, close, volume, fee_rate, allow_short
+        )
+
+        results = []
+        for i, symbol in enumerate(symbols):
+            results.append({
+                'symbol': symbol,
+                'candles': int(summary['candles'][i]),
+                'total_return_percent': round(float(summary['total_return'][i]) * 100, 2),
+                'buy_and_hold_percent': round(float(summary['buy_and_hold_return'][i]) * 100, 2),
+                'max_drawdown_percent': round(float(summary['max_drawdown'][i]) * 100, 2),
+                'trades': int(summary['trades'][i]),
+                'exposure_percent': round(float(summary['exposure'][i]) * 100, 2),
+            })
+
+        return ranking.top_k(results, limit or len(results), [('total_return_percent', True)])
+
+    except Exception as e:
+        logger.error(f"Error running backtest: {str(e)}")
+        return []
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import time
+import numpy as np
+from typing import List, Dict, Optional
+import data_fetcher
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Shared store of closed candles per (symbol, interval). Every consumer reads
+# from the same store, and a symbol is only refetched once a new candle of
+# that interval has closed, and then only for the candles it is missing.
+CANDLE_STORE_MAX = 500  # closed candles kept per symbol and interval
+
+_store = {}  # (symbol, interval) -> {'klines': candle array, 'checked': open time of the last closed candle}
+_interval_locks = {}
+
+def last_closed_open(interval: str, now_ms: Optional[int] = None) -> int:
+    """Open time of the most recently closed candle of an interval"""
+    step = data_fetcher.INTERVAL_MS[interval]
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    return (now_ms // step) * step - step
+
+def next_close_ms(interval: str, now_ms: Optional[int] = None) -> int:
+    """Time at which the currently forming candle of an interval closes"""
+    return last_closed_open(interval, now_ms) + 2 * data_fetcher.INTERVAL_MS[interval]
+
+def _missing_candles(entry: Optional[Dict], target: int, step: int, count: int) -> int:
+    """Number of candles to fetch to bring an entry up to `target` with `count` candles"""
+    if entry is None or len(entry['klines']) < count:
+        return count
+    missed = (target - int(entry['klines']['open_time'][-1])) // step
+    return min(count, max(missed, 0))
+
+async def _refresh(symbols: List[str], interval: str, count: int):
+    step = data_fetcher.INTERVAL_MS[interval]
+    target = last_closed_open(interval)
+
+    # Group symbols by how many candles they miss, one batch per group
+    groups: Dict[int, List[str]] = {}
+    for symbol in symbols:
+        entry = _store.get((symbol, interval))
+        if entry is not None and entry['checked'] == target and len(entry['klines']) >= count:
+            continue
+        missing = _missing_candles(entry, target, step, count)
+        if missing == 0:
+            # Up to date, but the symbol has no newer closed candle (e.g. halted)
+            entry['checked'] = target
+            continue
+        groups.setdefault(missing, []).append(symbol)
+
+    for missing, group in groups.items():
+        # One extra candle, since the forming candle is included in the response
+        fetched = await data_fetcher.get_binance_klines_batch(group, interval, missing + 1)
+        for symbol, klines in fetched.items():
+            closed = klines[klines['open_time'] <= target]
+            entry = _store.get((symbol, interval))
+            if entry is not None and missing < count:
+                last_open = entry['klines']['open_time'][-1]
+                closed = np.concatenate([entry['klines'], closed[closed['open_time'] > last_open]])
+            if not len(closed):
+                continue
+            # Only mark the symbol checked once the latest closed candle is published
+            _store[(symbol, interval)] = {
+                'klines': closed[-CANDLE_STORE_MAX:],
+                'checked': target if closed['open_time'][-1] == target else None
+            }
+
+async def get_candles(symbols: List[str], interval: str, count: int) -> Dict[str, np.ndarray]:
+    """
+    The last `count` closed candles of each symbol, as candle arrays.
+    Symbols without data are left out.
+    """
+    if interval not in data_fetcher.INTERVAL_MS:
+        raise ValueError(f"Unsupported interval '{interval}'")
+    count = min(count, CANDLE_STORE_MAX)
+
+    lock = _interval_locks.setdefault(interval, asyncio.Lock())
+    async with lock:
+        try:
+            await _refresh(symbols, interval, count)
+        except Exception as e:
+            logger.error(f"Error refreshing {interval} candles: {str(e)}")
+
+    result = {}
+    for symbol in symbols:
+        entry = _store.get((symbol, interval))
+        if entry is not None:
+            result[symbol] = entry['klines'][-count:]
+    return result
@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+import data_fetcher
+import ranking
+import upstream
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Sectors are unions of CoinGecko categories. Category membership comes from
+# /coins/markets?category=..., paged in market cap order through the throttled
+# markets stream, and rarely changes, so it is cached on disk for hours and
+# refreshed in the background.
+SECTOR_CATEGORIES = {
+    'AI & Data': ('artificial-intelligence', 'ai-agents'),
+    'DeFi': ('decentralized-finance-defi',),
+    'Gaming': ('gaming', 'metaverse'),
+    'Layer 1': ('layer-1',),
+    'Layer 2': ('layer-2',),
+    'Meme': ('meme-token',),
+    'Real World Assets': ('real-world-assets-rwa',),
+}
+CATEGORY_MAX_PAGES = 4  # largest 1000 coins per category
+CATEGORY_EXPIRY = 6 * 3600  # seconds
+CATEGORY_CACHE_FILE = os.environ.get("CATEGORY_CACHE_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "categories.json"))
+
+# Name keywords per sector, used only until category membership is available
+SECTOR_KEYWORDS = {
+    'AI & Data': ['ai', 'data', 'neural', 'intelligence', 'machine', 'predict', 'learn'],
+    'DeFi': ['defi', 'finance', 'yield', 'swap', 'lend', 'borrow', 'staking'],
+    'Gaming': ['game', 'play', 'nft', 'metaverse', 'virtual', 'realm'],
+    'Layer 1': ['layer', 'blockchain', 'consensus', 'scalable', 'protocol'],
+    'Layer 2': ['layer2', 'rollup', 'scaling', 'optimistic', 'zkrollup']
+}
+
+_index = {
+    'categories': {},  # category id -> {'coins': [coin ids], 'fetched_at': time}
+    # Inverted sector membership, one entry per (sector, coin): parallel arrays
+    'sector_codes': np.empty(0, dtype=int),
+    'coin_ids': np.empty(0, dtype=str)
+}
+_refresh_task: Optional[asyncio.Task] = None
+
+def _build_membership(categories: Dict[str, Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """(sector code, coin id) pairs; a coin in several categories of a sector counts once"""
+    codes, coin_ids = [], []
+    for code, category_ids in enumerate(SECTOR_CATEGORIES.values()):
+        members = dict.fromkeys(c for category in category_ids for c in categories.get(category, {}).get('coins', ()))
+        codes += [code] * len(members)
+        coin_ids += members
+    return np.array(codes, dtype=int), np.array(coin_ids, dtype=str)
+
+def _set_categories(categories: Dict[str, Dict[str, Any]]):
+    sector_codes, coin_ids = _build_membership(categories)
+    _index.update(categories=categories, sector_codes=sector_codes, coin_ids=coin_ids)
+
+def load_category_index():
+    """Seed the index from the on-disk cache; expired categories are refreshed on first use"""
+    try:
+        with open(CATEGORY_CACHE_FILE) as f:
+            _set_categories(json.load(f))
+    except FileNotFoundError:
+        return
+    except Exception as e:
+        logger.error(f"Error loading CoinGecko categories from {CATEGORY_CACHE_FILE}: {str(e)}")
+
+def _write_cache(categories: Dict[str, Dict[str, Any]]):
+    tmp_path = f"{CATEGORY_CACHE_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(categories, f)
+    os.replace(tmp_path, CATEGORY_CACHE_FILE)
+
+async def _fetch_category(category: str) -> Optional[List[str]]:
+    """Coin ids of a category, or None when CoinGecko could not be reached"""
+    coins = []
+    with upstream.track() as tracker:
+        async for page in data_fetcher.iter_coingecko_markets(max_pages=CATEGORY_MAX_PAGES, category=category):
+            coins += [coin['id'] for coin in page]
+    return None if tracker['failed'] else coins
+
+async def refresh_category_index():
+    """
+    Refetch the categories older than CATEGORY_EXPIRY, one at a time so the
+    CoinGecko throttle is shared with the rest of the backend. The cache is
+    written after each category, so an interrupted refresh keeps its progress.
+    """
+    categories = dict(_index['categories'])
+    for category in dict.fromkeys(c for ids in SECTOR_CATEGORIES.values() for c in ids):
+        if time.time() - categories.get(category, {}).get('fetched_at', 0) < CATEGORY_EXPIRY:
+            continue
+        coins = await _fetch_category(category)
+        if coins is None:
+            logger.warning(f"CoinGecko category {category} unavailable, keeping its previous members")
+            continue
+        categories[category] = {'coins': coins, 'fetched_at': time.time()}
+        _set_categories(categories)
+        try:
+            await asyncio.to_thread(_write_cache, categories)
+        except Exception as e:
+            logger.error(f"Error saving CoinGecko categories: {str(e)}")
+    logger.info(f"Category index refreshed: {len(_index['coin_ids'])} sector memberships")
+
+def get_category_index() -> Dict[str, Any]:
+    """
+    Return the category index as it is, starting a background refresh when
+    a category is missing or expired. Sector analysis never waits on it.
+    """
+    global _refresh_task
+    now = time.time()
+    expired = any(now - _index['categories'].get(c, {}).get('fetched_at', 0) >= CATEGORY_EXPIRY
+                  for ids in SECTOR_CATEGORIES.values() for c in ids)
+    if expired and (_refresh_task is None or _refresh_task.done()):
+        _refresh_task = asyncio.create_task(refresh_category_index())
+    return _index
+
+def _keyword_membership(names: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(sector code, coin row) pairs from name keywords"""
+    lowered = np.char.lower(names.astype(str))
+    codes, rows = [], []
+    for code, keywords in enumerate(SECTOR_KEYWORDS.values()):
+        matches = np.zeros(len(names), dtype=bool)
+        for keyword in keywords:
+            matches |= np.char.find(lowered, keyword) >= 0
+        matched = np.flatnonzero(matches)
+        codes.append(np.full(len(matched), code))
+        rows.append(matched)
+    return np.concatenate(codes), np.concatenate(rows)
+
+def _category_membership(index: Dict[str, Any], coin_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(sector code, coin row) pairs of the indexed members present in `coin_ids`"""
+    order = np.argsort(coin_ids)
+    sorted_ids = coin_ids[order]
+    positions = np.clip(np.searchsorted(sorted_ids, index['coin_ids']), 0, max(len(sorted_ids) - 1, 0))
+    found = sorted_ids[positions] == index['coin_ids'] if len(sorted_ids) else np.zeros(len(positions), dtype=bool)
+    return index['sector_codes'][found], order[positions[found]]
+
+def sector_performance(
+    coin_ids: np.ndarray,
+    names: np.ndarray,
+    changes: np.ndarray,
+    market_caps: np.ndarray
+) -> List[Dict[str, Any]]:
+    """
+    Average and market-cap-weighted 24h change per sector over a coin
+    universe, best first. Membership comes from the category index, or from
+    name keywords while the index is still empty.
+    """
+    index = get_category_index()
+    if len(index['coin_ids']):
+        sectors = list(SECTOR_CATEGORIES)
+        codes, rows = _category_membership(index, coin_ids)
+    else:
+        sectors = list(SECTOR_KEYWORDS)
+        codes, rows = _keyword_membership(names)
+
+    # Group-by sector over the (sector, coin) pairs
+    change = changes[rows]
+    valid = ~np.isnan(change)
+    codes, change, cap = codes[valid], change[valid], market_caps[rows][valid]
+    counts = np.bincount(codes, minlength=len(sectors))
+    change_sums = np.bincount(codes, weights=change, minlength=len(sectors))
+    cap_sums = np.bincount(codes, weights=cap, minlength=len(sectors))
+    weighted_sums = np.bincount(codes, weights=change * cap, minlength=len(sectors))
+
+    result = [{
+        'name': sector,
+        'avg_change': float(change_sums[code] / counts[code]),
+        'weighted_change': float(weighted_sums[code] / cap_sums[code]) if cap_sums[code] > 0 else None,
+        'coin_count': int(counts[code]),
+        'market_cap': float(cap_sums[code])
+    } for code, sector in enumerate(sectors) if counts[code]]
+
+    return ranking.top_k(result, len(result), [('avg_change', True)])
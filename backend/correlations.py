@@ -0,0 +1,232 @@
+import numpy as np
+import asyncio
+import logging
+import time
+from typing import List, Dict, Any, Optional
+import data_fetcher
+import symbol_index
+import records
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Correlation engine configuration
+DEFAULT_WINDOW = 168  # candles of returns in the rolling window (one week of 1h candles)
+# A window needs window + 1 closed candles, plus the open one, in one klines request
+MAX_WINDOW = data_fetcher.BINANCE_KLINE_PAGE - 2
+STATE_MAX_AGE = 6 * 3600  # seconds before the running sums are rebuilt from scratch
+DEFAULT_CLUSTER_THRESHOLD = 0.7
+
+# Rolling covariance state per (interval, window)
+_states = {}
+_state_locks = {}
+
+def _closed_candles(klines: np.ndarray, now_ms: int) -> np.ndarray:
+    """Drop the candle that is still open, if present"""
+    return klines[klines['close_time'] < now_ms]
+
+def _log_returns(closes: np.ndarray) -> np.ndarray:
+    """Log returns along the first (time) axis"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(np.log(closes), axis=0)
+    return np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+async def _build_state(interval: str, window: int) -> Optional[Dict[str, Any]]:
+    """Fetch a full window for every USDT pair and compute the running sums"""
+    tickers = await data_fetcher.get_binance_tickers()
+    symbols = [t.symbol for t in tickers if t.symbol.endswith('USDT')]
+    now_ms = int(time.time() * 1000)
+
+    klines = await data_fetcher.get_binance_klines_batch(symbols, interval, window + 2)
+    closed = {s: _closed_candles(k, now_ms)[-(window + 1):] for s, k in klines.items()}
+
+    # Only keep symbols with a complete window ending on the latest closed candle
+    last_open = max((int(k['open_time'][-1]) for k in closed.values() if len(k)), default=None)
+    if last_open is None:
+        return None
+    symbols = [s for s, k in closed.items() if len(k) == window + 1 and k['open_time'][-1] == last_open]
+    if len(symbols) < 2:
+        return None
+
+    closes = np.array([closed[s]['close'] for s in symbols]).T  # time x symbols
+    returns = _log_returns(closes)
+
+    return {
+        'symbols': symbols,
+        'interval': interval,
+        'window': window,
+        'last_open_time': last_open,
+        'next_close_ms': last_open + 2 * data_fetcher.INTERVAL_MS[interval],
+        'last_close': closes[-1],
+        'returns': returns,  # ring buffer, oldest row at `position`
+        'position': 0,
+        'sum': returns.sum(axis=0),
+        'cross': returns.T @ returns,
+        'built_at': time.time(),
+        'corr': None
+    }
+
+async def _update_state(state: Dict[str, Any]) -> bool:
+    """
+    Fold newly closed candles into the running sums.
+    Returns False when the state cannot be updated incrementally.
+    """
+    interval_ms = data_fetcher.INTERVAL_MS[state['interval']]
+    now_ms = int(time.time() * 1000)
+    missing = (now_ms - state['last_open_time']) // interval_ms - 1
+    if missing < 1:
+        return True
+    if missing > state['window']:
+        return False
+
+    klines = await data_fetcher.get_binance_klines_batch(state['symbols'], state['interval'], missing + 2)
+    new_candles = []
+    for symbol in state['symbols']:
+        rows = _closed_candles(klines.get(symbol, records.empty_candles()), now_ms)
+        new_candles.append(rows[rows['open_time'] > state['last_open_time']])
+    count = len(new_candles[0])
+    if count == 0:
+        return True
+    if any(len(rows) != count for rows in new_candles):
+        return False
+
+    closes = np.array([rows['close'] for rows in new_candles]).T
+    new_returns = _log_returns(np.vstack([state['last_close'], closes]))
+
+    # Replace the oldest rows of the ring buffer and adjust the sums
+    rows = (state['position'] + np.arange(count)) % state['window']
+    expired = state['returns'][rows]
+    state['sum'] += new_returns.sum(axis=0) - expired.sum(axis=0)
+    state['cross'] += new_returns.T @ new_returns - expired.T @ expired
+    state['returns'][rows] = new_returns
+    state['position'] = (state['position'] + count) % state['window']
+
+    state['last_open_time'] = int(new_candles[0]['open_time'][-1])
+    state['next_close_ms'] = state['last_open_time'] + 2 * interval_ms
+    state['last_close'] = closes[-1]
+    state['corr'] = None
+    return True
+
+def _correlation_from_state(state: Dict[str, Any]) -> np.ndarray:
+    """Pearson correlation matrix from the running sums"""
+    m = state['window']
+    mean = state['sum'] / m
+    cov = (state['cross'] - m * np.outer(mean, mean)) / (m - 1)
+    std = np.sqrt(np.clip(np.diag(cov), 0, None))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / np.outer(std, std)
+    corr = np.clip(np.nan_to_num(corr), -1.0, 1.0)
+    np.fill_diagonal(corr, 1.0)
+    return corr
+
+async def get_correlation_state(interval: str = "1h", window: int = DEFAULT_WINDOW) -> Optional[Dict[str, Any]]:
+    """
+    Return the cached rolling correlation state for an interval and window.
+
+    Nothing is fetched until the next candle closes; then only the new
+    candles are fetched and folded in. The matrix is computed once per update.
+    """
+    if interval not in data_fetcher.INTERVAL_MS:
+        raise ValueError(f"Unsupported interval: {interval}")
+    window = max(2, min(window, MAX_WINDOW))
+    key = (interval, window)
+
+    state = _states.get(key)
+    if state and time.time() * 1000 < state['next_close_ms'] and state['corr'] is not None:
+        return state
+
+    lock = _state_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        state = _states.get(key)
+        stale = state is None or time.time() - state['built_at'] > STATE_MAX_AGE
+        if stale or not await _update_state(state):
+            state = await _build_state(interval, window)
+            if state is None:
+                logger.warning(f"Could not build correlation state for {key}")
+                return _states.get(key)
+            _states[key] = state
+        if state['corr'] is None:
+            state['corr'] = _correlation_from_state(state)
+    return state
+
+def cluster_symbols(symbols: List[str], corr: np.ndarray, threshold: float = DEFAULT_CLUSTER_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Greedy leader clustering: the most broadly correlated unassigned symbol
+    leads a cluster of every unassigned symbol correlated with it above
+    `threshold`.
+    """
+    strength = corr.sum(axis=1)
+    unassigned = np.ones(len(symbols), dtype=bool)
+    clusters = []
+
+    while unassigned.any():
+        leader = int(np.argmax(np.where(unassigned, strength, -np.inf)))
+        members = unassigned & (corr[leader] >= threshold)
+        members[leader] = True
+        unassigned &= ~members
+
+        idx = np.flatnonzero(members)
+        sub = corr[np.ix_(idx, idx)]
+        size = len(idx)
+        avg_corr = (sub.sum() - size) / (size * (size - 1)) if size > 1 else 1.0
+
+        clusters.append({
+            'leader': symbols[leader],
+            'members': [symbols[i] for i in idx],
+            'size': size,
+            'avg_correlation': round(float(avg_corr), 3)
+        })
+
+    clusters.sort(key=lambda x: x['size'], reverse=True)
+    return clusters
+
+async def get_correlations(
+    pairs: Optional[List[str]] = None,
+    interval: str = "1h",
+    window: int = DEFAULT_WINDOW
+) -> Dict[str, Any]:
+    """Correlation matrix for the requested pairs (or the whole USDT universe)"""
+    state = await get_correlation_state(interval, window)
+    if state is None:
+        return {'symbols': [], 'matrix': []}
+
+    symbols = state['symbols']
+    corr = state['corr']
+    if pairs:
+        position = {s: i for i, s in enumerate(symbols)}
+        idx = [position[p] for p in pairs if p in position]
+        symbols = [symbols[i] for i in idx]
+        corr = corr[np.ix_(idx, idx)]
+
+    return {
+        'symbols': symbols,
+        'interval': interval,
+        'window': state['window'],
+        'as_of': state['last_open_time'],
+        'matrix': np.round(corr, 3).tolist()
+    }
+
+async def get_clusters(
+    interval: str = "1h",
+    window: int = DEFAULT_WINDOW,
+    threshold: float = DEFAULT_CLUSTER_THRESHOLD
+) -> Dict[str, Any]:
+    """Clusters of co-moving USDT pairs, annotated with their CoinGecko ids"""
+    state = await get_correlation_state(interval, window)
+    if state is None:
+        return {'clusters': [], 'unclustered': []}
+
+    clusters = cluster_symbols(state['symbols'], state['corr'], threshold)
+    await symbol_index.get_symbol_index()
+    for cluster in clusters:
+        cluster['coingecko_ids'] = [symbol_index.coin_for_pair(s) for s in cluster['members']]
+
+    return {
+        'interval': interval,
+        'window': state['window'],
+        'threshold': threshold,
+        'as_of': state['last_open_time'],
+        'clusters': [c for c in clusters if c['size'] > 1],
+        'unclustered': [c['leader'] for c in clusters if c['size'] == 1]
+    }
@@ -1,97 +1,369 @@
-import aiohttp
+import os
 import asyncio
-import pandas as pd
+import numpy as np
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator, Callable
+from urllib.parse import urlparse
 import time
+import ranking
+import upstream
+import records
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# API endpoints
-BINANCE_API_BASE = "https://api.binance.com/api/v3"
-COINGECKO_API_BASE = "https://api.coingecko.com/api/v3"
+# API endpoints; overridable to point the backend at a mock (see benchmarks/load_test.py)
+BINANCE_API_BASE = os.environ.get("BINANCE_API_BASE", "https://api.binance.com/api/v3")
+COINGECKO_API_BASE = os.environ.get("COINGECKO_API_BASE", "https://api.coingecko.com/api/v3")
 
 # Cache configuration
 CACHE_EXPIRY = 60  # seconds
 cache = {}
 
-async def fetch_with_cache(url: str, expiry: int = CACHE_EXPIRY) -> Dict:
-    """Fetch data with caching to avoid API rate limits"""
+# CoinGecko market universe paging
+COINGECKO_PAGE_SIZE = 250
+COINGECKO_MAX_PAGES = 40  # ~10k coins, beyond which market caps are negligible
+COINGECKO_PAGE_CONCURRENCY = 3
+COINGECKO_MIN_REQUEST_INTERVAL = 2.0  # seconds between requests, public API allows ~30/min
+COINGECKO_PAGE_RETRIES = 3
+COINGECKO_RETRY_BACKOFF = 10  # seconds, multiplied by the attempt number
+UNIVERSE_EXPIRY = 300  # seconds
+
+# Binance returns at most this many klines per request
+BINANCE_KLINE_PAGE = 1000
+
+# Concurrent kline requests when fetching many symbols at once
+KLINE_BATCH_CONCURRENCY = 50
+
+# Order book snapshots: levels per side (Binance weighs up to 100 levels
+# lowest), how long they are cached, and concurrent requests in a batch
+DEPTH_LIMIT = 100
+DEPTH_EXPIRY = 30  # seconds
+DEPTH_BATCH_CONCURRENCY = 20
+
+# Fields kept from /coins/markets rows; everything else is dropped on ingestion
+COIN_MARKET_FIELDS = ('id', 'symbol', 'name', 'image', 'current_price', 'market_cap',
+                      'total_volume', 'price_change_percentage_24h')
+
+# Per-host request throttling state
+_host_last_request = {}
+_host_locks = {}
+
+# Binance kline interval lengths in milliseconds
+INTERVAL_MS = {
+    '1m': 60_000, '5m': 300_000, '15m': 900_000, '30m': 1_800_000,
+    '1h': 3_600_000, '2h': 7_200_000, '4h': 14_400_000, '1d': 86_400_000
+}
+
+def stack_kline_fields(klines_by_symbol: Dict[str, np.ndarray], fields=('close', 'volume')):
+    """
+    Stack candle arrays into aligned symbol x time arrays, one per field.
+
+    Shorter histories are left-padded with NaN so that the most recent candle
+    of every symbol sits in the last column. Returns (symbols, {field: array}).
+    """
+    symbols = [s for s, k in klines_by_symbol.items() if len(k)]
+    length = max((len(klines_by_symbol[s]) for s in symbols), default=0)
+
+    arrays = {f: np.full((len(symbols), length), np.nan) for f in fields}
+
+    for row, symbol in enumerate(symbols):
+        klines = klines_by_symbol[symbol]
+        for field in fields:
+            arrays[field][row, length - len(klines):] = klines[field]
+
+    return symbols, arrays
+
+def stack_klines(klines_by_symbol: Dict[str, np.ndarray]):
+    """Stack candle arrays into aligned close and volume arrays. Returns (symbols, close, volume)."""
+    symbols, arrays = stack_kline_fields(klines_by_symbol, ('close', 'volume'))
+    return symbols, arrays['close'], arrays['volume']
+
+async def fetch_with_cache(
+    url: str,
+    expiry: int = CACHE_EXPIRY,
+    transform: Optional[Callable] = None,
+    hedge: bool = True
+) -> Dict:
+    """
+    Fetch data with caching to avoid API rate limits.
+    If `transform` is given, only its result is cached and returned.
+
+    When the upstream is unavailable the last good response is returned,
+    however old, and recorded as stale for the current request; `{}` is
+    returned only when there is none.
+    """
     current_time = time.time()
     
     if url in cache and current_time - cache[url]["timestamp"] < expiry:
         return cache[url]["data"]
     
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    logger.error(f"API request failed: {url}, Status: {response.status}")
-                    return {}
-                data = await response.json()
-                cache[url] = {"data": data, "timestamp": current_time}
-                return data
-        except Exception as e:
-            logger.error(f"Error fetching data from {url}: {str(e)}")
-            return {}
-
-async def get_binance_tickers() -> List[Dict]:
+    try:
+        data = await upstream.fetch_json(url, hedge=hedge)
+        if transform is not None:
+            data = transform(data)
+    except upstream.RequestRejected as e:
+        logger.error(f"API request failed: {str(e)}")
+        return {}
+    except Exception as e:
+        logger.error(f"Error fetching data from {url}: {str(e)}")
+        if url in cache:
+            upstream.note_stale(cache[url]["timestamp"])
+            return cache[url]["data"]
+        upstream.note_failed()
+        return {}
+    
+    cache[url] = {"data": data, "timestamp": current_time}
+    return data
+
+async def _throttle(url: str, min_interval: float):
+    """Space out requests to the same host by at least `min_interval` seconds"""
+    host = urlparse(url).netloc
+    lock = _host_locks.setdefault(host, asyncio.Lock())
+    async with lock:
+        wait = _host_last_request.get(host, 0) + min_interval - time.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        _host_last_request[host] = time.time()
+
+async def get_binance_tickers() -> List[records.Ticker]:
     """Get 24hr ticker data for all symbols from Binance"""
     url = f"{BINANCE_API_BASE}/ticker/24hr"
-    data = await fetch_with_cache(url)
+    data = await fetch_with_cache(url, transform=records.parse_tickers)
     return data if isinstance(data, list) else []
 
-async def get_binance_klines(symbol: str, interval: str = "1h", limit: int = 100) -> List[List]:
-    """Get kline/candlestick data for a symbol"""
-    url = f"{BINANCE_API_BASE}/klines?symbol={symbol}&interval={interval}&limit={limit}"
-    data = await fetch_with_cache(url)
+def _compact_exchange_info(data: Any) -> Any:
+    """Reduce /exchangeInfo to the symbols currently trading"""
+    if not isinstance(data, dict) or 'symbols' not in data:
+        return data
+    return [{
+        'symbol': s['symbol'],
+        'base_asset': s['baseAsset'],
+        'quote_asset': s['quoteAsset']
+    } for s in data['symbols'] if s.get('status') == 'TRADING']
+
+async def get_binance_markets(expiry: int = 3600) -> List[Dict]:
+    """Get the base/quote assets of every trading Binance spot symbol"""
+    url = f"{BINANCE_API_BASE}/exchangeInfo"
+    data = await fetch_with_cache(url, expiry, transform=_compact_exchange_info)
     return data if isinstance(data, list) else []
 
+async def get_binance_klines(symbol: str, interval: str = "1h", limit: int = 100) -> np.ndarray:
+    """Get kline/candlestick data for a symbol as a candle array"""
+    url = f"{BINANCE_API_BASE}/klines?symbol={symbol}&interval={interval}&limit={limit}"
+    data = await fetch_with_cache(url, transform=records.parse_klines)
+    return data if isinstance(data, np.ndarray) else records.empty_candles()
+
+async def get_binance_kline_history(symbol: str, interval: str = "1h", candles: int = 1000) -> np.ndarray:
+    """Get the `candles` most recent klines, paging back past the per-request limit"""
+    pages = []
+    fetched = 0
+    end_time = None
+    while fetched < candles:
+        limit = min(BINANCE_KLINE_PAGE, candles - fetched)
+        url = f"{BINANCE_API_BASE}/klines?symbol={symbol}&interval={interval}&limit={limit}"
+        if end_time is not None:
+            url += f"&endTime={end_time}"
+        page = await fetch_with_cache(url, transform=records.parse_klines)
+        if not isinstance(page, np.ndarray) or not len(page):
+            break
+        pages.append(page)
+        fetched += len(page)
+        if len(page) < limit:
+            break
+        end_time = int(page['open_time'][0]) - 1
+    return np.concatenate(pages[::-1]) if pages else records.empty_candles()
+
+async def _fetch_batch(
+    symbols: List[str],
+    fetch: Callable,
+    concurrency: int,
+    timeout: Optional[float]
+) -> Dict[str, Any]:
+    """
+    Run `fetch(symbol)` for many symbols with bounded concurrency, in input order.
+    Symbols whose result has not arrived within `timeout` seconds are left out.
+    """
+    if not symbols:
+        return {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(symbol):
+        async with semaphore:
+            return await fetch(symbol)
+
+    tasks = [asyncio.create_task(bounded(symbol)) for symbol in symbols]
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+
+    # Keep the input symbol order so downstream ranking is deterministic
+    return {symbol: task.result() for symbol, task in zip(symbols, tasks)
+            if task in done and task.exception() is None}
+
+async def get_binance_klines_batch(
+    symbols: List[str],
+    interval: str = "1h",
+    limit: int = 100,
+    concurrency: int = KLINE_BATCH_CONCURRENCY,
+    timeout: Optional[float] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Get klines for many symbols with bounded concurrency.
+    Symbols whose klines have not arrived within `timeout` seconds are left out.
+    """
+    result = await _fetch_batch(symbols, lambda s: get_binance_klines(s, interval, limit), concurrency, timeout)
+    return {symbol: klines for symbol, klines in result.items() if len(klines)}
+
+async def get_binance_kline_history_batch(
+    symbols: List[str],
+    interval: str = "1h",
+    candles: int = 1000,
+    concurrency: int = KLINE_BATCH_CONCURRENCY,
+    timeout: Optional[float] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Get the `candles` most recent klines for many symbols, paging back past
+    the per-request limit. Symbols without klines in time are left out.
+    """
+    result = await _fetch_batch(symbols, lambda s: get_binance_kline_history(s, interval, candles), concurrency, timeout)
+    return {symbol: klines for symbol, klines in result.items() if len(klines)}
+
+async def get_binance_depth(symbol: str, limit: int = DEPTH_LIMIT) -> Optional[records.OrderBook]:
+    """Get an order book snapshot of a symbol, None when it is unavailable"""
+    url = f"{BINANCE_API_BASE}/depth?symbol={symbol}&limit={limit}"
+    data = await fetch_with_cache(url, DEPTH_EXPIRY, transform=records.parse_depth)
+    return data if isinstance(data, records.OrderBook) else None
+
+async def get_binance_depth_batch(
+    symbols: List[str],
+    limit: int = DEPTH_LIMIT,
+    concurrency: int = DEPTH_BATCH_CONCURRENCY,
+    timeout: Optional[float] = None
+) -> Dict[str, records.OrderBook]:
+    """
+    Get order book snapshots for many symbols with bounded concurrency.
+    Symbols whose book is unavailable or late are left out.
+    """
+    result = await _fetch_batch(symbols, lambda s: get_binance_depth(s, limit), concurrency, timeout)
+    return {symbol: book for symbol, book in result.items() if book is not None}
+
 async def get_coingecko_coins() -> List[Dict]:
     """Get list of coins from CoinGecko"""
     url = f"{COINGECKO_API_BASE}/coins/markets?vs_currency=usd&order=market_cap_desc&per_page=250&page=1"
     data = await fetch_with_cache(url)
     return data if isinstance(data, list) else []
 
-async def get_ai_tokens(min_market_cap: int = 1000000, limit: int = 20) -> List[Dict]:
+def _compact_coin_page(data: Any) -> Any:
+    """Reduce a raw /coins/markets page to the fields the analysis uses"""
+    if not isinstance(data, list):
+        return data
+    page = []
+    for coin in data:
+        if coin.get('id') is None:
+            continue
+        # Missing and null fields are left out, so consumers' .get() defaults apply
+        compact = {field: coin[field] for field in COIN_MARKET_FIELDS if coin.get(field) is not None}
+        compact['market_cap'] = compact.get('market_cap') or 0
+        compact['total_volume'] = compact.get('total_volume') or 0
+        page.append(compact)
+    return page
+
+async def _fetch_coingecko_page(page: int, category: Optional[str] = None) -> Optional[List[Dict]]:
+    """Fetch one compacted markets page, backing off when rate limited; None when it could not be fetched"""
+    url = (f"{COINGECKO_API_BASE}/coins/markets?vs_currency=usd&order=market_cap_desc"
+           f"&per_page={COINGECKO_PAGE_SIZE}&page={page}")
+    if category is not None:
+        url += f"&category={category}"
+    for attempt in range(1, COINGECKO_PAGE_RETRIES + 1):
+        if url not in cache or time.time() - cache[url]["timestamp"] >= UNIVERSE_EXPIRY:
+            await _throttle(url, COINGECKO_MIN_REQUEST_INTERVAL)
+        # Not hedged: a duplicate request would break the throttle
+        data = await fetch_with_cache(url, UNIVERSE_EXPIRY, transform=_compact_coin_page, hedge=False)
+        if isinstance(data, list):
+            return data
+        # Errors (including HTTP 429) come back as {}; back off and retry,
+        # unless the host's circuit is open and retrying is pointless
+        if upstream.circuit_open(url):
+            break
+        logger.warning(f"CoinGecko page {page} failed, retry {attempt}/{COINGECKO_PAGE_RETRIES}")
+        await asyncio.sleep(COINGECKO_RETRY_BACKOFF * attempt)
+    return None
+
+async def iter_coingecko_markets(
+    max_pages: int = COINGECKO_MAX_PAGES,
+    concurrency: int = COINGECKO_PAGE_CONCURRENCY,
+    category: Optional[str] = None
+) -> AsyncIterator[List[Dict]]:
+    """
+    Stream the CoinGecko market universe page by page, in market cap order,
+    optionally only the coins of one CoinGecko category.
+
+    Up to `concurrency` pages are in flight at once and requests are throttled
+    per host. Pages are compacted on ingestion, so consumers can aggregate
+    incrementally without holding every raw page in memory.
+
+    A page that cannot be fetched is skipped and recorded as a failure on the
+    current upstream tracker; only a short page ends the universe.
+    """
+    for first in range(1, max_pages + 1, concurrency):
+        pages = range(first, min(first + concurrency, max_pages + 1))
+        results = await asyncio.gather(*[_fetch_coingecko_page(p, category) for p in pages])
+        for number, page in zip(pages, results):
+            if page is None:
+                logger.error(f"CoinGecko page {number} unavailable, skipping it")
+                upstream.note_failed()
+                continue
+            if page:
+                yield page
+            if len(page) < COINGECKO_PAGE_SIZE:
+                return
+
+async def get_ai_tokens(min_market_cap: int = 1000000, limit: int = 20) -> List[records.AiToken]:
     """Get AI-related tokens with market data"""
     ai_keywords = ["ai", "artificial", "intelligence", "machine", "learning", "neural", 
                   "data", "predict", "cognitive", "brain", "deep", "smart"]
     
-    all_coins = await get_coingecko_coins()
-    
-    # Filter for AI-related tokens
+    # Filter for AI-related tokens, streaming pages in market cap order
     ai_tokens = []
-    for coin in all_coins:
-        name = (coin.get('name', '') or '').lower()
-        symbol = (coin.get('symbol', '') or '').lower()
-        description = (coin.get('description', '') or '').lower()
+    async for page in iter_coingecko_markets():
+        for coin in page:
+            name = (coin.get('name', '') or '').lower()
+            symbol = (coin.get('symbol', '') or '').lower()
+            description = (coin.get('description', '') or '').lower()
         
-        # Check if any AI keyword is in the name, symbol or description
-        is_ai_related = any(keyword in name or keyword in symbol or 
-                          (description and keyword in description) 
-                          for keyword in ai_keywords)
+            # Check if any AI keyword is in the name, symbol or description
+            is_ai_related = any(keyword in name or keyword in symbol or 
+                              (description and keyword in description) 
+                              for keyword in ai_keywords)
         
-        if is_ai_related and coin.get('market_cap', 0) > min_market_cap:
-            # Get 24h price change from CoinGecko
-            price_change = coin.get('price_change_percentage_24h', 0)
+            if is_ai_related and coin.get('market_cap', 0) > min_market_cap:
+                # Get 24h price change from CoinGecko
+                price_change = coin.get('price_change_percentage_24h', 0)
             
-            ai_tokens.append({
-                'id': coin.get('id'),
-                'symbol': coin.get('symbol', '').upper(),
-                'name': coin.get('name'),
-                'current_price': coin.get('current_price', 0),
-                'market_cap': coin.get('market_cap', 0),
-                'price_change_24h': price_change,
-                'volume_24h': coin.get('total_volume', 0),
-                'image': coin.get('image', '')
-            })
+                ai_tokens.append({
+                    'id': coin.get('id'),
+                    'symbol': coin.get('symbol', '').upper(),
+                    'name': coin.get('name'),
+                    'current_price': coin.get('current_price', 0),
+                    'market_cap': coin.get('market_cap', 0),
+                    'price_change_24h': price_change,
+                    'volume_24h': coin.get('total_volume', 0),
+                    'image': coin.get('image', '')
+                })
+        
+        # Pages are ordered by market cap, so stop once they fall below the threshold
+        if page[-1].get('market_cap', 0) <= min_market_cap:
+            break
     
-    # Sort by market cap and limit results
-    ai_tokens.sort(key=lambda x: x.get('market_cap', 0), reverse=True)
-    return ai_tokens[:limit]
+    # Rank by market cap and limit results
+    return ranking.top_k(ai_tokens, limit, [('market_cap', True)])
+
+def top_volume_usdt_symbols(tickers: List[records.Ticker], count: int = 30) -> List[str]:
+    """USDT pairs among the `count` tickers with the highest quote volume (without reordering the cached tickers)"""
+    top_tickers = ranking.top_k(tickers, count, [(lambda x: x.quote_volume, True)])
+    return [ticker.symbol for ticker in top_tickers if ticker.symbol.endswith('USDT')]
 
 async def get_trading_pair_data(symbols: List[str] = None) -> Dict[str, Dict]:
     """Get comprehensive data for trading pairs"""
@@ -99,28 +371,22 @@ async def get_trading_pair_data(symbols: List[str] = None) -> Dict[str, Dict]:
     
     if not symbols:
         # If no symbols provided, get top pairs by volume
-        all_tickers.sort(key=lambda x: float(x.get('quoteVolume', 0)), reverse=True)
-        symbols = [ticker['symbol'] for ticker in all_tickers[:30] if ticker['symbol'].endswith('USDT')]
+        symbols = top_volume_usdt_symbols(all_tickers)
+    
+    tickers_by_symbol = {item.symbol: item for item in all_tickers}
     
     result = {}
     for symbol in symbols:
         # Get ticker data
-        ticker_data = next((item for item in all_tickers if item['symbol'] == symbol), {})
+        ticker_data = tickers_by_symbol.get(symbol)
         
-        if not ticker_data:
+        if ticker_data is None:
             continue
             
         # Get recent klines for price history
         klines = await get_binance_klines(symbol, "1h", 24)
-        
-        # Convert klines to a more usable format
-        prices = []
-        volumes = []
-        
-        for k in klines:
-            if len(k) > 7:  # Ensure we have enough data
-                prices.append(float(k[4]))  # Close price
-                volumes.append(float(k[5]))  # Volume
+        prices = klines['close'].tolist()
+        volumes = klines['volume'].tolist()
         
         # Calculate volatility
         if len(prices) > 1:
@@ -132,11 +398,11 @@ async def get_trading_pair_data(symbols: List[str] = None) -> Dict[str, Dict]:
         # Prepare the result
         result[symbol] = {
             'symbol': symbol,
-            'last_price': float(ticker_data.get('lastPrice', 0)),
-            'price_change_24h': float(ticker_data.get('priceChangePercent', 0)),
-            'high_24h': float(ticker_data.get('highPrice', 0)),
-            'low_24h': float(ticker_data.get('lowPrice', 0)),
-            'volume_24h': float(ticker_data.get('quoteVolume', 0)),
+            'last_price': ticker_data.last_price,
+            'price_change_24h': ticker_data.price_change_percent,
+            'high_24h': ticker_data.high_price,
+            'low_24h': ticker_data.low_price,
+            'volume_24h': ticker_data.quote_volume,
             'hourly_volatility': avg_volatility,
             'price_history': prices,
             'volume_history': volumes
@@ -0,0 +1,118 @@
+import numpy as np
+import logging
+from typing import List, Dict, Any, Optional
+import data_fetcher
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+MAX_HISTORY_CANDLES = 10_000  # ~14 months of 1h candles
+
+# Kline columns returned by the history endpoint
+HISTORY_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+def _endpoints(n: int, max_points: int) -> np.ndarray:
+    """Indices within a budget too small to bucket: the latest point, then the first and last"""
+    return np.array([n - 1]) if max_points == 1 else np.array([0, n - 1])
+
+def lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of at most `max_points` points that
+    keep the visual shape of the series. The first and last points are kept
+    (only the last one for a single point).
+    """
+    n = len(y)
+    if max_points >= n:
+        return np.arange(n)
+    if max_points < 3:
+        return _endpoints(n, max_points)
+
+    # max_points - 2 buckets over the interior points
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    selected = np.empty(max_points, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    anchor = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        if i == max_points - 3:
+            next_x, next_y = x[-1], y[-1]
+        else:
+            next_end = edges[i + 2]
+            next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+        # Twice the triangle area formed with the previous pick and the next bucket's mean
+        area = np.abs((x[anchor] - next_x) * (y[start:end] - y[anchor])
+                      - (x[anchor] - x[start:end]) * (next_y - y[anchor]))
+        anchor = start + int(np.argmax(area))
+        selected[i + 1] = anchor
+
+    return selected
+
+def min_max(y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Min-max bucketing: indices of the lowest and highest point of each bucket,
+    plus the first and last points, at most `max_points` in total.
+    """
+    n = len(y)
+    if max_points >= n:
+        return np.arange(n)
+    if max_points < 4:
+        return _endpoints(n, max_points)
+
+    buckets = (max_points - 2) // 2
+    bucket = np.arange(n) * buckets // n
+    # Sort by bucket, then value; each bucket's min and max sit at its ends
+    order = np.lexsort((y, bucket))
+    ends = np.cumsum(np.bincount(bucket, minlength=buckets))
+    starts = np.concatenate(([0], ends[:-1]))
+    return np.unique(np.concatenate(([0, n - 1], order[starts], order[ends - 1])))
+
+def _check_method(method: str):
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}', expected one of {', '.join(DOWNSAMPLE_METHODS)}")
+
+def downsample_indices(x: np.ndarray, y: np.ndarray, max_points: Optional[int], method: str = "lttb") -> np.ndarray:
+    """Indices of the points to keep, in time order"""
+    _check_method(method)
+    if not max_points or max_points >= len(y):
+        return np.arange(len(y))
+    if method == "lttb":
+        return lttb(x, y, max_points)
+    return min_max(y, max_points)
+
+async def get_price_history(
+    symbol: str,
+    interval: str = "1h",
+    candles: int = 720,
+    max_points: Optional[int] = None,
+    method: str = "lttb"
+) -> Dict[str, Any]:
+    """
+    Recent klines of a symbol as columns, downsampled on the close price to at
+    most `max_points` candles
+    """
+    if interval not in data_fetcher.INTERVAL_MS:
+        raise ValueError(f"Unsupported interval '{interval}'")
+    if not 1 <= candles <= MAX_HISTORY_CANDLES:
+        raise ValueError(f"candles must be between 1 and {MAX_HISTORY_CANDLES}")
+    if max_points is not None and max_points < 1:
+        raise ValueError("max_points must be positive")
+    _check_method(method)
+
+    klines = await data_fetcher.get_binance_kline_history(symbol, interval, candles)
+    keep = downsample_indices(klines['open_time'].astype(float), klines['close'], max_points, method)
+
+    series: Dict[str, List] = {'open_time': klines['open_time'][keep].tolist()}
+    for field in HISTORY_FIELDS:
+        series[field] = klines[field][keep].tolist()
+
+    return {
+        'symbol': symbol,
+        'interval': interval,
+        'candles': len(klines),
+        'points': len(keep),
+        'method': method if len(keep) < len(klines) else None,
+        'series': series
+    }
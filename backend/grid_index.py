@@ -0,0 +1,51 @@
+import numpy as np
+from typing import List, Dict, Any
+
+# Range index over a scored grid candidate set. The candidates are computed
+# once per dashboard snapshot for the widest filter universe, and any filter
+# combination inside that universe is answered from the index instead of a
+# new scan: a binary search on volatility, then the best-ranked matches.
+
+def build_grid_index(pairs: List[Dict[str, Any]], universe: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Index candidates that are already ranked best first, as returned by
+    identify_grid_trading_pairs for the filters in `universe`
+    """
+    volatility = np.array([p['avg_hourly_volatility'] for p in pairs], dtype=float)
+    by_volatility = np.argsort(volatility)
+    return {
+        'universe': universe,
+        # A universe cut off at its limit may be missing matches of narrower filters
+        'truncated': len(pairs) >= universe['limit'],
+        'pairs': pairs,
+        'volatility': volatility[by_volatility],
+        'ranks': by_volatility,
+        'volume': np.array([p['volume_24h'] for p in pairs], dtype=float)
+    }
+
+def within(universe: Dict[str, Any], min_volatility: float, max_volatility: float, min_volume: float) -> bool:
+    """Whether the filters select a subset of the universe's candidates"""
+    return (min_volatility >= universe['min_volatility'] and max_volatility <= universe['max_volatility']
+            and min_volume >= universe['min_volume'])
+
+def query_grid_index(
+    index: Dict[str, Any],
+    min_volatility: float,
+    max_volatility: float,
+    min_volume: float,
+    limit: int
+) -> List[Dict[str, Any]]:
+    """
+    The best `limit` indexed pairs within the volatility range and above the
+    volume floor, in the same order identify_grid_trading_pairs returns them
+    """
+    if limit <= 0:
+        return []
+    lo = np.searchsorted(index['volatility'], min_volatility, side='left')
+    hi = np.searchsorted(index['volatility'], max_volatility, side='right')
+    ranks = index['ranks'][lo:hi]
+    ranks = ranks[index['volume'][ranks] >= min_volume]
+    if len(ranks) > limit:
+        ranks = np.partition(ranks, limit - 1)[:limit]
+    pairs = index['pairs']
+    return [pairs[i] for i in np.sort(ranks)]
@@ -0,0 +1,259 @@
+import numpy as np
+import itertools
+import logging
+from typing import List, Dict, Sequence
+import data_fetcher
+import records
+import workers
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Simulator configuration
+DEFAULT_FEE_RATE = 0.001  # 0.1% per fill, Binance spot taker fee
+PAIRS_PER_CHUNK = 64  # bounds the pairs x cells x path working set
+DEFAULT_LEVEL_OPTIONS = (5, 10, 15, 20)
+DEFAULT_SPACING_OPTIONS = ("arithmetic", "geometric")
+
+# Walk-forward validation of candidates: the grid is fit on FIT_CANDLES
+# candles, as the suggested range is, and replayed on the REPLAY_CANDLES after
+FIT_CANDLES = 24
+REPLAY_CANDLES = 24
+
+def build_grid(range_low, range_high, levels, spacing: str = "arithmetic") -> np.ndarray:
+    """
+    Build a pairs x (max_levels + 1) matrix of grid prices.
+
+    `levels` may be a scalar or one value per pair; rows with fewer levels are
+    padded with NaN, which never triggers a fill.
+    """
+    range_low = np.atleast_1d(np.asarray(range_low, dtype=float))
+    range_high = np.atleast_1d(np.asarray(range_high, dtype=float))
+    levels = np.broadcast_to(np.asarray(levels, dtype=int), range_low.shape)
+
+    steps = np.arange(levels.max() + 1)
+    fraction = steps[None, :] / levels[:, None]
+
+    if spacing == "geometric":
+        grid = range_low[:, None] * (range_high / range_low)[:, None] ** fraction
+    elif spacing == "arithmetic":
+        grid = range_low[:, None] + (range_high - range_low)[:, None] * fraction
+    else:
+        raise ValueError(f"Unknown grid spacing: {spacing}")
+
+    return np.where(steps[None, :] <= levels[:, None], grid, np.nan)
+
+def candle_path(open_, high, low, close) -> np.ndarray:
+    """
+    Expand candles into an intra-candle price path (pairs x 4 * time).
+
+    Bullish candles are assumed to visit the low before the high and bearish
+    candles the reverse, which is the usual conservative ordering for fills.
+    """
+    bullish = close >= open_
+    first = np.where(bullish, low, high)
+    second = np.where(bullish, high, low)
+    return np.stack([open_, first, second, close], axis=-1).reshape(open_.shape[0], -1)
+
+def _simulate_chunk(path: np.ndarray, grid: np.ndarray, fee_rate: float) -> Dict[str, np.ndarray]:
+    """Run the grid state machine for a chunk of pairs, vectorized over cells and time"""
+    n_pairs, n_steps = path.shape
+    buy_level = grid[:, :-1, None]   # pairs x cells x 1
+    sell_level = grid[:, 1:, None]
+    prices = path[:, None, :]        # pairs x 1 x time
+
+    # Each cell holds inventory after its buy level is touched and is empty
+    # after its sell level is touched: +1 = holding, -1 = empty, 0 = no event
+    event = np.where(prices <= buy_level, 1, np.where(prices >= sell_level, -1, 0)).astype(np.int8)
+
+    valid = ~np.isnan(path)
+    first_idx = np.argmax(valid, axis=1)
+    rows = np.arange(n_pairs)
+    start_price = path[rows, first_idx]
+    end_price = path[:, -1]
+
+    # Cells entirely above the start price are bought at market when the bot starts
+    initial = np.where(grid[:, :-1] >= start_price[:, None], 1, -1).astype(np.int8)
+    initial = np.where(np.isnan(grid[:, 1:]), 0, initial)
+
+    # Forward-fill the last event to get the state of each cell over time
+    time_idx = np.where(event != 0, np.arange(n_steps, dtype=np.int32), -1)
+    np.maximum.accumulate(time_idx, axis=2, out=time_idx)
+    state = np.take_along_axis(event, np.maximum(time_idx, 0), axis=2)
+    state = np.where(time_idx >= 0, state, initial[:, :, None])
+
+    previous = np.concatenate([initial[:, :, None], state[:, :, :-1]], axis=2)
+    sells = np.count_nonzero((previous == 1) & (state == -1), axis=2)
+    buys = np.count_nonzero((previous == -1) & (state == 1), axis=2) + (initial == 1)
+
+    cell_valid = ~np.isnan(grid[:, 1:])
+    cell_count = cell_valid.sum(axis=1)
+    capital = np.where(cell_valid, 1.0 / np.maximum(cell_count, 1)[:, None], 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cell_return = np.nan_to_num(grid[:, 1:] / grid[:, :-1] - 1)
+        # The first sale of an initially held cell was bought at the start price
+        initial_adjust = np.where(
+            (initial == 1) & (sells > 0),
+            np.nan_to_num(grid[:, 1:] / start_price[:, None] - 1) - cell_return,
+            0.0
+        )
+        realized = capital * (sells * cell_return + initial_adjust)
+
+        # Mark open inventory to the final price
+        holding = state[:, :, -1] == 1
+        cost = np.where((initial == 1) & (sells == 0), start_price[:, None], grid[:, :-1])
+        unrealized = np.where(holding & cell_valid, capital * (end_price[:, None] / cost - 1), 0.0)
+
+    fills = buys + sells
+    fees = capital * fills * fee_rate
+    utilization = (state == 1).mean(axis=2)
+
+    return {
+        'realized_profit': (realized - fees).sum(axis=1),
+        'unrealized_profit': np.nan_to_num(unrealized).sum(axis=1),
+        'fills': fills.sum(axis=1),
+        'round_trips': sells.sum(axis=1),
+        'capital_utilization': (capital * utilization).sum(axis=1),
+    }
+
+def simulate_grid(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    range_low,
+    range_high,
+    levels,
+    spacing: str = "arithmetic",
+    fee_rate: float = DEFAULT_FEE_RATE
+) -> Dict[str, np.ndarray]:
+    """
+    Replay pairs x time candle arrays through a grid bot for every pair at once.
+
+    Capital is split evenly across grid cells. Profits are returned as a
+    fraction of the total capital allocated to each pair.
+    """
+    open_, high, low, close = (np.atleast_2d(np.asarray(a, dtype=float)) for a in (open_, high, low, close))
+    path = candle_path(open_, high, low, close)
+    grid = build_grid(range_low, range_high, levels, spacing)
+    grid = np.broadcast_to(grid, (path.shape[0], grid.shape[1]))
+
+    parts = []
+    for start in range(0, path.shape[0], PAIRS_PER_CHUNK):
+        chunk = slice(start, start + PAIRS_PER_CHUNK)
+        parts.append(_simulate_chunk(path[chunk], grid[chunk], fee_rate))
+
+    if not parts:
+        return {}
+    return {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+
+def _simulate_params(args):
+    """Process pool entry point for one (levels, spacing) combination"""
+    ohlc, range_low, range_high, levels, spacing, fee_rate = args
+    return simulate_grid(*ohlc, range_low, range_high, levels, spacing, fee_rate)
+
+def optimize_grid(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    range_low,
+    range_high,
+    level_options: Sequence[int] = DEFAULT_LEVEL_OPTIONS,
+    spacing_options: Sequence[str] = DEFAULT_SPACING_OPTIONS,
+    fee_rate: float = DEFAULT_FEE_RATE,
+    parallel: bool = True
+) -> Dict[str, np.ndarray]:
+    """
+    Sweep grid parameters across the shared worker processes and keep the best
+    combination per pair.
+
+    Returns the simulation results of the best combination plus the chosen
+    `levels` and `spacing` for each pair, chosen by realized profit.
+    """
+    combos = list(itertools.product(level_options, spacing_options))
+    tasks = [((open_, high, low, close), range_low, range_high, lv, sp, fee_rate) for lv, sp in combos]
+
+    if parallel and len(combos) > 1 and workers.cpu_count() > 1:
+        results = list(workers.get_pool().map(_simulate_params, tasks))
+    else:
+        results = [_simulate_params(task) for task in tasks]
+
+    profit = np.stack([r['realized_profit'] for r in results])
+    best = np.argmax(profit, axis=0)
+    pairs = np.arange(profit.shape[1])
+
+    best_results = {key: np.stack([r[key] for r in results])[best, pairs] for key in results[0]}
+    best_results['levels'] = np.array([combos[i][0] for i in best])
+    best_results['spacing'] = np.array([combos[i][1] for i in best])
+    return best_results
+
+def walk_forward(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    fee_rate: float = DEFAULT_FEE_RATE,
+    parallel: bool = True
+) -> Dict[str, np.ndarray]:
+    """
+    Fit a grid on the first FIT_CANDLES candles of each pair, its range from
+    their low and high and its levels and spacing by optimize_grid, then
+    replay the candles after them through it. The results are out of sample:
+    nothing from the replayed candles shapes the grid.
+    """
+    fit, replay = slice(None, FIT_CANDLES), slice(FIT_CANDLES, None)
+    range_low, range_high = np.nanmin(low[:, fit], axis=1), np.nanmax(high[:, fit], axis=1)
+    best = optimize_grid(open_[:, fit], high[:, fit], low[:, fit], close[:, fit], range_low, range_high,
+                         fee_rate=fee_rate, parallel=parallel)
+
+    results = None
+    for spacing in np.unique(best['spacing']):
+        rows = np.flatnonzero(best['spacing'] == spacing)
+        part = simulate_grid(open_[rows, replay], high[rows, replay], low[rows, replay], close[rows, replay],
+                             range_low[rows], range_high[rows], best['levels'][rows], spacing, fee_rate)
+        if results is None:
+            results = {key: np.zeros(len(best['levels']), dtype=values.dtype) for key, values in part.items()}
+        for key, values in part.items():
+            results[key][rows] = values
+    results.update(levels=best['levels'], spacing=best['spacing'])
+    return results
+
+def simulate_candidates(
+    klines_by_symbol: Dict[str, np.ndarray],
+    candidates: List[records.GridPairResult],
+    fee_rate: float = DEFAULT_FEE_RATE
+) -> List[records.GridPairResult]:
+    """
+    Attach walk-forward grid results to grid pair candidates, from their last
+    FIT_CANDLES + REPLAY_CANDLES klines. Candidates with a shorter history get
+    no simulated results and rank last.
+    """
+    history = FIT_CANDLES + REPLAY_CANDLES
+    symbols, arrays = data_fetcher.stack_kline_fields(
+        {c['symbol']: klines_by_symbol[c['symbol']][-history:] for c in candidates
+         if len(klines_by_symbol.get(c['symbol'], ())) >= history},
+        ('open', 'high', 'low', 'close')
+    )
+    for candidate in candidates:
+        candidate.update(simulated_profit_percent=None, simulated_unrealized_percent=None, simulated_fills=None,
+                         capital_utilization=None, simulated_grid_levels=None, simulated_grid_spacing=None)
+    if not symbols:
+        return candidates
+
+    by_symbol = {c['symbol']: c for c in candidates}
+    results = walk_forward(arrays['open'], arrays['high'], arrays['low'], arrays['close'], fee_rate)
+
+    for i, symbol in enumerate(symbols):
+        by_symbol[symbol].update(
+            simulated_profit_percent=round(float(results['realized_profit'][i]) * 100, 2),
+            simulated_unrealized_percent=round(float(results['unrealized_profit'][i]) * 100, 2),
+            simulated_fills=int(results['fills'][i]),
+            capital_utilization=round(float(results['capital_utilization'][i]) * 100, 2),
+            simulated_grid_levels=int(results['levels'][i]),
+            simulated_grid_spacing=str(results['spacing'][i])
+        )
+
+    return candidates
@@ -0,0 +1,122 @@
+import numpy as np
+import importlib.util
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Numba is optional; the recursive smoothers fall back to NumPy loops over time.
+# The kernels live in numba_kernels.py and are imported on first use.
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+# All kernels take symbol x time arrays (a 1-D array is treated as one symbol)
+# and return arrays of the same shape. Histories may be left-padded with NaN.
+
+def _as_2d(values) -> np.ndarray:
+    return np.atleast_2d(np.asarray(values, dtype=float))
+
+def _restore_shape(result: np.ndarray, values) -> np.ndarray:
+    return result.reshape(np.shape(values))
+
+def sma(values, window: int) -> np.ndarray:
+    """Simple moving average; NaN until a full window of valid values is available"""
+    data = _as_2d(values)
+    valid = ~np.isnan(data)
+    csum = np.cumsum(np.where(valid, data, 0.0), axis=1)
+    count = np.cumsum(valid, axis=1)
+
+    out = np.full(data.shape, np.nan)
+    if data.shape[1] >= window:
+        window_sum = csum[:, window - 1:].copy()
+        window_sum[:, 1:] -= csum[:, :-window]
+        window_count = count[:, window - 1:].copy()
+        window_count[:, 1:] -= count[:, :-window]
+        out[:, window - 1:] = np.where(window_count == window, window_sum / window, np.nan)
+
+    return _restore_shape(out, values)
+
+def rolling_std(values, window: int, ddof: int = 0) -> np.ndarray:
+    """Rolling standard deviation over a full window of valid values"""
+    data = _as_2d(values)
+    # Shift each row by its first valid value to limit cancellation in the sum of squares
+    first = data[np.arange(data.shape[0]), np.argmax(~np.isnan(data), axis=1)] if data.size else np.zeros(data.shape[0])
+    centered = data - np.nan_to_num(first)[:, None]
+    mean = _as_2d(sma(centered, window))
+    mean_sq = _as_2d(sma(centered ** 2, window))
+    var = np.clip(mean_sq - mean ** 2, 0, None) * window / (window - ddof)
+    return _restore_shape(np.sqrt(var), values)
+
+def _ewm_numpy(data: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """Recursive exponential smoothing, vectorized across symbols"""
+    out = np.full(data.shape, np.nan)
+    state = np.full(data.shape[0], np.nan)
+    count = np.zeros(data.shape[0], dtype=int)
+    for t in range(data.shape[1]):
+        x = data[:, t]
+        valid = ~np.isnan(x)
+        state = np.where(valid, np.where(np.isnan(state), x, alpha * x + (1 - alpha) * state), state)
+        count += valid
+        out[:, t] = np.where(count >= min_periods, state, np.nan)
+    return out
+
+def ewm(values, alpha: float, min_periods: int = 1) -> np.ndarray:
+    """
+    Exponentially weighted mean, matching pandas `ewm(alpha=..., adjust=False)`.
+    Uses a Numba kernel when available.
+    """
+    data = _as_2d(values)
+    if NUMBA_AVAILABLE:
+        import numba_kernels
+        out = numba_kernels.ewm(np.ascontiguousarray(data), float(alpha), int(min_periods))
+    else:
+        out = _ewm_numpy(data, alpha, min_periods)
+    return _restore_shape(out, values)
+
+def ema(values, span: int) -> np.ndarray:
+    """Exponential moving average, matching pandas `ewm(span=span, adjust=False)`"""
+    return ewm(values, 2.0 / (span + 1))
+
+def _previous(data: np.ndarray) -> np.ndarray:
+    prev = np.full_like(data, np.nan)
+    prev[:, 1:] = data[:, :-1]
+    return prev
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    """Relative Strength Index with Wilder smoothing"""
+    data = _as_2d(close)
+    delta = data - _previous(data)
+    gain = np.where(np.isnan(delta), np.nan, np.clip(delta, 0, None))
+    loss = np.where(np.isnan(delta), np.nan, np.clip(-delta, 0, None))
+
+    avg_gain = ewm(gain, 1.0 / period, min_periods=period)
+    avg_loss = ewm(loss, 1.0 / period, min_periods=period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = 100 - 100 / (1 + avg_gain / avg_loss)
+    return _restore_shape(out, close)
+
+def true_range(high, low, close) -> np.ndarray:
+    """True range: the candle range extended to the previous close"""
+    high, low, close = _as_2d(high), _as_2d(low), _as_2d(close)
+    prev_close = _previous(close)
+    candle_range = high - low
+    # fmax ignores the missing previous close on the first candle
+    out = np.fmax(candle_range, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return np.where(np.isnan(candle_range), np.nan, out)
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    """Average True Range with Wilder smoothing"""
+    tr = true_range(high, low, close)
+    return _restore_shape(ewm(tr, 1.0 / period, min_periods=period), close)
+
+def bollinger(close, window: int = 20, num_std: float = 2.0):
+    """Bollinger bands (population std); returns (middle, upper, lower)"""
+    middle = sma(close, window)
+    width = num_std * rolling_std(close, window)
+    return middle, middle + width, middle - width
+
+def hl_volatility(high, low) -> np.ndarray:
+    """Per-candle high-low range as a percentage of the low"""
+    high, low = np.asarray(high, dtype=float), np.asarray(low, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (high - low) / low * 100
@@ -0,0 +1,80 @@
+import numpy as np
+from typing import List, Dict, Tuple
+import records
+
+# Order book liquidity metrics. Book sides are stacked into symbols x levels
+# arrays, padded with zero-quantity levels, so every metric is computed for
+# all symbols at once. Books are limited to the fetched levels, so depth is a
+# lower bound and orders larger than the fetched book cannot be filled.
+
+DEPTH_BAND_PERCENT = 1.0  # depth_1pct is measured within this distance of the mid price
+
+def stack_book_side(books: List[records.OrderBook], side: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Stack one side of the books into (price, quantity) symbols x levels arrays"""
+    length = max((len(getattr(book, side)) for book in books), default=0)
+    price = np.full((len(books), length), np.nan)
+    quantity = np.zeros((len(books), length))
+    for row, book in enumerate(books):
+        levels = getattr(book, side)
+        price[row, :len(levels)] = levels['price']
+        quantity[row, :len(levels)] = levels['quantity']
+    return price, quantity
+
+def _buy_slippage(price: np.ndarray, quantity: np.ndarray, quote_amount: np.ndarray) -> np.ndarray:
+    """Percent above the best ask paid on average for a market buy of `quote_amount`"""
+    value = np.nan_to_num(price) * quantity
+    before = np.cumsum(value, axis=1) - value
+    spent = np.clip(quote_amount[:, None] - before, 0, value)
+    bought = np.divide(spent, price, out=np.zeros_like(spent), where=spent > 0).sum(axis=1)
+    filled = spent.sum(axis=1) >= quote_amount * (1 - 1e-9)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        average = quote_amount / bought
+        return np.where(filled, (average / price[:, 0] - 1) * 100, np.nan)
+
+def _sell_slippage(price: np.ndarray, quantity: np.ndarray, base_amount: np.ndarray) -> np.ndarray:
+    """Percent below the best bid received on average for a market sell of `base_amount`"""
+    before = np.cumsum(quantity, axis=1) - quantity
+    sold = np.clip(base_amount[:, None] - before, 0, quantity)
+    proceeds = (sold * np.nan_to_num(price)).sum(axis=1)
+    filled = sold.sum(axis=1) >= base_amount * (1 - 1e-9)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        average = proceeds / base_amount
+        return np.where(filled, (1 - average / price[:, 0]) * 100, np.nan)
+
+def liquidity_metrics(
+    books: Dict[str, records.OrderBook],
+    order_sizes: Dict[str, float]
+) -> Dict[str, Dict[str, float]]:
+    """
+    Spread, quote depth within DEPTH_BAND_PERCENT of the mid price and slippage
+    of a market order of `order_sizes[symbol]` (quote currency) per symbol.
+
+    Slippage is the worse of buying and selling the order size, measured
+    from the best price; it is NaN when the fetched book cannot fill it.
+    Symbols with an empty side are left out.
+    """
+    symbols = [s for s in order_sizes if s in books and len(books[s].bids) and len(books[s].asks)]
+    if not symbols:
+        return {}
+    bid_price, bid_quantity = stack_book_side([books[s] for s in symbols], 'bids')
+    ask_price, ask_quantity = stack_book_side([books[s] for s in symbols], 'asks')
+    size = np.array([order_sizes[s] for s in symbols], dtype=float)
+
+    best_bid, best_ask = bid_price[:, 0], ask_price[:, 0]
+    mid = (best_bid + best_ask) / 2
+    spread = (best_ask - best_bid) / mid * 100
+
+    # NaN padding compares False, so it never counts towards depth
+    band = DEPTH_BAND_PERCENT / 100
+    with np.errstate(invalid='ignore'):
+        bid_depth = np.where(bid_price >= (mid * (1 - band))[:, None], bid_price * bid_quantity, 0).sum(axis=1)
+        ask_depth = np.where(ask_price <= (mid * (1 + band))[:, None], ask_price * ask_quantity, 0).sum(axis=1)
+
+    # NaN, unfillable, on either side propagates
+    slippage = np.maximum(_buy_slippage(ask_price, ask_quantity, size), _sell_slippage(bid_price, bid_quantity, size / mid))
+
+    return {symbol: {
+        'spread_percent': float(spread[i]),
+        'depth_1pct': float(bid_depth[i] + ask_depth[i]),
+        'slippage_percent': float(slippage[i])
+    } for i, symbol in enumerate(symbols)}
@@ -1,15 +1,46 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 import data_fetcher
 import trading_logic
+import symbol_index
+import pagination
+import snapshots
+import downsample
+import alerts
+import categories
+import scans
+import timeseries
+import upstream
+import workers
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Serve the last good snapshot if the upstream APIs are down at startup
+    snapshots.load_last_good()
+    # Sector membership cached on disk; expired categories refresh in the background
+    categories.load_category_index()
+    # Evaluate watch lists in the background on every candle close
+    alerts.load_watchlists()
+    alert_loop = asyncio.create_task(alerts.run_alert_loop())
+    # Record market metrics, sector averages and signal counts over time
+    timeseries.load()
+    history_recorder = asyncio.create_task(snapshots.run_history_recorder())
+    yield
+    alert_loop.cancel()
+    history_recorder.cancel()
+    workers.shutdown()
 
 app = FastAPI(
     title="Crypto Trading Insights API",
     description="API for cryptocurrency trading insights and signals",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Enable CORS
@@ -21,12 +52,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp is not None else None
+
+@app.middleware("http")
+async def flag_stale_responses(request: Request, call_next):
+    """Mark responses built from last good data while an upstream API is unavailable"""
+    with upstream.track() as tracker:
+        response = await call_next(request)
+    if tracker['stale_since'] is not None:
+        response.headers["X-Stale-Since"] = _isoformat(tracker['stale_since'])
+    return response
+
 @app.get("/")
 async def root():
     return {
         "message": "Crypto Trading Insights API",
         "status": "online",
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now().isoformat(),
+        "upstream": upstream.breaker_status()
     }
 
 @app.get("/trading-pairs")
@@ -34,33 +78,97 @@ async def get_trading_pairs(
     min_volatility: float = Query(0.5, description="Minimum volatility percentage"),
     max_volatility: float = Query(5.0, description="Maximum volatility percentage"),
     min_volume: float = Query(1000000, description="Minimum 24h volume in USD"),
-    limit: int = Query(20, description="Number of results to return")
+    limit: int = Query(20, ge=1, description="Number of results to return"),
+    simulate: bool = Query(False, description="Rank pairs by simulated grid bot profit"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page (an offset into the current ranking)"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
+    response_format: str = Query("rows", alias="format", description="Response layout: rows or columns")
 ):
     try:
-        pairs = await trading_logic.identify_grid_trading_pairs(
-            min_volatility=min_volatility,
-            max_volatility=max_volatility,
-            min_volume=min_volume,
-            limit=limit
+        offset = pagination.decode_cursor(cursor)
+        metrics = {}
+        # Filters inside the snapshot universe are answered from its index
+        indexed = None if simulate else await snapshots.query_grid_pairs(
+            min_volatility, max_volatility, min_volume, offset + limit + 1
         )
+        if indexed is not None:
+            pairs = indexed['pairs']
+            metrics['snapshot_version'] = indexed['version']
+            metrics['stale_since'] = _isoformat(indexed['stale_since'])
+        else:
+            pairs = await trading_logic.identify_grid_trading_pairs(
+                min_volatility=min_volatility,
+                max_volatility=max_volatility,
+                min_volume=min_volume,
+                limit=offset + limit + 1,
+                simulate=simulate,
+                metrics=metrics
+            )
         return {
             "timestamp": datetime.now().isoformat(),
-            "pairs": pairs
+            **pagination.paginate(pairs, offset, limit, pagination.parse_fields(fields), response_format, key="pairs"),
+            "metrics": metrics
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching trading pairs: {str(e)}")
 
+@app.post("/scans")
+async def submit_scan(
+    min_volatility: float = Query(0.5, description="Minimum volatility percentage"),
+    max_volatility: float = Query(5.0, description="Maximum volatility percentage"),
+    min_volume: float = Query(1000000, description="Minimum 24h volume in USD"),
+    limit: int = Query(20, ge=1, description="Number of results to return"),
+    simulate: bool = Query(False, description="Rank pairs by simulated grid bot profit")
+):
+    try:
+        job = scans.submit_scan(min_volatility, max_volatility, min_volume, limit, simulate)
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "scan": job
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except scans.ScanQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error submitting scan: {str(e)}")
+
+@app.get("/scans/{scan_id}")
+async def get_scan(
+    scan_id: str,
+    request: Request,
+    stream: bool = Query(False, description="Stream progress and partial results as server-sent events")
+):
+    job = scans.get_scan(scan_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown scan: {scan_id}")
+    if stream:
+        return StreamingResponse(scans.scan_events(scan_id, request.is_disconnected), media_type="text/event-stream")
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "scan": job
+    }
+
 @app.get("/ai-tokens")
 async def get_ai_tokens(
     min_market_cap: int = Query(1000000, description="Minimum market cap in USD"),
-    limit: int = Query(20, description="Number of results to return")
+    limit: int = Query(20, ge=1, description="Number of results to return"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page (an offset into the current ranking)"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
+    response_format: str = Query("rows", alias="format", description="Response layout: rows or columns")
 ):
     try:
-        tokens = await data_fetcher.get_ai_tokens(min_market_cap=min_market_cap, limit=limit)
+        offset = pagination.decode_cursor(cursor)
+        tokens = await data_fetcher.get_ai_tokens(min_market_cap=min_market_cap, limit=offset + limit + 1)
+        tokens = await symbol_index.annotate_binance_pairs(tokens)
         return {
             "timestamp": datetime.now().isoformat(),
-            "tokens": tokens
+            **pagination.paginate(tokens, offset, limit, pagination.parse_fields(fields), response_format, key="tokens")
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching AI tokens: {str(e)}")
 
@@ -78,17 +186,255 @@ async def get_market_trends():
 @app.get("/trade-signals")
 async def get_trade_signals(
     pairs: Optional[str] = Query(None, description="Comma-separated list of trading pairs (e.g., BTCUSDT,ETHUSDT)"),
-    limit: int = Query(10, description="Number of signals to return")
+    limit: int = Query(10, ge=1, description="Number of signals to return"),
+    ai_tokens: bool = Query(False, description="Only analyse the Binance pairs of tracked AI tokens"),
+    scan: bool = Query(False, description="Scan every USDT pair instead of the top pairs by volume"),
+    budget_ms: int = Query(trading_logic.DEFAULT_SCAN_BUDGET_MS, description="Latency budget of a full scan in milliseconds"),
+    timeframes: Optional[str] = Query(None, description="Comma-separated timeframes to combine (15m,1h,4h,1d); enables multi-timeframe signals"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page (an offset into the current ranking)"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
+    response_format: str = Query("rows", alias="format", description="Response layout: rows or columns")
 ):
     try:
+        offset = pagination.decode_cursor(cursor)
+        field_list = pagination.parse_fields(fields)
+        if scan:
+            result = await trading_logic.scan_trade_signals(limit=offset + limit + 1, budget_ms=budget_ms)
+            return {
+                "timestamp": datetime.now().isoformat(),
+                **pagination.paginate(result['signals'], offset, limit, field_list, response_format, key="signals"),
+                "scan": result['scan']
+            }
+        
         pair_list = pairs.split(",") if pairs else None
-        signals = await trading_logic.generate_trade_signals(pairs=pair_list, limit=limit)
+        if ai_tokens and not pair_list:
+            pair_list = await trading_logic.get_ai_token_pairs()
+        if timeframes:
+            signals = await trading_logic.generate_multi_timeframe_signals(
+                pairs=pair_list,
+                timeframes=trading_logic.parse_timeframes(timeframes),
+                limit=offset + limit + 1
+            )
+        else:
+            signals = await trading_logic.generate_trade_signals(pairs=pair_list, limit=offset + limit + 1)
         return {
             "timestamp": datetime.now().isoformat(),
-            "signals": signals
+            **pagination.paginate(signals, offset, limit, field_list, response_format, key="signals")
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating trade signals: {str(e)}")
 
+@app.put("/watchlists/{name}")
+async def put_watchlist(
+    name: str,
+    symbols: str = Query(..., description="Comma-separated list of trading pairs to watch"),
+    interval: str = Query("1h", description="Candle interval whose closes trigger re-evaluation"),
+    webhook: Optional[str] = Query(None, description="Local URL that receives alerts as JSON POSTs")
+):
+    try:
+        watchlist = await alerts.put_watchlist(name, symbols.split(","), interval, webhook)
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "watchlist": watchlist
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error saving watch list: {str(e)}")
+
+@app.get("/watchlists/{name}")
+async def get_watchlist(name: str):
+    watchlist = alerts.get_watchlist(name)
+    if watchlist is None:
+        raise HTTPException(status_code=404, detail=f"Unknown watch list: {name}")
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "watchlist": watchlist
+    }
+
+@app.delete("/watchlists/{name}")
+async def delete_watchlist(name: str):
+    if not await alerts.delete_watchlist(name):
+        raise HTTPException(status_code=404, detail=f"Unknown watch list: {name}")
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "deleted": name
+    }
+
+@app.get("/watchlists/{name}/alerts")
+async def get_watchlist_alerts(
+    name: str,
+    limit: int = Query(alerts.ALERT_HISTORY, ge=1, description="Number of recent alerts to return")
+):
+    if alerts.get_watchlist(name) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown watch list: {name}")
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "alerts": alerts.recent_alerts(name, limit)
+    }
+
+@app.get("/watchlists/{name}/stream")
+async def stream_watchlist_alerts(name: str, request: Request):
+    if alerts.get_watchlist(name) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown watch list: {name}")
+    return StreamingResponse(alerts.alert_events(name, request.is_disconnected), media_type="text/event-stream")
+
+@app.get("/snapshot/version")
+async def get_snapshot_version():
+    try:
+        snapshot = await snapshots.get_dashboard_snapshot()
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "version": snapshot["version"],
+            "stale_since": _isoformat(snapshot["stale_since"])
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building dashboard snapshot: {str(e)}")
+
+@app.get("/snapshot")
+async def get_snapshot(
+    tables: Optional[str] = Query(None, description="Comma-separated subset of trends,pairs,ai_tokens,signals")
+):
+    try:
+        names = pagination.parse_fields(tables) or ["trends", *snapshots.DASHBOARD_TABLES]
+        unknown = [name for name in names if name != "trends" and name not in snapshots.DASHBOARD_TABLES]
+        if unknown:
+            raise ValueError(f"Unknown snapshot tables: {', '.join(unknown)}")
+        snapshot = await snapshots.get_dashboard_snapshot()
+        body = {
+            "timestamp": datetime.now().isoformat(),
+            "version": snapshot["version"],
+            "stale_since": _isoformat(snapshot["stale_since"])
+        }
+        for name in names:
+            # Tables are sent as columns, trends as-is
+            body[name] = snapshot[name] if name == "trends" else pagination.to_columns(snapshot[name])
+        return body
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building dashboard snapshot: {str(e)}")
+
+# The backtester and the correlation engine are imported on first use, so their
+# endpoints spell out the modules' defaults and bounds (kept in sync by tests)
+@app.get("/backtest")
+async def get_backtest(
+    pairs: Optional[str] = Query(None, description="Comma-separated list of trading pairs (defaults to all USDT pairs)"),
+    interval: str = Query("1h", description="Kline interval to replay"),
+    candles: int = Query(1000, ge=21, le=5000, description="Number of historical candles per symbol"),
+    fee_rate: float = Query(0.001, description="Fee charged per position change"),
+    allow_short: bool = Query(False, description="Go short on sell signals instead of exiting"),
+    limit: int = Query(50, ge=1, description="Number of results to return"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page (an offset into the current ranking)"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
+    response_format: str = Query("rows", alias="format", description="Response layout: rows or columns")
+):
+    import backtester  # deferred: only needed for backtests
+    try:
+        offset = pagination.decode_cursor(cursor)
+        pair_list = pairs.split(",") if pairs else None
+        results = await backtester.backtest_signals(
+            symbols=pair_list,
+            interval=interval,
+            candles=candles,
+            fee_rate=fee_rate,
+            allow_short=allow_short,
+            limit=offset + limit + 1
+        )
+        return {
+            "timestamp": datetime.now().isoformat(),
+            **pagination.paginate(results, offset, limit, pagination.parse_fields(fields), response_format, key="results")
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error running backtest: {str(e)}")
+
+@app.get("/price-history")
+async def get_price_history(
+    symbol: str = Query(..., description="Trading pair, e.g. BTCUSDT"),
+    interval: str = Query("1h", description="Kline interval"),
+    candles: int = Query(720, description="Number of historical candles"),
+    max_points: Optional[int] = Query(None, description="Downsample to at most this many points"),
+    method: str = Query("lttb", description="Downsampling method: lttb or minmax")
+):
+    try:
+        history = await downsample.get_price_history(
+            symbol=symbol.upper(),
+            interval=interval,
+            candles=candles,
+            max_points=max_points,
+            method=method
+        )
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "history": history
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching price history: {str(e)}")
+
+@app.get("/history/{series}")
+async def get_history(
+    series: str,
+    hours: float = Query(24, gt=0, description="Length of the range in hours"),
+    end: Optional[datetime] = Query(None, description="End of the range (defaults to now)"),
+    resolution: Optional[str] = Query(None, description="raw, 1h or 1d (defaults to the finest with at most max_points points)"),
+    max_points: int = Query(timeseries.DEFAULT_MAX_POINTS, ge=1, description="Point budget when choosing the resolution")
+):
+    try:
+        end_ts = end.timestamp() if end is not None else datetime.now().timestamp()
+        history = timeseries.query(series, end_ts - hours * 3600, end_ts, resolution, max_points)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error querying history: {str(e)}")
+    if history is None:
+        raise HTTPException(status_code=404, detail=f"Unknown series: {series}, expected one of {', '.join(timeseries.series_names())}")
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "history": history
+    }
+
+@app.get("/correlations")
+async def get_correlations(
+    pairs: Optional[str] = Query(None, description="Comma-separated list of trading pairs (defaults to all USDT pairs)"),
+    interval: str = Query("1h", description="Kline interval of the returns"),
+    window: int = Query(168, description="Number of returns in the rolling window")
+):
+    import correlations  # deferred: only needed for correlations
+    try:
+        pair_list = pairs.split(",") if pairs else None
+        result = await correlations.get_correlations(pairs=pair_list, interval=interval, window=window)
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "correlations": result
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing correlations: {str(e)}")
+
+@app.get("/correlations/clusters")
+async def get_correlation_clusters(
+    interval: str = Query("1h", description="Kline interval of the returns"),
+    window: int = Query(168, description="Number of returns in the rolling window"),
+    threshold: float = Query(0.7, description="Minimum correlation with the cluster leader")
+):
+    import correlations  # deferred: only needed for correlations
+    try:
+        result = await correlations.get_clusters(interval=interval, window=window, threshold=threshold)
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "clusters": result
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error clustering pairs: {str(e)}")
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,22 @@
+import numpy as np
+from numba import njit, prange
+
+# JIT-compiled kernels used by indicators.py. Kept in their own module so
+# importing numba (several hundred ms) only happens on first use.
+
+@njit(parallel=True, cache=True)
+def ewm(data, alpha, min_periods):
+    """Recursive exponential smoothing, one symbol per thread"""
+    n, m = data.shape
+    out = np.full((n, m), np.nan)
+    for i in prange(n):
+        state = np.nan
+        count = 0
+        for t in range(m):
+            x = data[i, t]
+            if not np.isnan(x):
+                state = x if np.isnan(state) else alpha * x + (1 - alpha) * state
+                count += 1
+            if count >= min_periods:
+                out[i, t] = state
+    return out
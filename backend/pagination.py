@@ -0,0 +1,79 @@
+import base64
+import json
+from typing import List, Dict, Any, Optional
+
+# Supported response layouts for list endpoints
+RESPONSE_FORMATS = ("rows", "columns")
+
+# Cursors are offsets into a ranking that is recomputed on every request, not
+# snapshots of it: if the underlying data changes between two page requests,
+# rows that moved across the page boundary are skipped or repeated.
+
+def encode_cursor(offset: int) -> str:
+    """Opaque cursor pointing at the item at `offset` of a ranked result list"""
+    payload = json.dumps({"offset": offset}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    """Offset encoded in a cursor; raises ValueError on a malformed cursor"""
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = int(json.loads(base64.urlsafe_b64decode(padded))["offset"])
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if offset < 0:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return offset
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated `fields=` parameter; None means all fields"""
+    if not fields:
+        return None
+    return [f.strip() for f in fields.split(",") if f.strip()]
+
+def project(rows: List[Dict[str, Any]], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Keep only the requested fields of each row"""
+    if not fields:
+        return rows
+    return [{f: row.get(f) for f in fields} for row in rows]
+
+def to_columns(rows: List[Dict[str, Any]], fields: Optional[List[str]] = None) -> Dict[str, List[Any]]:
+    """Convert row dicts to one array per field"""
+    if fields is None:
+        fields = list(rows[0].keys()) if rows else []
+    return {f: [row.get(f) for row in rows] for f in fields}
+
+def paginate(
+    items: List[Dict[str, Any]],
+    offset: int,
+    limit: int,
+    fields: Optional[List[str]] = None,
+    response_format: str = "rows",
+    key: str = "items"
+) -> Dict[str, Any]:
+    """
+    Slice a ranked result list into one page stored under `key`, either as
+    row dicts or (with the "columns" format) as one array per field.
+
+    `items` should hold at least offset + limit + 1 entries when more pages
+    exist, so callers compute one item past the page to detect the end.
+    """
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f"Unknown format: {response_format}")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+
+    page = items[offset:offset + limit]
+    has_more = len(items) > offset + limit
+
+    body = {
+        "count": len(page),
+        "next_cursor": encode_cursor(offset + limit) if has_more else None
+    }
+    if response_format == "columns":
+        body[key] = to_columns(page, fields)
+    else:
+        body[key] = project(page, fields)
+    return body
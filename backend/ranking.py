@@ -0,0 +1,64 @@
+import heapq
+import numpy as np
+from typing import List, Dict, Any, Sequence, Tuple, Callable, Union
+
+# A sort key is a field name or a callable, paired with whether it sorts descending
+SortKey = Tuple[Union[str, Callable], bool]
+
+def _key_function(keys: Sequence[SortKey]) -> Callable:
+    """Composite ascending key; descending keys are negated, so they must be numeric"""
+    getters = [(k if callable(k) else (lambda item, f=k: item.get(f, 0)), desc) for k, desc in keys]
+
+    def key(item):
+        values = []
+        for getter, desc in getters:
+            value = getter(item)
+            if value is None:
+                value = float('-inf') if desc else float('inf')
+            values.append(-value if desc else value)
+        return tuple(values)
+
+    return key
+
+def top_k(items: Sequence[Dict[str, Any]], k: int, keys: Sequence[SortKey]) -> List[Dict[str, Any]]:
+    """
+    Return the best `k` items ordered by `keys` without sorting or mutating
+    the input. Equal items keep their input order, as with a stable sort.
+    """
+    if k <= 0:
+        return []
+    key = _key_function(keys)
+    if k >= len(items):
+        return sorted(items, key=key)
+    return heapq.nsmallest(k, items, key=key)
+
+def top_k_indices(columns: Dict[str, np.ndarray], k: int, keys: Sequence[Tuple[str, bool]]) -> np.ndarray:
+    """
+    Indices of the best `k` rows of columnar arrays, ordered by `keys`.
+
+    The primary key is partitioned with np.argpartition; only rows tied with
+    or better than the k-th value are fully sorted on all keys.
+    """
+    primary_field, primary_desc = keys[0]
+    primary = np.asarray(columns[primary_field], dtype=float)
+    primary = np.where(np.isnan(primary), np.inf if not primary_desc else -np.inf, primary)
+    primary = -primary if primary_desc else primary
+    n = len(primary)
+
+    if k <= 0 or n == 0:
+        return np.array([], dtype=int)
+
+    if k < n:
+        kth = primary[np.argpartition(primary, k - 1)[k - 1]]
+        candidates = np.flatnonzero(primary <= kth)
+    else:
+        candidates = np.arange(n)
+
+    # np.lexsort sorts by the last key first; row order breaks remaining ties
+    sort_keys = [primary[candidates]]
+    for field, desc in keys[1:]:
+        values = np.asarray(columns[field])[candidates]
+        sort_keys.append(-values if desc else values)
+    order = np.lexsort([candidates] + sort_keys[::-1])
+
+    return candidates[order][:k]
@@ -0,0 +1,128 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, TypedDict
+
+# Compact record types. Upstream payloads are parsed once, when they are
+# fetched, so cached data holds numbers instead of the strings Binance sends.
+
+@dataclass(frozen=True, slots=True)
+class Ticker:
+    """24h ticker of a Binance symbol"""
+    symbol: str
+    last_price: float
+    price_change_percent: float
+    high_price: float
+    low_price: float
+    volume: float
+    quote_volume: float
+
+    @classmethod
+    def from_binance(cls, row: Dict[str, Any]) -> "Ticker":
+        return cls(
+            symbol=row['symbol'],
+            last_price=float(row.get('lastPrice') or 0),
+            price_change_percent=float(row.get('priceChangePercent') or 0),
+            high_price=float(row.get('highPrice') or 0),
+            low_price=float(row.get('lowPrice') or 0),
+            volume=float(row.get('volume') or 0),
+            quote_volume=float(row.get('quoteVolume') or 0)
+        )
+
+def parse_tickers(data: Any) -> Any:
+    """Parse a /ticker/24hr response into Tickers"""
+    if not isinstance(data, list):
+        return data
+    return [Ticker.from_binance(row) for row in data]
+
+# One candle per row, fields in Binance kline column order, so k[0] is the
+# open time and k[4] the close, as in the raw response
+CANDLE_DTYPE = np.dtype([
+    ('open_time', 'i8'), ('open', 'f8'), ('high', 'f8'), ('low', 'f8'),
+    ('close', 'f8'), ('volume', 'f8'), ('close_time', 'i8'), ('quote_volume', 'f8')
+])
+CANDLE_FIELDS = CANDLE_DTYPE.names
+
+def parse_klines(data: Any) -> Any:
+    """Parse a /klines response into a candle array"""
+    if not isinstance(data, list):
+        return data
+    return np.array([tuple(row[:len(CANDLE_FIELDS)]) for row in data], dtype=CANDLE_DTYPE)
+
+def empty_candles() -> np.ndarray:
+    return np.empty(0, dtype=CANDLE_DTYPE)
+
+# One price level of an order book side
+BOOK_LEVEL_DTYPE = np.dtype([('price', 'f8'), ('quantity', 'f8')])
+
+@dataclass(frozen=True, slots=True)
+class OrderBook:
+    """Depth snapshot of a Binance symbol, best level first on both sides"""
+    last_update_id: int
+    bids: np.ndarray
+    asks: np.ndarray
+
+    @classmethod
+    def from_binance(cls, data: Dict[str, Any]) -> "OrderBook":
+        return cls(
+            last_update_id=int(data.get('lastUpdateId') or 0),
+            bids=np.array([tuple(level[:2]) for level in data['bids']], dtype=BOOK_LEVEL_DTYPE),
+            asks=np.array([tuple(level[:2]) for level in data['asks']], dtype=BOOK_LEVEL_DTYPE)
+        )
+
+def parse_depth(data: Any) -> Any:
+    """Parse a /depth response into an OrderBook"""
+    if not isinstance(data, dict) or 'bids' not in data or 'asks' not in data:
+        return data
+    return OrderBook.from_binance(data)
+
+# Result rows are the API payload: paginated, published as Arrow tables and
+# serialized as JSON, so they stay dicts with these keys
+
+class GridPairResult(TypedDict, total=False):
+    symbol: str
+    current_price: float
+    avg_hourly_volatility: float
+    volume_24h: float
+    price_range_low: float
+    price_range_high: float
+    range_width_percent: float
+    suggested_grid_levels: int
+    estimated_profit_potential: float
+    # Order book liquidity; None when the book could not be fetched
+    spread_percent: Optional[float]
+    depth_1pct: Optional[float]
+    slippage_percent: Optional[float]
+    liquidity_adjusted_profit: float
+    # Only with simulate=True: a grid fit on the previous window, replayed on the
+    # last one; None when the history is too short
+    simulated_profit_percent: Optional[float]
+    simulated_unrealized_percent: Optional[float]
+    simulated_fills: Optional[int]
+    capital_utilization: Optional[float]
+    simulated_grid_levels: Optional[int]
+    simulated_grid_spacing: Optional[str]
+
+class Signal(TypedDict, total=False):
+    symbol: str
+    signal: str
+    confidence: float
+    current_price: float
+    price_change_1h: float
+    momentum: float
+    fast_ma: float
+    slow_ma: float
+    volume_change: float
+    # Only for multi-timeframe signals
+    alignment: float
+    timeframes: Dict[str, Dict[str, Any]]
+
+class AiToken(TypedDict, total=False):
+    id: str
+    symbol: str
+    name: str
+    current_price: float
+    market_cap: float
+    price_change_24h: float
+    volume_24h: float
+    image: str
+    binance_symbol: str
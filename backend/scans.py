@@ -0,0 +1,182 @@
+import json
+import time
+import uuid
+import asyncio
+import logging
+from typing import Dict, Any, Optional, AsyncIterator, Callable, Awaitable
+import trading_logic
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Grid pair scans run as background jobs. At most SCAN_WORKERS run at once,
+# identical parameter sets share one job and completed results are reused
+# for SCAN_RESULT_TTL seconds.
+SCAN_WORKERS = 2
+MAX_PENDING_SCANS = 20      # queued and running jobs
+MAX_SCAN_LIMIT = 1000
+SCAN_RESULT_TTL = 300       # seconds a completed scan answers identical requests
+SCAN_RETENTION = 3600       # seconds a finished job stays readable
+MAX_RETAINED_SCANS = 200    # finished jobs kept, oldest dropped first
+SSE_KEEPALIVE = 15          # seconds between keep-alive comments on idle streams
+
+class ScanQueueFull(Exception):
+    """Raised when MAX_PENDING_SCANS jobs are already queued or running"""
+
+_jobs: Dict[str, Dict[str, Any]] = {}   # job id -> job
+_keys: Dict[str, str] = {}              # job id -> normalized parameters
+_active: Dict[str, str] = {}            # normalized parameters -> id of the queued or running job
+_completed: Dict[str, str] = {}         # normalized parameters -> id of the last completed job
+_updated: Dict[str, asyncio.Event] = {} # job id -> set on the job's next change
+_tasks = set()
+_slots = asyncio.Semaphore(SCAN_WORKERS)
+
+def _params_key(params: Dict[str, Any]) -> str:
+    """Numbers are normalized so 1000000 and 1000000.0 are the same scan"""
+    canonical = {k: float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else v
+                 for k, v in params.items()}
+    return json.dumps(canonical, sort_keys=True)
+
+def _notify(job_id: str):
+    """Wake the streams waiting on a job"""
+    event = _updated.get(job_id)
+    if event is not None:
+        _updated[job_id] = asyncio.Event()
+        event.set()
+
+def _prune(now: float):
+    """Drop expired cache entries and finished jobs past their retention"""
+    for key, job_id in list(_completed.items()):
+        if now - _jobs[job_id]['finished_at'] >= SCAN_RESULT_TTL:
+            del _completed[key]
+
+    finished = sorted((job for job in _jobs.values() if job['finished_at'] is not None),
+                      key=lambda job: job['finished_at'])
+    excess = len(finished) - MAX_RETAINED_SCANS
+    for i, job in enumerate(finished):
+        if i >= excess and now - job['finished_at'] < SCAN_RETENTION:
+            break
+        key = _keys.pop(job['id'])
+        if _completed.get(key) == job['id']:
+            del _completed[key]
+        del _jobs[job['id']]
+        _updated.pop(job['id'], None)
+
+def submit_scan(
+    min_volatility: float = 0.5,
+    max_volatility: float = 5.0,
+    min_volume: float = 1000000,
+    limit: int = 20,
+    simulate: bool = False
+) -> Dict[str, Any]:
+    """
+    Queue a grid pair scan and return its job. A queued or running scan with
+    the same parameters, or one completed within SCAN_RESULT_TTL, is
+    returned instead of starting a new one.
+    """
+    if min_volatility > max_volatility:
+        raise ValueError("min_volatility must not exceed max_volatility")
+    if min_volume < 0:
+        raise ValueError("min_volume must not be negative")
+    if not 1 <= limit <= MAX_SCAN_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_SCAN_LIMIT}")
+
+    params = {
+        'min_volatility': min_volatility,
+        'max_volatility': max_volatility,
+        'min_volume': min_volume,
+        'limit': limit,
+        'simulate': simulate
+    }
+    key = _params_key(params)
+    now = time.time()
+    _prune(now)
+
+    job_id = _active.get(key) or _completed.get(key)
+    if job_id is not None:
+        return _jobs[job_id]
+
+    if len(_active) >= MAX_PENDING_SCANS:
+        raise ScanQueueFull(f"{MAX_PENDING_SCANS} scans are already pending, try again later")
+
+    job = {
+        'id': uuid.uuid4().hex,
+        'status': 'queued',
+        'params': params,
+        'created_at': now,
+        'started_at': None,
+        'finished_at': None,
+        'progress': {'symbols_total': None, 'symbols_done': 0, 'candidates': 0},
+        'result': [],
+        'metrics': {},
+        'error': None
+    }
+    _jobs[job['id']] = job
+    _keys[job['id']] = key
+    _active[key] = job['id']
+    _updated[job['id']] = asyncio.Event()
+
+    task = asyncio.create_task(_run_scan(job))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
+
+async def _run_scan(job: Dict[str, Any]):
+    job_id = job['id']
+    key = _keys[job_id]
+
+    def on_progress(progress: Dict[str, Any]):
+        # The ranking so far is served as a partial result
+        job['progress'] = {k: progress[k] for k in ('symbols_total', 'symbols_done', 'candidates')}
+        job['result'] = progress['partial']
+        _notify(job_id)
+
+    try:
+        async with _slots:
+            job['status'] = 'running'
+            job['started_at'] = time.time()
+            _notify(job_id)
+            job['result'] = await trading_logic.identify_grid_trading_pairs(
+                **job['params'], metrics=job['metrics'], progress=on_progress
+            )
+            job['status'] = 'completed'
+    except asyncio.CancelledError:
+        job['status'] = 'failed'
+        job['error'] = 'cancelled'
+        raise
+    except Exception as e:
+        logger.error(f"Error running scan {job_id}: {str(e)}")
+        job['status'] = 'failed'
+        job['error'] = str(e)
+    finally:
+        job['finished_at'] = time.time()
+        if _active.get(key) == job_id:
+            del _active[key]
+        if job['status'] == 'completed':
+            _completed[key] = job_id
+        _notify(job_id)
+
+def get_scan(job_id: str) -> Optional[Dict[str, Any]]:
+    return _jobs.get(job_id)
+
+async def scan_events(job_id: str, is_disconnected: Callable[[], Awaitable[bool]]) -> AsyncIterator[str]:
+    """
+    Server-sent events for a job: its state after every change, ending with
+    a `completed` or `failed` event
+    """
+    updated = None
+    while not await is_disconnected():
+        job = _jobs.get(job_id)
+        if job is None:
+            return
+        if updated is None or updated.is_set():
+            updated = _updated.get(job_id)
+            event = job['status'] if job['finished_at'] is not None else 'progress'
+            yield f"event: {event}\ndata: {json.dumps(job)}\n\n"
+            if job['finished_at'] is not None or updated is None:
+                return
+        try:
+            await asyncio.wait_for(updated.wait(), timeout=SSE_KEEPALIVE)
+        except asyncio.TimeoutError:
+            yield ": keep-alive\n\n"
@@ -0,0 +1,285 @@
+import os
+import json
+import hashlib
+import importlib.util
+import logging
+import tempfile
+import asyncio
+import contextvars
+import time
+from typing import List, Dict, Any, Optional
+import data_fetcher
+import trading_logic
+import symbol_index
+import grid_index
+import timeseries
+import upstream
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# pyarrow is optional for the backend; without it nothing is published and
+# the dashboard reads everything over HTTP. It is imported on first publish.
+ARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# Directory shared with the Streamlit app when both run on the same host
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", os.path.join(tempfile.gettempdir(), "eolas_snapshots"))
+
+# Dashboard snapshot: the unfiltered data behind every dashboard page, rebuilt
+# at most once per DASHBOARD_SNAPSHOT_EXPIRY and identified by a version.
+# The dashboard filters it locally, so the universes below span the full
+# range of its filter widgets.
+DASHBOARD_SNAPSHOT_EXPIRY = 60  # seconds
+DASHBOARD_TABLES = ("pairs", "ai_tokens", "signals")
+GRID_UNIVERSE = {'min_volatility': 0.1, 'max_volatility': 20.0, 'min_volume': 100_000, 'limit': 1000}
+AI_TOKEN_UNIVERSE = {'min_market_cap': 1_000_000, 'limit': 50}
+SIGNAL_UNIVERSE_LIMIT = 50
+
+# The last good snapshot is persisted, so an upstream outage, even right
+# after a restart, is answered with stale data instead of empty tables
+LAST_GOOD_FILE = os.environ.get("DASHBOARD_LAST_GOOD_FILE", os.path.join(SNAPSHOT_DIR, "dashboard_last_good.json"))
+
+# Dashboard metrics are recorded into the time-series store at this interval,
+# rebuilding the snapshot if no dashboard request did so in the meantime
+HISTORY_INTERVAL = 300  # seconds
+
+_dashboard = {
+    'version': None, 'built_at': 0, 'trends': {}, 'pairs': [], 'ai_tokens': [], 'signals': [],
+    'grid_index': None,
+    'as_of': {},          # table -> time of the data it holds
+    'stale_since': None   # oldest as_of among tables served from a fallback
+}
+_rebuild_task: Optional[asyncio.Task] = None
+
+def snapshot_name(endpoint: str, params: Dict[str, Any]) -> str:
+    """
+    File name of the snapshot for an endpoint and its query parameters.
+    Numbers are normalized so 1000000 and 1000000.0 map to the same file.
+    Must stay in sync with pages/snapshot_reader.py.
+    """
+    canonical = {k: float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else v
+                 for k, v in params.items() if v is not None}
+    digest = hashlib.sha1(json.dumps(canonical, sort_keys=True).encode()).hexdigest()[:16]
+    return f"{endpoint.strip('/').replace('-', '_')}-{digest}.arrow"
+
+def _write_snapshot(path: str, rows: List[Dict[str, Any]]):
+    """Write rows as an Arrow IPC file, atomically replacing any previous one"""
+    import pyarrow as pa
+    table = pa.Table.from_pylist(rows)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    # Readers that already mapped the old file keep a valid mapping
+    os.replace(tmp_path, path)
+
+async def publish(endpoint: str, params: Dict[str, Any], rows: List[Dict[str, Any]]):
+    """Publish an endpoint's computed rows for same-host readers; never raises"""
+    if not ARROW_AVAILABLE or not rows:
+        return
+    path = os.path.join(SNAPSHOT_DIR, snapshot_name(endpoint, params))
+    try:
+        await asyncio.to_thread(_write_snapshot, path, rows)
+    except Exception as e:
+        logger.error(f"Error publishing snapshot {path}: {str(e)}")
+
+def _prune_snapshot_files(keep_versions: List[Optional[str]]):
+    """
+    Delete the dashboard table files of every version but `keep_versions`,
+    including those left by earlier processes. The previous version is kept
+    for readers that fetched its number just before the rebuild.
+    """
+    for table in DASHBOARD_TABLES:
+        keep = {os.path.basename(snapshot_name(f"/snapshot/{table}", {"version": v})) for v in keep_versions if v is not None}
+        # Every version of a table shares its directory and name prefix
+        directory, name = os.path.split(os.path.join(SNAPSHOT_DIR, snapshot_name(f"/snapshot/{table}", {})))
+        prefix = name.rsplit('-', 1)[0] + '-'
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            continue
+        for name in names:
+            if name.startswith(prefix) and name.endswith('.arrow') and name not in keep:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError as e:
+                    logger.error(f"Error deleting superseded snapshot {name}: {str(e)}")
+
+async def _tracked(coro) -> tuple:
+    """Result of `coro` and whether its data was stale or missing"""
+    with upstream.track() as tracker:
+        return await coro, tracker
+
+async def _annotated_ai_tokens() -> List[Dict[str, Any]]:
+    tokens = await data_fetcher.get_ai_tokens(**AI_TOKEN_UNIVERSE)
+    return await symbol_index.annotate_binance_pairs(tokens)
+
+async def _build_dashboard_snapshot():
+    """
+    Compute every dashboard dataset at once so they share one version. A
+    table whose upstream is down keeps its last good data and marks the
+    snapshot stale.
+    """
+    names = ("pairs", "ai_tokens", "trends", "signals")
+    results = await asyncio.gather(
+        _tracked(trading_logic.identify_grid_trading_pairs(**GRID_UNIVERSE)),
+        _tracked(_annotated_ai_tokens()),
+        _tracked(trading_logic.detect_market_trends()),
+        _tracked(trading_logic.generate_trade_signals(limit=SIGNAL_UNIVERSE_LIMIT))
+    )
+
+    built_at = time.time()
+    previous_version = _dashboard['version']
+    tables, as_of, stale = {}, {}, []
+    for name, (data, tracker) in zip(names, results):
+        # detect_market_trends reports failures in its result rather than by being empty
+        failed = (tracker['failed'] and not data) or (isinstance(data, dict) and 'error' in data)
+        if failed and _dashboard[name]:
+            logger.warning(f"Upstream unavailable, keeping the last good {name}")
+            tables[name], as_of[name] = _dashboard[name], _dashboard['as_of'].get(name, 0)
+            stale.append(as_of[name])
+        else:
+            tables[name], as_of[name] = data, tracker['stale_since'] or built_at
+            if tracker['stale_since'] is not None:
+                stale.append(tracker['stale_since'])
+
+    _set_dashboard(f"{int(built_at * 1000):x}", built_at, tables, as_of, min(stale, default=None))
+    for table in DASHBOARD_TABLES:
+        await publish(f"/snapshot/{table}", {"version": _dashboard['version']}, _dashboard[table])
+    if ARROW_AVAILABLE:
+        await asyncio.to_thread(_prune_snapshot_files, [previous_version, _dashboard['version']])
+    if not stale:
+        await _save_last_good()
+
+def _set_dashboard(version: str, built_at: float, tables: Dict[str, Any], as_of: Dict[str, float], stale_since: Optional[float]):
+    _dashboard.update(tables)
+    _dashboard.update({
+        'version': version, 'built_at': built_at, 'as_of': as_of, 'stale_since': stale_since,
+        'grid_index': grid_index.build_grid_index(tables['pairs'], GRID_UNIVERSE)
+    })
+
+def _write_last_good(data: Dict[str, Any]):
+    os.makedirs(os.path.dirname(LAST_GOOD_FILE), exist_ok=True)
+    tmp_path = f"{LAST_GOOD_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        # NumPy scalars are written as plain numbers
+        json.dump(data, f, default=lambda value: value.item() if hasattr(value, 'item') else str(value))
+    os.replace(tmp_path, LAST_GOOD_FILE)
+
+async def _save_last_good():
+    data = {name: _dashboard[name] for name in ("version", "trends", "as_of", *DASHBOARD_TABLES)}
+    try:
+        await asyncio.to_thread(_write_last_good, data)
+    except Exception as e:
+        logger.error(f"Error saving the last good dashboard snapshot: {str(e)}")
+
+def load_last_good():
+    """
+    Seed the dashboard with the persisted last good snapshot. It is served,
+    marked stale, until the first rebuild completes.
+    """
+    try:
+        with open(LAST_GOOD_FILE) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return
+    except Exception as e:
+        logger.error(f"Error loading the last good dashboard snapshot: {str(e)}")
+        return
+    tables = {name: data.get(name) or ({} if name == "trends" else []) for name in ("trends", *DASHBOARD_TABLES)}
+    as_of = data.get('as_of', {})
+    # built_at stays 0, so the first request starts a rebuild
+    _set_dashboard(data.get('version'), 0, tables, as_of, min(as_of.values(), default=None))
+
+async def _rebuild_dashboard_snapshot():
+    try:
+        await _build_dashboard_snapshot()
+    except Exception as e:
+        logger.error(f"Error building the dashboard snapshot: {str(e)}")
+
+def _start_rebuild() -> asyncio.Task:
+    """Start a background rebuild unless one is running"""
+    global _rebuild_task
+    if _rebuild_task is None or _rebuild_task.done():
+        # A fresh context, so the build's staleness is not attributed to the request that started it
+        _rebuild_task = asyncio.create_task(_rebuild_dashboard_snapshot(), context=contextvars.Context())
+    return _rebuild_task
+
+async def get_dashboard_snapshot(wait: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Return the dashboard snapshot. Once it is older than DASHBOARD_SNAPSHOT_EXPIRY
+    a rebuild starts in the background and the current snapshot is served until
+    it completes. Only when there is no snapshot at all does the caller wait for
+    the first build, or get None with `wait=False`.
+    """
+    if time.time() - _dashboard['built_at'] >= DASHBOARD_SNAPSHOT_EXPIRY:
+        rebuild = _start_rebuild()
+        if _dashboard['version'] is None:
+            if not wait:
+                return None
+            # Shielded: a disconnecting client must not cancel the shared build
+            await asyncio.shield(rebuild)
+    upstream.note_stale(_dashboard['stale_since'])
+    return _dashboard
+
+async def query_grid_pairs(
+    min_volatility: float,
+    max_volatility: float,
+    min_volume: float,
+    limit: int
+) -> Optional[Dict[str, Any]]:
+    """
+    Answer a grid pair query from the snapshot's candidate index, or return
+    None when the filters reach outside the indexed universe or no snapshot
+    has been built yet
+    """
+    if not grid_index.within(GRID_UNIVERSE, min_volatility, max_volatility, min_volume):
+        return None
+    # Never wait for a first build; a direct scan is much cheaper than the whole snapshot
+    snapshot = await get_dashboard_snapshot(wait=False)
+    if snapshot is None:
+        return None
+    index = snapshot['grid_index']
+    if index is None or index['truncated']:
+        return None
+    return {
+        'version': snapshot['version'],
+        'stale_since': snapshot['stale_since'],
+        'pairs': grid_index.query_grid_index(index, min_volatility, max_volatility, min_volume, limit)
+    }
+
+def _history_rows(trends: Dict[str, Any], signals: List[Dict[str, Any]]) -> Dict[str, Dict[str, Optional[float]]]:
+    """Rows of the market, sectors and signals series for one snapshot"""
+    metrics = trends.get('market_metrics') or {}
+    rows = {}
+    if metrics:
+        rows['market'] = {
+            'avg_top20_change': metrics.get('avg_top20_change'),
+            'avg_ai_token_change': metrics.get('avg_ai_token_change'),
+            # Rolled up, this is the share of the bucket the market was bullish
+            'bullish': 1.0 if metrics.get('market_direction') == 'bullish' else 0.0
+        }
+    if metrics.get('hot_sectors'):
+        rows['sectors'] = {sector['name']: sector['avg_change'] for sector in metrics['hot_sectors']}
+    if signals:
+        rows['signals'] = {
+            **{f"{label}_count": float(sum(1 for s in signals if s['signal'] == label)) for label in ('buy', 'sell', 'neutral')},
+            'avg_confidence': sum(s['confidence'] for s in signals) / len(signals)
+        }
+    return rows
+
+async def run_history_recorder():
+    """Record every HISTORY_INTERVAL the metrics of the current snapshot, unless it is stale"""
+    recorded_version = None
+    while True:
+        try:
+            snapshot = await get_dashboard_snapshot()
+            if snapshot['stale_since'] is None and snapshot['version'] != recorded_version:
+                for series, values in _history_rows(snapshot['trends'], snapshot['signals']).items():
+                    timeseries.append(series, snapshot['built_at'], values)
+                recorded_version = snapshot['version']
+        except Exception as e:
+            logger.error(f"Error recording dashboard history: {str(e)}")
+        await asyncio.sleep(HISTORY_INTERVAL)
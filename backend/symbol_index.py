@@ -0,0 +1,103 @@
+import asyncio
+import re
+import logging
+import time
+from typing import List, Dict, Any, Optional
+import data_fetcher
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Index configuration
+SYMBOL_INDEX_EXPIRY = 3600  # seconds
+SYMBOL_INDEX_MAX_PAGES = 20  # CoinGecko pages (by market cap) considered for mapping
+DEFAULT_QUOTE_ASSET = "USDT"
+
+# Binance lists some low-priced tokens in multiples, e.g. 1000PEPE
+_MULTIPLIER_PREFIX = re.compile(r'^(1000000|1000|1M)(?=[A-Z])')
+
+_index = {
+    'by_id': {},      # coingecko id -> {'symbol': ..., 'pairs': {quote: binance symbol}}
+    'by_symbol': {},  # ticker symbol -> coingecko id (highest market cap wins)
+    'by_pair': {},    # binance symbol -> {'coingecko_id': ..., 'base': ..., 'quote': ...}
+    'timestamp': 0
+}
+_refresh_lock = asyncio.Lock()
+
+def _normalize_base_asset(base_asset: str) -> str:
+    """Map a Binance base asset to the ticker CoinGecko uses"""
+    return _MULTIPLIER_PREFIX.sub('', base_asset.upper())
+
+async def refresh_symbol_index() -> Dict[str, Any]:
+    """
+    Rebuild the CoinGecko id <-> symbol <-> Binance pair index.
+
+    CoinGecko tickers are not unique, so the coin with the highest market cap
+    claims a ticker; the markets stream is already in market cap order.
+    """
+    markets = await data_fetcher.get_binance_markets()
+
+    pairs_by_base = {}
+    for market in markets:
+        base = _normalize_base_asset(market['base_asset'])
+        pairs_by_base.setdefault(base, {})[market['quote_asset']] = market['symbol']
+
+    by_id = {}
+    by_symbol = {}
+    async for page in data_fetcher.iter_coingecko_markets(max_pages=SYMBOL_INDEX_MAX_PAGES):
+        for coin in page:
+            symbol = (coin.get('symbol') or '').upper()
+            if not symbol or symbol in by_symbol:
+                continue
+            by_symbol[symbol] = coin['id']
+            by_id[coin['id']] = {'symbol': symbol, 'pairs': pairs_by_base.get(symbol, {})}
+
+    by_pair = {}
+    for base, quotes in pairs_by_base.items():
+        coin_id = by_symbol.get(base)
+        if coin_id is None:
+            continue
+        for quote, pair in quotes.items():
+            by_pair[pair] = {'coingecko_id': coin_id, 'base': base, 'quote': quote}
+
+    # Keep the previous index if an upstream outage produced an empty one
+    if by_id and by_pair:
+        _index.update(by_id=by_id, by_symbol=by_symbol, by_pair=by_pair, timestamp=time.time())
+        logger.info(f"Symbol index refreshed: {len(by_id)} coins, {len(by_pair)} Binance pairs")
+    else:
+        logger.warning("Symbol index refresh returned no data, keeping previous index")
+
+    return _index
+
+async def get_symbol_index() -> Dict[str, Any]:
+    """Return the symbol index, refreshing it once it is older than SYMBOL_INDEX_EXPIRY"""
+    if time.time() - _index['timestamp'] < SYMBOL_INDEX_EXPIRY:
+        return _index
+
+    async with _refresh_lock:
+        # Another request may have refreshed while we waited for the lock
+        if time.time() - _index['timestamp'] >= SYMBOL_INDEX_EXPIRY:
+            await refresh_symbol_index()
+    return _index
+
+def pair_for_coin(coingecko_id: str, quote: str = DEFAULT_QUOTE_ASSET) -> Optional[str]:
+    """Binance symbol trading the given CoinGecko coin against `quote`, if any"""
+    entry = _index['by_id'].get(coingecko_id)
+    return entry['pairs'].get(quote) if entry else None
+
+def coin_for_pair(pair: str) -> Optional[str]:
+    """CoinGecko id of the base asset of a Binance symbol, if known"""
+    entry = _index['by_pair'].get(pair)
+    return entry['coingecko_id'] if entry else None
+
+def coin_for_symbol(symbol: str) -> Optional[str]:
+    """CoinGecko id claiming a ticker symbol, if any"""
+    return _index['by_symbol'].get(symbol.upper())
+
+async def annotate_binance_pairs(tokens: List[Dict], quote: str = DEFAULT_QUOTE_ASSET) -> List[Dict]:
+    """Add a `binance_symbol` field to CoinGecko-based token records"""
+    await get_symbol_index()
+    for token in tokens:
+        token['binance_symbol'] = pair_for_coin(token.get('id'), quote)
+    return tokens
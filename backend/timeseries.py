@@ -0,0 +1,235 @@
+import os
+import json
+import math
+import time
+import logging
+import numpy as np
+from typing import List, Dict, Any, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Append-only time-series store. A series is a set of named float columns
+# over timestamps (seconds). Rows are appended to an open head; every
+# SEGMENT_ROWS rows the head is sealed into an immutable, compressed columnar
+# segment. Each series also keeps 1h and 1d rollups (bucket means), appended
+# as buckets close, so long ranges are answered without touching raw rows.
+HISTORY_DIR = os.environ.get("HISTORY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "history"))
+SEGMENT_ROWS = 360
+ROLLUPS = {'1h': 3600, '1d': 86400}
+RESOLUTIONS = ('raw', *ROLLUPS)
+RETENTION = {'raw': 7 * 86400, '1h': 180 * 86400, '1d': None}  # seconds, None keeps everything
+DEFAULT_MAX_POINTS = 500
+
+class _Columns:
+    """Append-only columns of one series at one resolution, in sealed segments plus an open head"""
+
+    def __init__(self, path: str, retention: Optional[int]):
+        self.path = path
+        self.retention = retention
+        self.segments: List[Dict[str, Any]] = []  # {'file', 'time', 'columns': {name: values}}
+        self.head: List[Dict[str, Any]] = []      # rows, {'time': ts, name: value, ...}
+
+    def load(self):
+        if not os.path.isdir(self.path):
+            return
+        # Segments are named after their first timestamp; anything else is the head or a leftover temp file
+        names = [n for n in os.listdir(self.path) if n.endswith('.npz') and n[:-4].isdigit()]
+        for name in sorted(names, key=lambda n: int(n[:-4])):
+            with np.load(os.path.join(self.path, name)) as data:
+                self.segments.append({
+                    'file': name,
+                    'time': data['time'],
+                    'columns': dict(zip(data['names'].tolist(), data['values']))
+                })
+        try:
+            with open(os.path.join(self.path, 'head.json')) as f:
+                self.head = json.load(f)
+        except FileNotFoundError:
+            pass
+
+    def append(self, row: Dict[str, Any]):
+        self.head.append(row)
+        if len(self.head) >= SEGMENT_ROWS:
+            self._seal()
+        self._write_head()
+
+    def last_time(self) -> Optional[int]:
+        if self.head:
+            return self.head[-1]['time']
+        if self.segments:
+            return int(self.segments[-1]['time'][-1])
+        return None
+
+    def _seal(self):
+        """Write the head as a compressed segment and drop segments past retention"""
+        segment = _to_columns(self.head)
+        names = list(segment['columns'])
+        values = np.array([segment['columns'][n] for n in names]).reshape(len(names), len(segment['time']))
+        segment['file'] = f"{int(segment['time'][0])}.npz"
+        os.makedirs(self.path, exist_ok=True)
+        # np.savez_compressed appends .npz unless the name already ends with it
+        tmp_path = os.path.join(self.path, f"{segment['file']}.{os.getpid()}.tmp.npz")
+        np.savez_compressed(tmp_path, time=segment['time'], names=np.array(names, dtype=str), values=values)
+        os.replace(tmp_path, os.path.join(self.path, segment['file']))
+        self.segments.append(segment)
+        self.head = []
+
+        if self.retention is not None:
+            cutoff = time.time() - self.retention
+            while self.segments and self.segments[0]['time'][-1] < cutoff:
+                expired = self.segments.pop(0)
+                os.remove(os.path.join(self.path, expired['file']))
+
+    def _write_head(self):
+        os.makedirs(self.path, exist_ok=True)
+        path = os.path.join(self.path, 'head.json')
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.head, f)
+        os.replace(tmp_path, path)
+
+    def count(self, start: int, end: int) -> int:
+        """Number of rows with start <= time <= end"""
+        total = sum(int(np.searchsorted(s['time'], end, side='right') - np.searchsorted(s['time'], start, side='left'))
+                    for s in self.segments if s['time'][-1] >= start and s['time'][0] <= end)
+        return total + sum(1 for row in self.head if start <= row['time'] <= end)
+
+    def range(self, start: int, end: int) -> List[Dict[str, Any]]:
+        """Column chunks of the rows with start <= time <= end, oldest first"""
+        chunks = []
+        for segment in self.segments:
+            if segment['time'][-1] < start or segment['time'][0] > end:
+                continue
+            lo = np.searchsorted(segment['time'], start, side='left')
+            hi = np.searchsorted(segment['time'], end, side='right')
+            chunks.append({'time': segment['time'][lo:hi],
+                           'columns': {n: v[lo:hi] for n, v in segment['columns'].items()}})
+        rows = [row for row in self.head if start <= row['time'] <= end]
+        if rows:
+            chunks.append(_to_columns(rows))
+        return chunks
+
+def _to_columns(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Rows to a column chunk; columns missing from a row are NaN"""
+    names = list(dict.fromkeys(name for row in rows for name in row if name != 'time'))
+    return {
+        'time': np.array([row['time'] for row in rows], dtype=np.int64),
+        'columns': {n: np.array([_float(row.get(n)) for row in rows], dtype=float) for n in names}
+    }
+
+def _float(value) -> float:
+    return float('nan') if value is None else float(value)
+
+class _Series:
+    """A raw series, its rollups and the open bucket of each rollup"""
+
+    def __init__(self, name: str):
+        path = os.path.join(HISTORY_DIR, name)
+        self.columns = {res: _Columns(os.path.join(path, res), RETENTION[res]) for res in RESOLUTIONS}
+        self.buckets: Dict[str, Dict[str, Any]] = {}  # rollup -> {'start', 'sums', 'counts'}
+
+    def load(self):
+        for columns in self.columns.values():
+            columns.load()
+        # Reopen each rollup's current bucket from the raw rows after its last closed bucket
+        for res, seconds in ROLLUPS.items():
+            last = self.columns[res].last_time()
+            start = 0 if last is None else last + seconds
+            for chunk in self.columns['raw'].range(start, 2 ** 62):
+                for i, ts in enumerate(chunk['time']):
+                    self._accumulate(res, seconds, {'time': int(ts), **{n: v[i] for n, v in chunk['columns'].items()}})
+
+    def append(self, row: Dict[str, Any]):
+        last = self.columns['raw'].last_time()
+        if last is not None and row['time'] <= last:
+            raise ValueError(f"Rows must be appended in time order ({row['time']} <= {last})")
+        self.columns['raw'].append(row)
+        for res, seconds in ROLLUPS.items():
+            self._accumulate(res, seconds, row)
+
+    def _accumulate(self, res: str, seconds: int, row: Dict[str, Any]):
+        start = row['time'] - row['time'] % seconds
+        bucket = self.buckets.get(res)
+        if bucket is not None and bucket['start'] != start:
+            self.columns[res].append(_bucket_row(bucket))
+            bucket = None
+        if bucket is None:
+            bucket = self.buckets[res] = {'start': start, 'sums': {}, 'counts': {}}
+        for name, value in row.items():
+            if name == 'time' or value is None or math.isnan(value):
+                continue
+            bucket['sums'][name] = bucket['sums'].get(name, 0.0) + float(value)
+            bucket['counts'][name] = bucket['counts'].get(name, 0) + 1
+
+    def count(self, res: str, start: int, end: int) -> int:
+        bucket = self.buckets.get(res)
+        open_bucket = bucket is not None and start <= bucket['start'] <= end
+        return self.columns[res].count(start, end) + open_bucket
+
+    def range(self, res: str, start: int, end: int) -> List[Dict[str, Any]]:
+        chunks = self.columns[res].range(start, end)
+        # The open bucket is served as its mean so far, so rollups reach the present
+        bucket = self.buckets.get(res)
+        if bucket is not None and start <= bucket['start'] <= end:
+            chunks.append(_to_columns([_bucket_row(bucket)]))
+        return chunks
+
+def _bucket_row(bucket: Dict[str, Any]) -> Dict[str, Any]:
+    return {'time': bucket['start'], **{n: s / bucket['counts'][n] for n, s in bucket['sums'].items()}}
+
+_series: Dict[str, _Series] = {}
+
+def load():
+    """Load every persisted series"""
+    if not os.path.isdir(HISTORY_DIR):
+        return
+    for name in os.listdir(HISTORY_DIR):
+        try:
+            series = _Series(name)
+            series.load()
+            _series[name] = series
+        except Exception as e:
+            logger.error(f"Error loading history series {name}: {str(e)}")
+
+def append(name: str, timestamp: float, values: Dict[str, Optional[float]]):
+    """Append a row to a series; new columns may appear at any time"""
+    series = _series.get(name)
+    if series is None:
+        series = _series[name] = _Series(name)
+    series.append({'time': int(timestamp), **{n: None if v is None or math.isnan(v) else float(v) for n, v in values.items()}})
+
+def series_names() -> List[str]:
+    return sorted(_series)
+
+def query(
+    name: str,
+    start: float,
+    end: float,
+    resolution: Optional[str] = None,
+    max_points: int = DEFAULT_MAX_POINTS
+) -> Optional[Dict[str, Any]]:
+    """
+    Rows of a series between `start` and `end` (seconds), as columns. Without
+    a resolution the finest one with at most `max_points` rows in the range is
+    used. Returns None for an unknown series.
+    """
+    series = _series.get(name)
+    if series is None:
+        return None
+    start, end = int(start), int(end)
+    if resolution is None:
+        resolution = next((res for res in RESOLUTIONS if series.count(res, start, end) <= max_points), RESOLUTIONS[-1])
+    elif resolution not in RESOLUTIONS:
+        raise ValueError(f"Unknown resolution: {resolution}, expected one of {', '.join(RESOLUTIONS)}")
+
+    chunks = series.range(resolution, start, end)
+    names = list(dict.fromkeys(n for chunk in chunks for n in chunk['columns']))
+    times = np.concatenate([c['time'] for c in chunks]) if chunks else np.empty(0, dtype=np.int64)
+    columns = {}
+    for n in names:
+        values = np.concatenate([c['columns'].get(n, np.full(len(c['time']), np.nan)) for c in chunks])
+        # NaN is not valid JSON
+        columns[n] = [None if np.isnan(v) else round(float(v), 6) for v in values]
+    return {'series': name, 'resolution': resolution, 'time': times.tolist(), 'columns': columns}
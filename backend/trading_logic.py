@@ -1,94 +1,249 @@
-import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Callable
+import asyncio
 import logging
+import time
 import data_fetcher
+import candle_store
+import symbol_index
+import ranking
+import indicators
+import liquidity
+import categories
+import records
+import upstream
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Define AI token list for market trend analysis
+# Fallback AI token pairs, used when the symbol index cannot be built
 AI_TOKEN_LIST = [
-    "FETUSDT", "OCEANUSDT", "AGIXUSDT", "RNDR", "ALICEUSDT", "GMTUSDT", 
+    "FETUSDT", "OCEANUSDT", "AGIXUSDT", "RENDERUSDT", "ALICEUSDT", "GMTUSDT", 
     "ROSEUSDT", "ACHUSDT", "FLMUSDT", "HIGHUSDT"
 ]
 
+# Moving average crossover signal parameters
+FAST_MA_WINDOW = 7
+SLOW_MA_WINDOW = 20
+MOMENTUM_LOOKBACK = 5
+VOLUME_CONFIRMATION_PCT = 10
+MAX_CONFIDENCE = 0.95
+SIGNAL_LABELS = {1: "buy", -1: "sell", 0: "neutral"}
+
+# Multi-timeframe signals; longer timeframes weigh more in the combined score
+MTF_TIMEFRAMES = ("15m", "1h", "4h", "1d")
+MTF_TIMEFRAME_WEIGHTS = {"15m": 1.0, "1h": 2.0, "4h": 3.0, "1d": 4.0}
+MTF_CANDLES = 50  # closed candles per timeframe, well above SLOW_MA_WINDOW
+MTF_SIGNAL_THRESHOLD = 0.2  # minimum absolute combined score for a buy/sell
+MTF_CLOSE_GRACE_MS = 2000  # time Binance may take to publish a closed candle
+
+# Multi-timeframe results, valid until the next candle close of their timeframes
+_mtf_cache = {}
+
+# Slack on the 24h spread bound, since the kline window and the rolling
+# 24h ticker window are not exactly aligned
+SPREAD_PRUNE_MARGIN = 0.1
+
+# Symbols per kline chunk when a grid scan reports progress
+SCAN_PROGRESS_CHUNK = 100
+
+# Capital of the grid whose per-level orders are checked against the order
+# book; one order is GRID_CAPITAL / suggested_grid_levels (USDT)
+GRID_CAPITAL = 10_000
+
+# Full-universe signal scan
+SCAN_KLINE_LIMIT = 24
+DEFAULT_SCAN_BUDGET_MS = 3000
+
 async def identify_grid_trading_pairs(
     min_volatility: float = 0.5,
     max_volatility: float = 5.0,
     min_volume: float = 1000000,
-    limit: int = 20
-) -> List[Dict[str, Any]]:
+    limit: int = 20,
+    simulate: bool = False,
+    metrics: Optional[Dict[str, Any]] = None,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> List[records.GridPairResult]:
     """
-    Identify pairs suitable for grid trading based on volatility and volume
+    Identify pairs suitable for grid trading based on volatility and volume.
+    Candidates are ranked by their profit estimate net of the order book
+    costs of each grid step (spread and slippage, see _apply_liquidity).
+    With `simulate`, candidates are replayed through their suggested grid and
+    ranked by simulated profit instead of the range-based estimate.
+
+    Candidates are pruned with ticker-level checks before any klines are
+    fetched; per-stage candidate counts are written to `metrics` if given.
+    With `progress`, klines are fetched in chunks and the callback receives
+    the progress and the ranking so far after each chunk.
     """
+    stages = {}
     try:
         # Get all ticker data from Binance
         tickers = await data_fetcher.get_binance_tickers()
+        stages['tickers'] = len(tickers)
         
         # Filter for USDT pairs only
-        usdt_pairs = [t for t in tickers if t['symbol'].endswith('USDT')]
+        usdt_pairs = [t for t in tickers if t.symbol.endswith('USDT')]
+        stages['usdt_pairs'] = len(usdt_pairs)
+        
+        # Volume is already known from the ticker
+        usdt_pairs = [t for t in usdt_pairs if t.quote_volume >= min_volume]
+        stages['volume_filter'] = len(usdt_pairs)
         
+        # No hourly candle can range wider than the 24h high/low spread, so the
+        # spread bounds the average hourly volatility from above
+        usdt_pairs = [t for t in usdt_pairs if _ticker_spread_percent(t) * (1 + SPREAD_PRUNE_MARGIN) >= min_volatility]
+        stages['spread_filter'] = len(usdt_pairs)
+        
+        # Only the survivors trigger kline requests
+        tickers_by_symbol = {t.symbol: t for t in usdt_pairs}
+        symbols_to_fetch = list(tickers_by_symbol)
+        chunk_size = SCAN_PROGRESS_CHUNK if progress else max(len(symbols_to_fetch), 1)
         pair_data = []
-        for pair in usdt_pairs:
-            symbol = pair['symbol']
-            
-            # Get detailed kline data for volatility analysis
-            klines = await data_fetcher.get_binance_klines(symbol, "1h", 24)
-            
-            if not klines or len(klines) < 12:  # Ensure we have enough data
-                continue
-                
-            # Calculate hourly volatility from the last 24 hours
-            df = pd.DataFrame(klines, columns=['open_time', 'open', 'high', 'low', 'close', 'volume', 
-                                             'close_time', 'quote_volume', 'trades', 'taker_buy_volume',
-                                             'taker_buy_quote_volume', 'ignore'])
-            
-            # Convert string values to float
-            for col in ['open', 'high', 'low', 'close', 'volume', 'quote_volume']:
-                df[col] = df[col].astype(float)
-            
-            # Calculate hourly volatility
-            df['volatility'] = (df['high'].astype(float) - df['low'].astype(float)) / df['low'].astype(float) * 100
-            avg_volatility = df['volatility'].mean()
+        fetched = 0
+        books_fetched = 0
+        for start in range(0, len(symbols_to_fetch), chunk_size):
+            chunk_klines = await data_fetcher.get_binance_klines_batch(symbols_to_fetch[start:start + chunk_size], "1h", 24)
+            fetched += len(chunk_klines)
             
-            # Get 24h volume
-            volume_24h = float(pair['quoteVolume'])
+            # Ensure we have enough data
+            chunk_candidates = {symbol: klines for symbol, klines in chunk_klines.items() if len(klines) >= 12}
+            chunk_pairs = _grid_candidates(chunk_candidates, tickers_by_symbol, min_volatility, max_volatility)
             
-            # Calculate price range for grid trading
-            current_price = float(pair['lastPrice'])
-            price_range_low = min(df['low'].astype(float))
-            price_range_high = max(df['high'].astype(float))
+            # Only pairs within the volatility range trigger depth requests
+            books = await data_fetcher.get_binance_depth_batch([pair['symbol'] for pair in chunk_pairs])
+            books_fetched += len(books)
+            _apply_liquidity(chunk_pairs, books)
+            pair_data += chunk_pairs
             
-            # Calculate grid trading metrics
-            range_width = (price_range_high - price_range_low) / price_range_low * 100
-            suggested_grids = max(5, min(20, int(range_width / 0.5)))
-            
-            # Filter based on criteria
-            if (min_volatility <= avg_volatility <= max_volatility and 
-                volume_24h >= min_volume):
-                
-                pair_data.append({
-                    'symbol': symbol,
-                    'current_price': current_price,
-                    'avg_hourly_volatility': round(avg_volatility, 2),
-                    'volume_24h': volume_24h,
-                    'price_range_low': price_range_low,
-                    'price_range_high': price_range_high,
-                    'range_width_percent': round(range_width, 2),
-                    'suggested_grid_levels': suggested_grids,
-                    'estimated_profit_potential': round(range_width * 0.8, 2),  # 80% of the range as potential profit
+            if progress:
+                progress({
+                    'symbols_total': len(symbols_to_fetch),
+                    'symbols_done': min(start + chunk_size, len(symbols_to_fetch)),
+                    'candidates': len(pair_data),
+                    'partial': ranking.top_k(pair_data, limit, [('liquidity_adjusted_profit', True)])
                 })
+        stages['klines_fetched'] = fetched
+        stages['volatility_filter'] = len(pair_data)
+        stages['books_fetched'] = books_fetched
         
-        # Sort by estimated profit potential
-        pair_data.sort(key=lambda x: x['estimated_profit_potential'], reverse=True)
+        if simulate and pair_data:
+            # Rank by a grid fit on the day before and replayed on the last one
+            import grid_simulator  # deferred: only needed when simulating
+            history = await data_fetcher.get_binance_klines_batch(
+                [pair['symbol'] for pair in pair_data], "1h", grid_simulator.FIT_CANDLES + grid_simulator.REPLAY_CANDLES
+            )
+            await asyncio.to_thread(grid_simulator.simulate_candidates, history, pair_data)
+            return ranking.top_k(pair_data, limit, [('simulated_profit_percent', True)])
         
-        return pair_data[:limit]
+        # Rank by estimated profit potential net of order book costs
+        return ranking.top_k(pair_data, limit, [('liquidity_adjusted_profit', True)])
         
     except Exception as e:
         logger.error(f"Error identifying grid trading pairs: {str(e)}")
         return []
+    
+    finally:
+        if metrics is not None:
+            metrics['stages'] = stages
+
+def _grid_candidates(
+    candidate_klines: Dict[str, np.ndarray],
+    tickers_by_symbol: Dict[str, records.Ticker],
+    min_volatility: float,
+    max_volatility: float
+) -> List[records.GridPairResult]:
+    """Grid metrics of the candidates whose average hourly volatility is in range"""
+    symbols, candles = data_fetcher.stack_kline_fields(candidate_klines, ('high', 'low'))
+    if not symbols:
+        return []
+    
+    # Calculate hourly volatility and price ranges for all candidates at once
+    volatility = np.nanmean(indicators.hl_volatility(candles['high'], candles['low']), axis=1)
+    range_lows = np.nanmin(candles['low'], axis=1)
+    range_highs = np.nanmax(candles['high'], axis=1)
+    
+    pair_data = []
+    for i, symbol in enumerate(symbols):
+        pair = tickers_by_symbol[symbol]
+        # Filter on the reported value, as the snapshot index and the dashboard do
+        avg_volatility = round(float(volatility[i]), 2)
+        
+        # Get 24h volume
+        volume_24h = pair.quote_volume
+        
+        # Calculate price range for grid trading
+        current_price = pair.last_price
+        price_range_low = float(range_lows[i])
+        price_range_high = float(range_highs[i])
+        
+        # Calculate grid trading metrics
+        range_width = (price_range_high - price_range_low) / price_range_low * 100
+        suggested_grids = max(5, min(20, int(range_width / 0.5)))
+        
+        # Filter based on criteria
+        if min_volatility <= avg_volatility <= max_volatility:
+            
+            pair_data.append({
+                'symbol': symbol,
+                'current_price': current_price,
+                'avg_hourly_volatility': avg_volatility,
+                'volume_24h': volume_24h,
+                'price_range_low': price_range_low,
+                'price_range_high': price_range_high,
+                'range_width_percent': round(range_width, 2),
+                'suggested_grid_levels': suggested_grids,
+                'estimated_profit_potential': round(range_width * 0.8, 2),  # 80% of the range as potential profit
+            })
+    return pair_data
+
+def _apply_liquidity(pair_data: List[records.GridPairResult], books: Dict[str, records.OrderBook]):
+    """
+    Add order book metrics and the liquidity-adjusted profit to grid candidates.
+
+    Each grid round trip earns one grid step and pays the spread plus the
+    slippage of a buy and a sell, so the estimate is scaled by the share of a
+    step that is left after those costs. A book that cannot fill one grid
+    order leaves nothing (slippage None); pairs without a book keep their
+    estimate, so an unavailable /depth degrades to the volume-only ranking.
+    """
+    order_sizes = {pair['symbol']: GRID_CAPITAL / pair['suggested_grid_levels'] for pair in pair_data}
+    metrics = liquidity.liquidity_metrics(books, order_sizes)
+    for pair in pair_data:
+        book = metrics.get(pair['symbol'])
+        if book is None:
+            pair.update(spread_percent=None, depth_1pct=None, slippage_percent=None,
+                        liquidity_adjusted_profit=pair['estimated_profit_potential'])
+            continue
+        grid_step = pair['range_width_percent'] / pair['suggested_grid_levels']
+        cost = book['spread_percent'] + 2 * book['slippage_percent']
+        retained = min(1.0, max(0.0, 1 - cost / grid_step)) if grid_step > 0 and not np.isnan(cost) else 0.0
+        pair.update(
+            spread_percent=round(book['spread_percent'], 4),
+            depth_1pct=round(book['depth_1pct'], 2),
+            slippage_percent=None if np.isnan(book['slippage_percent']) else round(book['slippage_percent'], 4),
+            liquidity_adjusted_profit=round(pair['estimated_profit_potential'] * retained, 2)
+        )
+
+def _ticker_spread_percent(ticker: records.Ticker) -> float:
+    """
+    24h high/low spread of a ticker as a percentage of the low
+    """
+    low, high = ticker.low_price, ticker.high_price
+    return (high - low) / low * 100 if low > 0 else 0.0
+
+async def get_ai_token_pairs(limit: int = 20) -> List[str]:
+    """
+    Binance USDT pairs of the AI tokens tracked on CoinGecko
+    """
+    ai_tokens = await data_fetcher.get_ai_tokens(limit=limit)
+    await symbol_index.get_symbol_index()
+    
+    pairs = [symbol_index.pair_for_coin(token['id']) for token in ai_tokens]
+    pairs = [pair for pair in pairs if pair]
+    
+    return pairs or AI_TOKEN_LIST[:limit]
 
 async def detect_market_trends() -> Dict[str, Any]:
     """
@@ -106,22 +261,22 @@ async def detect_market_trends() -> Dict[str, Any]:
         
         # Calculate overall market metrics
         market_metrics = {
-            'top_gainers': sorted([{
+            'top_gainers': ranking.top_k([{
                 'symbol': coin['symbol'].upper(),
                 'price_change_24h': coin.get('price_change_percentage_24h', 0)
             } for coin in top_coins if coin.get('price_change_percentage_24h', 0) > 0], 
-            key=lambda x: x['price_change_24h'], reverse=True)[:5],
+            5, [('price_change_24h', True)]),
             
-            'top_losers': sorted([{
+            'top_losers': ranking.top_k([{
                 'symbol': coin['symbol'].upper(),
                 'price_change_24h': coin.get('price_change_percentage_24h', 0)
             } for coin in top_coins if coin.get('price_change_percentage_24h', 0) < 0], 
-            key=lambda x: x['price_change_24h'])[:5],
+            5, [('price_change_24h', False)]),
             
             'avg_top20_change': np.mean([coin.get('price_change_percentage_24h', 0) for coin in top_coins]),
             'avg_ai_token_change': np.mean([token.get('price_change_24h', 0) for token in ai_tokens]),
             'market_direction': 'bullish' if np.mean([coin.get('price_change_percentage_24h', 0) for coin in top_coins]) > 0 else 'bearish',
-            'hot_sectors': _identify_hot_sectors(coins)
+            'hot_sectors': await _identify_hot_sectors_streaming()
         }
         
         # Generate market insights
@@ -144,53 +299,63 @@ async def detect_market_trends() -> Dict[str, Any]:
         
         return {
             'market_metrics': market_metrics,
+            'sector_performance': [{'sector': sector['name'], 'performance': sector['avg_change']}
+                                   for sector in market_metrics['hot_sectors']],
             'insights': insights,
             'recommendation': _generate_market_recommendation(market_metrics)
         }
         
     except Exception as e:
         logger.error(f"Error detecting market trends: {str(e)}")
-        return {'market_metrics': {}, 'insights': ['Error analyzing market trends'], 'recommendation': 'neutral'}
+        return {'market_metrics': {}, 'insights': ['Error analyzing market trends'], 'recommendation': 'neutral',
+                'error': str(e)}
 
-def _identify_hot_sectors(coins: List[Dict]) -> List[Dict]:
+async def _identify_hot_sectors_streaming() -> List[Dict]:
     """
-    Identify which sectors are performing well
+    Identify hot sectors across the full CoinGecko universe; pages are
+    reduced to columns as they arrive and grouped by sector at the end
     """
-    # Define sectors and their keywords
-    sectors = {
-        'AI & Data': ['ai', 'data', 'neural', 'intelligence', 'machine', 'predict', 'learn'],
-        'DeFi': ['defi', 'finance', 'yield', 'swap', 'lend', 'borrow', 'staking'],
-        'Gaming': ['game', 'play', 'nft', 'metaverse', 'virtual', 'realm'],
-        'Layer 1': ['layer', 'blockchain', 'consensus', 'scalable', 'protocol'],
-        'Layer 2': ['layer2', 'rollup', 'scaling', 'optimistic', 'zkrollup']
-    }
-    
-    # Assign coins to sectors and calculate performance
-    sector_performance = {}
-    for sector_name, keywords in sectors.items():
-        sector_coins = []
-        for coin in coins:
-            coin_name = coin.get('name', '').lower()
-            coin_desc = coin.get('description', '').lower() if 'description' in coin else ''
-            
-            if any(keyword in coin_name or keyword in coin_desc for keyword in keywords):
-                price_change = coin.get('price_change_percentage_24h', 0)
-                if price_change is not None:
-                    sector_coins.append(price_change)
-        
-        if sector_coins:
-            avg_change = sum(sector_coins) / len(sector_coins)
-            sector_performance[sector_name] = {
-                'name': sector_name,
-                'avg_change': avg_change,
-                'coin_count': len(sector_coins)
-            }
+    coin_ids, names, changes, market_caps = [], [], [], []
+    async for page in data_fetcher.iter_coingecko_markets():
+        for coin in page:
+            coin_ids.append(coin['id'])
+            names.append(coin.get('name') or '')
+            changes.append(coin.get('price_change_percentage_24h'))
+            market_caps.append(coin.get('market_cap') or 0)
     
-    # Convert to list and sort by performance
-    result = [v for k, v in sector_performance.items()]
-    result.sort(key=lambda x: x['avg_change'], reverse=True)
-    
-    return result
+    # None (no 24h change) becomes NaN and is left out of the averages
+    return categories.sector_performance(
+        np.array(coin_ids, dtype=str), np.array(names, dtype=str),
+        np.array(changes, dtype=float), np.array(market_caps, dtype=float)
+    )
+
+def apply_signal_rules(prices, sma_fast, sma_slow, volume_change):
+    """
+    Apply the moving average crossover and volume confirmation rules.
+
+    Works element-wise on scalars or NumPy arrays of any shape, so the live
+    signal generator and the backtester share exactly the same logic.
+    Returns (signal, confidence) where signal is 1 (buy), -1 (sell) or 0.
+    """
+    prices = np.asarray(prices, dtype=float)
+    sma_fast = np.asarray(sma_fast, dtype=float)
+    sma_slow = np.asarray(sma_slow, dtype=float)
+    volume_change = np.asarray(volume_change, dtype=float)
+
+    buy = (sma_fast > sma_slow) & (prices > sma_fast)
+    sell = (sma_fast < sma_slow) & (prices < sma_fast)
+    signal = np.where(buy, 1, np.where(sell, -1, 0))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spread = np.abs(sma_fast - sma_slow) / prices
+    confidence = np.where(signal != 0, np.minimum(MAX_CONFIDENCE, 0.5 + spread), 0.5)
+
+    # Adjust confidence based on volume confirmation
+    confirmed = ((buy & (volume_change > VOLUME_CONFIRMATION_PCT)) |
+                 (sell & (volume_change < -VOLUME_CONFIRMATION_PCT)))
+    confidence = np.where(confirmed, np.minimum(MAX_CONFIDENCE, confidence + 0.1), confidence)
+
+    return signal, confidence
 
 def _generate_market_recommendation(market_metrics: Dict) -> str:
     """
@@ -209,7 +374,7 @@ def _generate_market_recommendation(market_metrics: Dict) -> str:
     else:
         return "neutral"
 
-async def generate_trade_signals(pairs: Optional[List[str]] = None, limit: int = 10) -> List[Dict]:
+async def generate_trade_signals(pairs: Optional[List[str]] = None, limit: int = 10) -> List[records.Signal]:
     """
     Generate trading signals based on technical analysis
     """
@@ -217,64 +382,249 @@ async def generate_trade_signals(pairs: Optional[List[str]] = None, limit: int =
         # Get trading pair data
         pair_data = await data_fetcher.get_trading_pair_data(pairs)
         
-        signals = []
-        for symbol, data in pair_data.items():
-            try:
-                # Convert price history to pandas Series for analysis
-                if len(data['price_history']) < 20:
-                    continue
-                    
-                prices = pd.Series(data['price_history'])
-                
-                # Calculate some basic indicators
-                sma_fast = prices.rolling(window=7).mean().iloc[-1]
-                sma_slow = prices.rolling(window=20).mean().iloc[-1]
-                
-                current_price = prices.iloc[-1]
-                prev_price = prices.iloc[-2] 
-                
-                # Generate signal based on moving averages crossover
-                signal = "neutral"
-                confidence = 0.5
-                
-                if sma_fast > sma_slow and prices.iloc[-1] > sma_fast:
-                    signal = "buy"
-                    confidence = min(0.95, 0.5 + (sma_fast - sma_slow) / current_price)
-                elif sma_fast < sma_slow and prices.iloc[-1] < sma_fast:
-                    signal = "sell"
-                    confidence = min(0.95, 0.5 + (sma_slow - sma_fast) / current_price)
-                
-                # Calculate momentum
-                momentum = (current_price - prices.iloc[-6]) / prices.iloc[-6] * 100
-                
-                # Add volume analysis
-                volume_change = (data['volume_history'][-1] - data['volume_history'][-2]) / data['volume_history'][-2] * 100 if data['volume_history'][-2] > 0 else 0
-                
-                # Adjust confidence based on volume confirmation
-                if (signal == "buy" and volume_change > 10) or (signal == "sell" and volume_change < -10):
-                    confidence = min(0.95, confidence + 0.1)
-                
-                signals.append({
-                    'symbol': symbol,
-                    'signal': signal,
-                    'confidence': round(confidence, 2),
-                    'current_price': current_price,
-                    'price_change_1h': round((current_price - prev_price) / prev_price * 100, 2),
-                    'momentum': round(momentum, 2),
-                    'fast_ma': round(sma_fast, 8),
-                    'slow_ma': round(sma_slow, 8),
-                    'volume_change': round(volume_change, 2)
-                })
-                
-            except Exception as e:
-                logger.error(f"Error generating signal for {symbol}: {str(e)}")
-                continue
-        
-        # Sort by confidence (highest first)
-        signals.sort(key=lambda x: x['confidence'], reverse=True)
+        # Evaluate all pairs at once on stacked price and volume histories
+        symbols, close, volume = _stack_histories(pair_data)
+        signals, _ = _signals_from_arrays(symbols, close, volume, limit)
         
-        return signals[:limit]
+        return signals
         
     except Exception as e:
         logger.error(f"Error generating trade signals: {str(e)}")
         return []
+
+def parse_timeframes(timeframes: Optional[str]) -> Tuple[str, ...]:
+    """Validate a comma-separated list of timeframes, returned in MTF_TIMEFRAMES order"""
+    if not timeframes:
+        return MTF_TIMEFRAMES
+    requested = {tf.strip() for tf in timeframes.split(",") if tf.strip()}
+    unknown = requested - set(MTF_TIMEFRAMES)
+    if unknown or not requested:
+        raise ValueError(f"Unsupported timeframes: {', '.join(sorted(unknown))}; expected any of {', '.join(MTF_TIMEFRAMES)}")
+    return tuple(tf for tf in MTF_TIMEFRAMES if tf in requested)
+
+async def generate_multi_timeframe_signals(
+    pairs: Optional[List[str]] = None,
+    timeframes: Tuple[str, ...] = MTF_TIMEFRAMES,
+    limit: int = 10
+) -> List[records.Signal]:
+    """
+    Combine the signals of several timeframes per symbol into one weighted
+    signal. Signals are computed on closed candles only, so results are cached
+    until the next candle close of the shortest requested timeframe.
+    """
+    key = (tuple(pairs) if pairs else None, tuple(timeframes))
+    now_ms = int(time.time() * 1000)
+    cached = _mtf_cache.get(key)
+    if cached is not None and now_ms < cached['expires_ms']:
+        return cached['signals'][:limit]
+    
+    try:
+        with upstream.track() as tracker:
+            symbols = pairs or data_fetcher.top_volume_usdt_symbols(await data_fetcher.get_binance_tickers())
+            candles = await asyncio.gather(*[
+                candle_store.get_candles(symbols, tf, MTF_CANDLES) for tf in timeframes
+            ])
+        signals = _combine_timeframes(symbols, timeframes, candles)
+    except Exception as e:
+        logger.error(f"Error generating multi-timeframe signals: {str(e)}")
+        return []
+    
+    # Drop results past their candle close, and only keep complete, fresh ones
+    for expired in [k for k, v in _mtf_cache.items() if now_ms >= v['expires_ms']]:
+        del _mtf_cache[expired]
+    if signals and not tracker['failed'] and tracker['stale_since'] is None:
+        expires_ms = min(candle_store.next_close_ms(tf, now_ms) for tf in timeframes) + MTF_CLOSE_GRACE_MS
+        _mtf_cache[key] = {'signals': signals, 'expires_ms': expires_ms}
+    return signals[:limit]
+
+def _right_align(values: np.ndarray, width: int) -> np.ndarray:
+    """Last `width` columns of a symbol x time array, left-padded with NaN if shorter"""
+    out = np.full((values.shape[0], width), np.nan)
+    n = min(values.shape[1], width)
+    if n:
+        out[:, width - n:] = values[:, -n:]
+    return out
+
+def _combine_timeframes(
+    symbols: List[str],
+    timeframes: Tuple[str, ...],
+    candles: List[Dict[str, np.ndarray]]
+) -> List[records.Signal]:
+    """
+    Evaluate every (timeframe, symbol) history in one stacked batch and
+    combine the per-timeframe signals, ranked by combined confidence
+    """
+    column = {symbol: i for i, symbol in enumerate(symbols)}
+    tf_rows, symbol_rows, close_blocks, volume_blocks = [], [], [], []
+    for t, klines in enumerate(candles):
+        tf_symbols, arrays = data_fetcher.stack_kline_fields(klines, ('close', 'volume'))
+        # Every block gets the same width so they stack into one batch
+        close_blocks.append(_right_align(arrays['close'], MTF_CANDLES))
+        volume_blocks.append(_right_align(arrays['volume'], MTF_CANDLES))
+        tf_rows += [t] * len(tf_symbols)
+        symbol_rows += [column[s] for s in tf_symbols]
+    
+    if not tf_rows:
+        return []
+    
+    latest = evaluate_latest(np.vstack(close_blocks), np.vstack(volume_blocks))
+    tf_rows, symbol_rows = np.array(tf_rows), np.array(symbol_rows)
+    
+    # timeframe x symbol matrices of the per-timeframe results
+    shape = (len(timeframes), len(symbols))
+    valid = np.zeros(shape, dtype=bool)
+    signal = np.zeros(shape, dtype=int)
+    confidence = np.zeros(shape)
+    price = np.full(shape, np.nan)
+    valid[tf_rows, symbol_rows] = latest['valid']
+    signal[tf_rows, symbol_rows] = latest['signal']
+    confidence[tf_rows, symbol_rows] = latest['confidence']
+    price[tf_rows, symbol_rows] = latest['current_price']
+    
+    weights = np.array([MTF_TIMEFRAME_WEIGHTS[tf] for tf in timeframes])[:, None] * valid
+    total_weight = weights.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        score = np.where(total_weight > 0, (weights * signal * confidence).sum(axis=0) / total_weight, 0.0)
+        combined = np.where(np.abs(score) >= MTF_SIGNAL_THRESHOLD, np.sign(score), 0).astype(int)
+        alignment = np.where(total_weight > 0, ((signal == combined) & valid).sum(axis=0) / valid.sum(axis=0), 0.0)
+    combined_confidence = np.minimum(np.abs(score), MAX_CONFIDENCE)
+    # Latest closed price from the shortest timeframe that has one
+    first_valid = np.argmax(valid, axis=0)
+    current_price = price[first_valid, np.arange(len(symbols))]
+    
+    evaluated = np.flatnonzero(total_weight > 0)
+    rounded_confidence = np.round(combined_confidence[evaluated], 2)
+    top = evaluated[ranking.top_k_indices({'confidence': rounded_confidence}, len(evaluated), [('confidence', True)])]
+    
+    signals = []
+    for i in top:
+        signals.append({
+            'symbol': symbols[i],
+            'signal': SIGNAL_LABELS[int(combined[i])],
+            'confidence': round(float(combined_confidence[i]), 2),
+            'current_price': float(current_price[i]),
+            'alignment': round(float(alignment[i]), 2),
+            'timeframes': {
+                tf: {'signal': SIGNAL_LABELS[int(signal[t, i])], 'confidence': round(float(confidence[t, i]), 2)}
+                for t, tf in enumerate(timeframes) if valid[t, i]
+            }
+        })
+    return signals
+
+def _stack_histories(pair_data: Dict[str, Dict]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Stack price/volume histories into symbol x time arrays, left-padded with NaN
+    """
+    symbols = [symbol for symbol, data in pair_data.items() if data['price_history']]
+    length = max((len(pair_data[s]['price_history']) for s in symbols), default=0)
+    
+    close = np.full((len(symbols), length), np.nan)
+    volume = np.full((len(symbols), length), np.nan)
+    for row, symbol in enumerate(symbols):
+        prices = pair_data[symbol]['price_history']
+        volumes = pair_data[symbol]['volume_history']
+        close[row, length - len(prices):] = prices
+        volume[row, length - len(volumes):] = volumes
+    
+    return symbols, close, volume
+
+def evaluate_latest(close: np.ndarray, volume: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Indicators and signal of the latest candle of each row of stacked
+    symbol x time close/volume arrays (at least SLOW_MA_WINDOW columns)
+    """
+    valid = np.sum(~np.isnan(close), axis=1) >= SLOW_MA_WINDOW
+    
+    sma_fast = indicators.sma(close[:, -SLOW_MA_WINDOW:], FAST_MA_WINDOW)[:, -1]
+    sma_slow = indicators.sma(close[:, -SLOW_MA_WINDOW:], SLOW_MA_WINDOW)[:, -1]
+    current_price = close[:, -1]
+    prev_price = close[:, -2]
+    past_price = close[:, -1 - MOMENTUM_LOOKBACK]
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        momentum = (current_price - past_price) / past_price * 100
+        price_change = (current_price - prev_price) / prev_price * 100
+        volume_change = np.where(volume[:, -2] > 0, (volume[:, -1] - volume[:, -2]) / volume[:, -2] * 100, 0.0)
+    
+    signal, confidence = apply_signal_rules(current_price, sma_fast, sma_slow, volume_change)
+    return {
+        'valid': valid, 'signal': signal, 'confidence': confidence,
+        'current_price': current_price, 'price_change': price_change, 'momentum': momentum,
+        'sma_fast': sma_fast, 'sma_slow': sma_slow, 'volume_change': volume_change
+    }
+
+def _signals_from_arrays(
+    symbols: List[str],
+    close: np.ndarray,
+    volume: np.ndarray,
+    limit: Optional[int] = None
+) -> Tuple[List[records.Signal], int]:
+    """
+    Evaluate the latest candle of stacked symbol x time close/volume arrays,
+    producing the same records as generate_trade_signals for the `limit`
+    most confident symbols. Returns (signals, number of symbols evaluated).
+    """
+    if close.shape[1] < SLOW_MA_WINDOW:
+        return [], 0
+    
+    latest = evaluate_latest(close, volume)
+    signal, confidence = latest['signal'], latest['confidence']
+    current_price, price_change_1h, momentum = latest['current_price'], latest['price_change'], latest['momentum']
+    sma_fast, sma_slow, volume_change = latest['sma_fast'], latest['sma_slow'], latest['volume_change']
+    
+    # Rank on the rounded confidence, as the record-based path does
+    evaluated = np.flatnonzero(latest['valid'])
+    rounded_confidence = np.round(confidence[evaluated], 2)
+    k = len(evaluated) if limit is None else limit
+    top = evaluated[ranking.top_k_indices({'confidence': rounded_confidence}, k, [('confidence', True)])]
+    
+    signals = []
+    for i in top:
+        signals.append({
+            'symbol': symbols[i],
+            'signal': SIGNAL_LABELS[int(signal[i])],
+            'confidence': round(float(confidence[i]), 2),
+            'current_price': float(current_price[i]),
+            'price_change_1h': round(float(price_change_1h[i]), 2),
+            'momentum': round(float(momentum[i]), 2),
+            'fast_ma': round(float(sma_fast[i]), 8),
+            'slow_ma': round(float(sma_slow[i]), 8),
+            'volume_change': round(float(volume_change[i]), 2)
+        })
+    
+    return signals, len(evaluated)
+
+async def scan_trade_signals(limit: int = 10, budget_ms: int = DEFAULT_SCAN_BUDGET_MS) -> Dict[str, Any]:
+    """
+    Generate trading signals for every USDT pair within a latency budget.
+    Klines that have not arrived when the budget runs out are skipped, and
+    the scan coverage is reported alongside the signals.
+    """
+    start = time.perf_counter()
+    try:
+        tickers = await data_fetcher.get_binance_tickers()
+        symbols = [t.symbol for t in tickers if t.symbol.endswith('USDT')]
+        
+        remaining = max(0.0, budget_ms / 1000 - (time.perf_counter() - start))
+        klines = await data_fetcher.get_binance_klines_batch(symbols, "1h", SCAN_KLINE_LIMIT, timeout=remaining)
+        
+        scanned, close, volume = data_fetcher.stack_klines(klines)
+        signals, evaluated = _signals_from_arrays(scanned, close, volume, limit)
+        
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return {
+            'signals': signals,
+            'scan': {
+                'symbols_total': len(symbols),
+                'symbols_fetched': len(klines),
+                'symbols_evaluated': evaluated,
+                'coverage_percent': round(len(klines) / len(symbols) * 100, 2) if symbols else 0,
+                'complete': len(klines) == len(symbols),
+                'budget_ms': budget_ms,
+                'elapsed_ms': round(elapsed_ms, 1)
+            }
+        }
+        
+    except Exception as e:
+        logger.error(f"Error scanning trade signals: {str(e)}")
+        return {'signals': [], 'scan': {'error': str(e)}}
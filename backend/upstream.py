@@ -0,0 +1,183 @@
+import time
+import random
+import asyncio
+import logging
+import aiohttp
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import urlparse
+from typing import Dict, Any, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Upstream requests are retried a bounded number of times, slow requests are
+# hedged with one duplicate, and a host that keeps failing is short-circuited
+# for a cool-down period so callers fall back to cached data immediately.
+REQUEST_TIMEOUT = 10        # seconds per attempt
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF = 0.5         # seconds, multiplied by the attempt number, plus jitter
+HEDGE_DELAY = 1.5           # seconds before a slow request gets a duplicate
+BREAKER_THRESHOLD = 5       # consecutive failures that open a host's circuit
+BREAKER_COOLDOWN = 30       # seconds before an open circuit lets a probe through
+
+class UpstreamError(Exception):
+    """An upstream request failed after its retries"""
+
+class CircuitOpenError(UpstreamError):
+    """The host's circuit is open, so no request was made"""
+
+class RequestRejected(UpstreamError):
+    """The host answered with a client error; it is up, the request is bad"""
+
+class _RetryableStatus(Exception):
+    pass
+
+_breakers: Dict[str, Dict[str, Any]] = {}  # host -> {'failures', 'opened_at', 'probing'}
+
+# Staleness of the data served for the current request, see track()
+_tracker: ContextVar[Optional[Dict[str, Any]]] = ContextVar("upstream_tracker", default=None)
+
+def _allow(host: str) -> bool:
+    breaker = _breakers.get(host)
+    if breaker is None or breaker['opened_at'] is None:
+        return True
+    if time.time() - breaker['opened_at'] < BREAKER_COOLDOWN or breaker['probing']:
+        return False
+    # Half-open: a single probe decides whether the circuit closes
+    breaker['probing'] = True
+    return True
+
+def _record(host: str, ok: bool):
+    breaker = _breakers.setdefault(host, {'failures': 0, 'opened_at': None, 'probing': False})
+    breaker['probing'] = False
+    if ok:
+        if breaker['opened_at'] is not None:
+            logger.info(f"Circuit for {host} closed")
+        breaker.update(failures=0, opened_at=None)
+        return
+    breaker['failures'] += 1
+    if breaker['opened_at'] is not None or breaker['failures'] >= BREAKER_THRESHOLD:
+        if breaker['opened_at'] is None:
+            logger.warning(f"Circuit for {host} opened after {breaker['failures']} failures")
+        breaker['opened_at'] = time.time()
+
+def _release_probe(host: str):
+    """Let another probe through after one ended without a verdict, e.g. cancelled"""
+    breaker = _breakers.get(host)
+    if breaker is not None:
+        breaker['probing'] = False
+
+def circuit_open(url: str) -> bool:
+    """Whether requests to the url's host are currently short-circuited"""
+    breaker = _breakers.get(urlparse(url).netloc)
+    return breaker is not None and breaker['opened_at'] is not None and time.time() - breaker['opened_at'] < BREAKER_COOLDOWN
+
+def breaker_status() -> Dict[str, Dict[str, Any]]:
+    """State of every host's circuit: closed, open or half-open"""
+    now = time.time()
+    status = {}
+    for host, breaker in _breakers.items():
+        if breaker['opened_at'] is None:
+            state = 'closed'
+        elif now - breaker['opened_at'] < BREAKER_COOLDOWN:
+            state = 'open'
+        else:
+            state = 'half-open'
+        status[host] = {'state': state, 'failures': breaker['failures']}
+    return status
+
+async def _get_json(session: aiohttp.ClientSession, url: str) -> Any:
+    async with session.get(url) as response:
+        if response.status == 200:
+            return await response.json()
+        if response.status == 429 or response.status >= 500:
+            raise _RetryableStatus(f"status {response.status}")
+        raise RequestRejected(f"{url} returned status {response.status}")
+
+async def _hedged_get_json(session: aiohttp.ClientSession, url: str) -> Any:
+    """The first answer of a request and, once it is slower than HEDGE_DELAY, one duplicate"""
+    tasks = [asyncio.create_task(_get_json(session, url))]
+    try:
+        done, pending = await asyncio.wait(tasks, timeout=HEDGE_DELAY)
+        if not done:
+            tasks.append(asyncio.create_task(_get_json(session, url)))
+            pending.add(tasks[-1])
+        while True:
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+            if not pending:
+                raise error
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def fetch_json(url: str, hedge: bool = True) -> Any:
+    """
+    GET a JSON document through the host's circuit breaker, with bounded
+    retries. Raises UpstreamError (or a subclass) when no answer is obtained.
+    Only idempotent requests may be hedged.
+    """
+    host = urlparse(url).netloc
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            if not _allow(host):
+                raise CircuitOpenError(f"Circuit for {host} is open")
+            try:
+                data = await (_hedged_get_json(session, url) if hedge else _get_json(session, url))
+            except RequestRejected:
+                _record(host, True)
+                raise
+            except (_RetryableStatus, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                _record(host, False)
+                if attempt == MAX_ATTEMPTS:
+                    raise UpstreamError(f"{url} failed after {attempt} attempts: {str(e) or type(e).__name__}")
+                await asyncio.sleep(RETRY_BACKOFF * attempt * (1 + random.random()))
+                continue
+            except Exception as e:
+                # e.g. an undecodable body: the host answered, but not usefully
+                _record(host, False)
+                raise UpstreamError(f"{url} failed: {str(e) or type(e).__name__}") from e
+            except BaseException:
+                # Cancelled: no verdict on the host, but a half-open probe must not stay claimed
+                _release_probe(host)
+                raise
+            _record(host, True)
+            return data
+
+@contextmanager
+def track():
+    """
+    Collect, for the enclosed work, whether any data came from a stale
+    fallback (`stale_since`, the oldest fallback's fetch time) and whether
+    any fetch had no data at all (`failed`). Child tasks share the tracker,
+    and a nested tracker reports to the enclosing one when it exits.
+    """
+    tracker = {'stale_since': None, 'failed': False}
+    token = _tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _tracker.reset(token)
+        note_stale(tracker['stale_since'])
+        if tracker['failed']:
+            note_failed()
+
+def note_stale(fetched_at: Optional[float]):
+    """Record that data fetched at `fetched_at` was served in place of fresh data"""
+    tracker = _tracker.get()
+    if tracker is None or fetched_at is None:
+        return
+    if tracker['stale_since'] is None or fetched_at < tracker['stale_since']:
+        tracker['stale_since'] = fetched_at
+
+def note_failed():
+    """Record that a fetch failed with nothing to fall back on"""
+    tracker = _tracker.get()
+    if tracker is not None:
+        tracker['failed'] = True
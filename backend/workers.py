@@ -0,0 +1,23 @@
+import os
+
+# Worker processes shared by the CPU-bound simulations (backtests, grid
+# parameter sweeps), started on first use and stopped on application shutdown
+_pool = None  # ProcessPoolExecutor
+
+def cpu_count() -> int:
+    return os.cpu_count() or 1
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        # deferred: multiprocessing is only needed once a simulation runs
+        from concurrent.futures import ProcessPoolExecutor
+        _pool = ProcessPoolExecutor(max_workers=cpu_count())
+    return _pool
+
+def shutdown():
+    """Stop the worker processes"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
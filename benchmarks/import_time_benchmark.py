@@ -0,0 +1,77 @@
+"""
+Import-time report for the backend modules and dashboard pages.
+
+Each module is imported in a fresh interpreter with `python -X importtime`,
+so the numbers are what a worker boot or a Streamlit page load pays. For
+every module the report shows the cumulative import time, the wall time of
+the whole interpreter and the heaviest non-stdlib modules it pulls in.
+
+Usage: python benchmarks/import_time_benchmark.py [repeat] [top]
+"""
+import os
+import re
+import sys
+import subprocess
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+BACKEND = os.path.join(ROOT, 'backend')
+
+# (module, directory it is imported from)
+TARGETS = [
+    ('main', BACKEND),
+    ('trading_logic', BACKEND),
+    ('data_fetcher', BACKEND),
+    ('indicators', BACKEND),
+    ('pages.dashboard_overview', ROOT),
+    ('pages.trading_pairs', ROOT),
+    ('pages.ai_tokens', ROOT),
+    ('pages.market_trends', ROOT),
+    ('pages.trade_signals', ROOT),
+]
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+def _import_once(module: str, cwd: str):
+    """(target import us, {package: cumulative us}, wall seconds) for one cold import"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=cwd, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"import failed: {result.stderr.strip().splitlines()[-1]}")
+
+    total = 0
+    packages = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        name, cumulative = match.group(4), int(match.group(2))
+        if name == module:
+            total = cumulative
+        # A package's first import covers the submodules it loads eagerly
+        elif '.' not in name and name not in sys.stdlib_module_names and name != module.split('.')[0]:
+            packages[name] = cumulative
+    return total, packages, wall
+
+def main(repeat: int = 3, top: int = 5):
+    print(f"best of {repeat} cold imports, python {sys.version.split()[0]}")
+    print(f"{'module':<28}{'import ms':>11}{'process ms':>12}  heaviest imports, cumulative ms")
+
+    for module, cwd in TARGETS:
+        try:
+            runs = [_import_once(module, cwd) for _ in range(repeat)]
+        except RuntimeError as e:
+            print(f"{module:<28}{'-':>11}{'-':>12}  {e}")
+            continue
+        total, packages, _ = min(runs, key=lambda run: run[0])
+        wall = min(run[2] for run in runs)
+        heaviest = sorted(packages.items(), key=lambda item: -item[1])[:top]
+        listing = ', '.join(f"{name} {us / 1000:.0f}" for name, us in heaviest)
+        print(f"{module:<28}{total / 1000:>11.1f}{wall * 1000:>12.1f}  {listing}")
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,91 @@
+"""
+Microbenchmarks for the indicator kernels in backend/indicators.py.
+
+Each kernel is checked against the equivalent pandas computation and then
+timed on a symbol x time array against pandas applied per symbol, the way
+trading_logic used to compute indicators.
+
+Usage: python benchmarks/indicators_benchmark.py [symbols] [candles]
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+import indicators
+
+def _random_candles(symbols: int, candles: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, (symbols, candles)), axis=1)
+    high = close * (1 + rng.uniform(0, 0.01, close.shape))
+    low = close * (1 - rng.uniform(0, 0.01, close.shape))
+    # Shorter histories are left-padded with NaN, as in stacked klines
+    for row in range(0, symbols, 7):
+        pad = rng.integers(0, candles // 2)
+        close[row, :pad] = high[row, :pad] = low[row, :pad] = np.nan
+    return high, low, close
+
+def _pandas_rsi(s: pd.Series, period: int) -> pd.Series:
+    delta = s.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    return 100 - 100 / (1 + gain / loss)
+
+def _pandas_atr(h: pd.Series, l: pd.Series, c: pd.Series, period: int) -> pd.Series:
+    prev = c.shift()
+    tr = pd.concat([h - l, (h - prev).abs(), (l - prev).abs()], axis=1).max(axis=1)
+    tr[(h - l).isna()] = np.nan
+    return tr.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+
+def _cases(high, low, close):
+    """(name, kernel, pandas reference applied to one symbol's series)"""
+    return [
+        ('sma(20)',
+         lambda: indicators.sma(close, 20),
+         lambda i: pd.Series(close[i]).rolling(20).mean()),
+        ('ema(20)',
+         lambda: indicators.ema(close, 20),
+         lambda i: pd.Series(close[i]).ewm(span=20, adjust=False).mean()),
+        ('rsi(14)',
+         lambda: indicators.rsi(close, 14),
+         lambda i: _pandas_rsi(pd.Series(close[i]), 14)),
+        ('atr(14)',
+         lambda: indicators.atr(high, low, close, 14),
+         lambda i: _pandas_atr(pd.Series(high[i]), pd.Series(low[i]), pd.Series(close[i]), 14)),
+        ('bollinger_upper(20)',
+         lambda: indicators.bollinger(close, 20)[1],
+         lambda i: (pd.Series(close[i]).rolling(20).mean() + 2 * pd.Series(close[i]).rolling(20).std(ddof=0))),
+        ('hl_volatility',
+         lambda: indicators.hl_volatility(high, low),
+         lambda i: (pd.Series(high[i]) - pd.Series(low[i])) / pd.Series(low[i]) * 100),
+    ]
+
+def _timed(func, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(symbols: int = 400, candles: int = 1000):
+    high, low, close = _random_candles(symbols, candles)
+    print(f"{symbols} symbols x {candles} candles, numba={'on' if indicators.NUMBA_AVAILABLE else 'off'}")
+    print(f"{'kernel':<22}{'kernel ms':>12}{'pandas ms':>12}{'speedup':>10}{'max abs err':>14}")
+
+    for name, kernel, reference in _cases(high, low, close):
+        result = kernel()  # also warms up JIT compilation
+        expected = np.vstack([reference(i).to_numpy() for i in range(symbols)])
+        if not np.allclose(result, expected, rtol=1e-9, atol=1e-9, equal_nan=True):
+            raise AssertionError(f"{name} does not match pandas")
+        error = np.nanmax(np.abs(result - expected))
+
+        kernel_time = _timed(kernel)
+        pandas_time = _timed(lambda: [reference(i) for i in range(symbols)], repeat=1)
+        print(f"{name:<22}{kernel_time * 1000:>12.2f}{pandas_time * 1000:>12.2f}"
+              f"{pandas_time / kernel_time:>9.1f}x{error:>14.2e}")
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
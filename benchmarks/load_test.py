@@ -0,0 +1,351 @@
+"""
+Load test of the FastAPI backend against a local mock of Binance and CoinGecko.
+
+The mock upstream and the backend (uvicorn, with BINANCE_API_BASE and
+COINGECKO_API_BASE pointed at the mock) each run in their own process, so
+the driver measures the backend alone. After a warm-up that records the
+upstream fan-out of a cold and a warm request per endpoint, virtual users
+replay a dashboard traffic mix in a closed loop, one stage per concurrency
+level. Every stage reports throughput, latency percentiles, errors, upstream
+requests per API request and the backend's resident memory.
+
+Usage: python benchmarks/load_test.py [--duration 20] [--levels 1,4,16,64]
+                                      [--latency 30] [--symbols 400]
+"""
+import os
+import sys
+import time
+import json
+import random
+import socket
+import hashlib
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+import aiohttp
+from aiohttp import web
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+BACKEND = os.path.join(ROOT, 'backend')
+
+sys.path.insert(0, BACKEND)
+from data_fetcher import INTERVAL_MS
+
+COINS = 1000
+AI_COIN_EVERY = 8  # every 8th coin has an AI-related name
+
+# Dashboard traffic mix: (weight, endpoint, parameter generator)
+def _trading_pairs_params(rng):
+    # Slider positions of the trading pairs page
+    return {
+        'min_volatility': round(rng.choice(np.arange(0.1, 10.0, 0.1)), 1),
+        'max_volatility': round(rng.choice(np.arange(1.0, 20.0, 0.5)), 1),
+        'min_volume': int(rng.choice(range(100_000, 10_000_001, 100_000))),
+        'limit': 50
+    }
+
+def _ai_tokens_params(rng):
+    return {'min_market_cap': int(rng.choice([1_000_000, 10_000_000, 100_000_000])), 'limit': int(rng.choice([10, 20, 50]))}
+
+def _trade_signals_params(rng):
+    return {'limit': int(rng.choice([10, 20]))}
+
+TRAFFIC_MIX = [
+    (35, '/trading-pairs', _trading_pairs_params),
+    (20, '/ai-tokens', _ai_tokens_params),
+    (20, '/market-trends', lambda rng: {}),
+    (25, '/trade-signals', _trade_signals_params),
+]
+
+# ---------------------------------------------------------------- mock upstream
+
+def _uniform(seed: int, keys: np.ndarray) -> np.ndarray:
+    """Deterministic uniform noise per (seed, key), so candles agree across requests"""
+    mixed = (keys.astype(np.uint64) * np.uint64(2654435761) + np.uint64(seed * 97 + 13)) % np.uint64(2 ** 32)
+    mixed = (mixed ^ (mixed >> np.uint64(13))) * np.uint64(1274126177) % np.uint64(2 ** 32)
+    return mixed.astype(float) / 2 ** 32
+
+class MockUpstream:
+    """Binance and CoinGecko endpoints used by the backend, with synthetic data"""
+
+    def __init__(self, symbols: int, latency: float):
+        self.latency = latency
+        self.requests = {}
+        rng = np.random.default_rng(0)
+        self.symbols = {}
+        for i in range(symbols):
+            for quote in ('USDT', 'BTC') if i % 4 == 0 else ('USDT',):
+                self.symbols[f"C{i:03d}{quote}"] = {
+                    'seed': len(self.symbols),
+                    'base': f"C{i:03d}",
+                    'quote': quote,
+                    'price': float(rng.lognormal(1, 2)),
+                    'volatility': float(rng.uniform(0.002, 0.04)),
+                    'volume': float(rng.lognormal(15, 2)),
+                }
+        self.coins = [{
+            'id': f"coin-{i:03d}",
+            'symbol': f"c{i:03d}",
+            'name': f"C{i:03d} {'AI Network' if i % AI_COIN_EVERY == 0 else 'Token'}",
+            'image': '',
+            'current_price': float(rng.lognormal(1, 2)),
+            'market_cap': 1e11 / (i + 1),
+            'total_volume': 1e9 / (i + 1),
+            'price_change_percentage_24h': float(rng.normal(0, 5)),
+        } for i in range(COINS)]
+
+    def klines(self, symbol: str, interval: str, limit: int, end_time=None):
+        info = self.symbols[symbol]
+        step = INTERVAL_MS[interval]
+        end = int(time.time() * 1000) if end_time is None else int(end_time)
+        opens = (end // step - np.arange(limit)[::-1]) * step
+        # A smooth cycle plus per-candle noise around the symbol's base price
+        minutes = opens // 60_000
+        cycle = np.sin(opens / 3.6e7 + info['seed'])
+        noise = _uniform(info['seed'], minutes) - 0.5
+        close = info['price'] * np.exp(info['volatility'] * (2 * cycle + noise))
+        open_ = info['price'] * np.exp(info['volatility'] * (2 * cycle + _uniform(info['seed'] + 1, minutes) - 0.5))
+        wick = info['volatility'] * _uniform(info['seed'] + 2, minutes)
+        high = np.maximum(open_, close) * (1 + wick)
+        low = np.minimum(open_, close) * (1 - wick)
+        volume = info['volume'] / info['price'] / 24 * (0.5 + _uniform(info['seed'] + 3, minutes))
+        return [[int(o), f"{op:.8f}", f"{h:.8f}", f"{l:.8f}", f"{c:.8f}", f"{v:.4f}", int(o) + step - 1,
+                 f"{v * c:.4f}", 100, "0", "0", "0"]
+                for o, op, h, l, c, v in zip(opens, open_, high, low, close, volume)]
+
+    def ticker(self, symbol: str):
+        day = self.klines(symbol, '1h', 24)
+        first, last = float(day[0][1]), float(day[-1][4])
+        return {
+            'symbol': symbol,
+            'lastPrice': day[-1][4],
+            'priceChangePercent': f"{(last - first) / first * 100:.3f}",
+            'highPrice': str(max(float(k[2]) for k in day)),
+            'lowPrice': str(min(float(k[3]) for k in day)),
+            'volume': str(sum(float(k[5]) for k in day)),
+            'quoteVolume': str(self.symbols[symbol]['volume']),
+        }
+
+    def depth(self, symbol: str, limit: int):
+        """A book around the last close; thin books for some symbols, so liquidity ranking has work to do"""
+        info = self.symbols[symbol]
+        price = float(self.klines(symbol, '1h', 1)[-1][4])
+        tick = price * 1e-4 * (1 + info['seed'] % 5)
+        levels = np.arange(limit)
+        quantity = info['volume'] / price / 2e4 * (0.2 + _uniform(info['seed'] + 4, levels)) / (1 + 9 * (info['seed'] % 7 == 0))
+        return {
+            'lastUpdateId': int(time.time()),
+            'bids': [[f"{price - tick * (i + 1):.8f}", f"{q:.4f}"] for i, q in zip(levels, quantity)],
+            'asks': [[f"{price + tick * (i + 1):.8f}", f"{q:.4f}"] for i, q in zip(levels, quantity[::-1])],
+        }
+
+    async def handle(self, request: web.Request):
+        path = request.path.split('/api/v3', 1)[-1]
+        self.requests[path] = self.requests.get(path, 0) + 1
+        await asyncio.sleep(self.latency)
+        query = request.query
+        if path == '/ticker/24hr':
+            return web.json_response([self.ticker(symbol) for symbol in self.symbols])
+        if path == '/klines':
+            symbol = query.get('symbol')
+            if symbol not in self.symbols or query.get('interval') not in INTERVAL_MS:
+                return web.json_response({'code': -1121, 'msg': 'Invalid symbol.'}, status=400)
+            limit = min(int(query.get('limit', 500)), 1000)
+            return web.json_response(self.klines(symbol, query['interval'], limit, query.get('endTime')))
+        if path == '/depth':
+            symbol = query.get('symbol')
+            if symbol not in self.symbols:
+                return web.json_response({'code': -1121, 'msg': 'Invalid symbol.'}, status=400)
+            return web.json_response(self.depth(symbol, min(int(query.get('limit', 100)), 5000)))
+        if path == '/exchangeInfo':
+            return web.json_response({'symbols': [
+                {'symbol': s, 'status': 'TRADING', 'baseAsset': info['base'], 'quoteAsset': info['quote']}
+                for s, info in self.symbols.items()
+            ]})
+        if path == '/coins/markets':
+            per_page, page = int(query.get('per_page', 100)), int(query.get('page', 1))
+            coins = self.coins
+            if 'category' in query:
+                # A deterministic quarter of the coins belongs to each category
+                coins = [c for c in coins if int(hashlib.md5(f"{query['category']}/{c['id']}".encode()).hexdigest(), 16) % 4 == 0]
+            return web.json_response(coins[(page - 1) * per_page:page * per_page])
+        return web.json_response({'error': 'not found'}, status=404)
+
+    async def stats(self, request: web.Request):
+        return web.json_response(self.requests)
+
+def run_mock(port: int, symbols: int, latency: float):
+    mock = MockUpstream(symbols, latency)
+    app = web.Application()
+    app.router.add_get('/_stats', mock.stats)
+    app.router.add_get('/{tail:.*}', mock.handle)
+    web.run_app(app, host='127.0.0.1', port=port, print=None, access_log=None)
+
+# ---------------------------------------------------------------- driver
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _rss_mb(pid: int):
+    """Resident memory of a process in MB, from /proc (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+async def _upstream_total(session, mock_url: str) -> int:
+    async with session.get(f"{mock_url}/_stats") as response:
+        return sum((await response.json()).values())
+
+async def _wait_until_up(session, url: str, process, timeout: float = 30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"process exited with status {process.returncode}")
+        try:
+            async with session.get(url) as response:
+                if response.status < 500:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+async def _request(session, api_url: str, endpoint: str, params):
+    start = time.perf_counter()
+    try:
+        async with session.get(f"{api_url}{endpoint}", params=params) as response:
+            await response.read()
+            ok = response.status == 200
+    except Exception:
+        ok = False
+    return time.perf_counter() - start, ok
+
+async def warm_up(session, api_url: str, mock_url: str):
+    """Cold and warm latency and upstream fan-out of one request per endpoint"""
+    print(f"{'endpoint':<18}{'cold ms':>10}{'upstream':>10}{'warm ms':>10}{'upstream':>10}")
+    rng = random.Random(0)
+    for _, endpoint, make_params in TRAFFIC_MIX:
+        params = make_params(rng)
+        row = []
+        for _ in range(2):
+            before = await _upstream_total(session, mock_url)
+            latency, ok = await _request(session, api_url, endpoint, params)
+            row.append((latency, await _upstream_total(session, mock_url) - before, ok))
+        (cold, cold_fan, cold_ok), (warm, warm_fan, _) = row
+        flag = '' if cold_ok else '  (error)'
+        print(f"{endpoint:<18}{cold * 1000:>10.0f}{cold_fan:>10}{warm * 1000:>10.1f}{warm_fan:>10}{flag}")
+
+async def run_stage(session, api_url: str, mock_url: str, users: int, duration: float, pid: int):
+    rng = random.Random(users)
+    weights = [weight for weight, _, _ in TRAFFIC_MIX]
+    latencies, errors = [], 0
+    by_endpoint = {endpoint: [] for _, endpoint, _ in TRAFFIC_MIX}
+    deadline = time.perf_counter() + duration
+
+    async def user():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            _, endpoint, make_params = rng.choices(TRAFFIC_MIX, weights)[0]
+            latency, ok = await _request(session, api_url, endpoint, make_params(rng))
+            latencies.append(latency)
+            by_endpoint[endpoint].append(latency)
+            errors += not ok
+
+    upstream_before = await _upstream_total(session, mock_url)
+    start = time.perf_counter()
+    await asyncio.gather(*[user() for _ in range(users)])
+    elapsed = time.perf_counter() - start
+    fan_out = (await _upstream_total(session, mock_url) - upstream_before) / max(len(latencies), 1)
+
+    ms = np.array(latencies) * 1000
+    return {
+        'users': users,
+        'throughput': len(latencies) / elapsed,
+        'p50': np.percentile(ms, 50), 'p95': np.percentile(ms, 95), 'p99': np.percentile(ms, 99), 'max': ms.max(),
+        'errors': errors,
+        'fan_out': fan_out,
+        'rss': _rss_mb(pid),
+        'by_endpoint': {e: np.percentile(np.array(l) * 1000, [50, 95]) for e, l in by_endpoint.items() if l},
+    }
+
+async def drive(api_url: str, mock_url: str, levels, duration: float, backend, mock):
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=120)) as session:
+        await _wait_until_up(session, f"{mock_url}/_stats", mock)
+        await _wait_until_up(session, f"{api_url}/", backend)
+        await warm_up(session, api_url, mock_url)
+        baseline = _rss_mb(backend.pid)
+
+        print(f"\n{duration:.0f}s per stage, memory is the backend's RSS after the stage")
+        print(f"{'users':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+              f"{'errors':>8}{'upstream/req':>14}{'rss MB':>9}{'growth':>9}")
+        results = []
+        for users in levels:
+            result = await run_stage(session, api_url, mock_url, users, duration, backend.pid)
+            results.append(result)
+            rss = f"{result['rss']:>9.1f}{result['rss'] - baseline:>+9.1f}" if result['rss'] and baseline else f"{'-':>9}{'-':>9}"
+            print(f"{users:>6}{result['throughput']:>9.1f}{result['p50']:>9.1f}{result['p95']:>9.1f}"
+                  f"{result['p99']:>9.1f}{result['max']:>9.0f}{result['errors']:>8}{result['fan_out']:>14.2f}{rss}")
+
+        print(f"\n{'p50 / p95 ms by endpoint':<26}" + ''.join(f"{r['users']:>14}" for r in results))
+        for _, endpoint, _ in TRAFFIC_MIX:
+            cells = ''.join(f"{'%.0f / %.0f' % tuple(r['by_endpoint'][endpoint]):>14}" if endpoint in r['by_endpoint'] else f"{'-':>14}"
+                            for r in results)
+            print(f"{endpoint:<26}{cells}")
+
+        best = max(results, key=lambda r: r['throughput'])
+        print(f"\npeak throughput {best['throughput']:.1f} req/s at {best['users']} users "
+              f"(p95 {best['p95']:.0f} ms)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=20, help='seconds per concurrency level')
+    parser.add_argument('--levels', default='1,4,16,64', help='comma-separated numbers of concurrent users')
+    parser.add_argument('--latency', type=float, default=30, help='mock upstream latency in ms')
+    parser.add_argument('--symbols', type=int, default=400, help='base assets listed by the mock exchange')
+    parser.add_argument('--mock', type=int, help=argparse.SUPPRESS)  # internal: run the mock on this port
+    args = parser.parse_args()
+
+    if args.mock:
+        run_mock(args.mock, args.symbols, args.latency / 1000)
+        return
+
+    mock_port, api_port = _free_port(), _free_port()
+    mock_url, api_url = f"http://127.0.0.1:{mock_port}", f"http://127.0.0.1:{api_port}"
+    workdir = tempfile.mkdtemp(prefix='eolas_load_')
+    env = dict(
+        os.environ,
+        BINANCE_API_BASE=f"{mock_url}/api/v3",
+        COINGECKO_API_BASE=f"{mock_url}/api/v3",
+        SNAPSHOT_DIR=os.path.join(workdir, 'snapshots'),
+        DASHBOARD_LAST_GOOD_FILE=os.path.join(workdir, 'dashboard_last_good.json'),
+        WATCHLIST_FILE=os.path.join(workdir, 'watchlists.json'),
+        HISTORY_DIR=os.path.join(workdir, 'history'),
+        CATEGORY_CACHE_FILE=os.path.join(workdir, 'categories.json'),
+    )
+    log_path = os.path.join(workdir, 'backend.log')
+    mock = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--mock', str(mock_port),
+                             '--latency', str(args.latency), '--symbols', str(args.symbols)])
+    with open(log_path, 'w') as log:
+        backend = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(api_port),
+                                    '--log-level', 'warning'], cwd=BACKEND, env=env, stdout=log, stderr=log)
+    print(f"mock upstream {mock_url} ({args.latency:.0f} ms latency), backend {api_url}, log {log_path}\n")
+
+    try:
+        levels = [int(level) for level in args.levels.split(',')]
+        asyncio.run(drive(api_url, mock_url, levels, args.duration, backend, mock))
+    finally:
+        for process in (backend, mock):
+            process.terminate()
+            process.wait()
+
+if __name__ == "__main__":
+    main()
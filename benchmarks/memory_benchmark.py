@@ -0,0 +1,107 @@
+"""
+Per-symbol memory footprint of the upstream data as held by the backend.
+
+Synthetic Binance payloads are decoded from JSON, as fetch_with_cache does,
+and their size is compared with the compact records of backend/records.py
+they are parsed into at ingestion: tickers as slotted dataclasses, klines as
+candle arrays. The time to stack closes and volumes for analysis is shown
+for both, since raw klines had to be parsed with float() on every use.
+
+Usage: python benchmarks/memory_benchmark.py [symbols]
+"""
+import os
+import sys
+import gc
+import json
+import time
+import random
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+import records
+import data_fetcher
+
+def _ticker_payload(symbols: int) -> str:
+    rng = random.Random(0)
+    rows = []
+    for i in range(symbols):
+        price = rng.uniform(0.01, 1000)
+        rows.append({
+            'symbol': f"C{i:04d}USDT", 'priceChange': f"{price * 0.01:.8f}", 'priceChangePercent': f"{rng.uniform(-9, 9):.3f}",
+            'weightedAvgPrice': f"{price:.8f}", 'prevClosePrice': f"{price:.8f}", 'lastPrice': f"{price:.8f}",
+            'lastQty': f"{rng.uniform(1, 99):.8f}", 'bidPrice': f"{price:.8f}", 'bidQty': f"{rng.uniform(1, 99):.8f}",
+            'askPrice': f"{price:.8f}", 'askQty': f"{rng.uniform(1, 99):.8f}", 'openPrice': f"{price:.8f}",
+            'highPrice': f"{price * 1.05:.8f}", 'lowPrice': f"{price * 0.95:.8f}", 'volume': f"{rng.uniform(1e3, 1e7):.8f}",
+            'quoteVolume': f"{rng.uniform(1e5, 1e9):.8f}", 'openTime': 1700000000000, 'closeTime': 1700086399999,
+            'firstId': 1, 'lastId': 100000, 'count': 100000,
+        })
+    return json.dumps(rows)
+
+def _kline_payload(candles: int, seed: int) -> str:
+    rng = random.Random(seed)
+    price = rng.uniform(0.01, 1000)
+    rows = []
+    for i in range(candles):
+        open_time = 1700000000000 + i * 3_600_000
+        rows.append([open_time, f"{price:.8f}", f"{price * 1.01:.8f}", f"{price * 0.99:.8f}", f"{price:.8f}",
+                     f"{rng.uniform(1e2, 1e6):.8f}", open_time + 3_599_999, f"{rng.uniform(1e4, 1e8):.8f}",
+                     rng.randint(10, 9999), f"{rng.uniform(1e2, 1e5):.8f}", f"{rng.uniform(1e4, 1e7):.8f}", "0"])
+    return json.dumps(rows)
+
+def _allocated(build):
+    """(bytes allocated by build() and still alive, its result)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, result
+
+def _stack_raw(klines_by_symbol):
+    """Stacking as it was done on raw klines: float() on every value, on every use"""
+    symbols = list(klines_by_symbol)
+    length = max(len(k) for k in klines_by_symbol.values())
+    close, volume = np.full((len(symbols), length), np.nan), np.full((len(symbols), length), np.nan)
+    for row, symbol in enumerate(symbols):
+        data = np.asarray([[k[4], k[5]] for k in klines_by_symbol[symbol]], dtype=float)
+        close[row, length - len(data):], volume[row, length - len(data):] = data[:, 0], data[:, 1]
+    return symbols, close, volume
+
+def _best_of(fn, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main(symbols: int = 1000):
+    print(f"{symbols} symbols, bytes per symbol")
+    print(f"{'data':<26}{'raw JSON':>12}{'compact':>12}{'ratio':>8}")
+
+    payload = _ticker_payload(symbols)
+    raw_size, raw = _allocated(lambda: json.loads(payload))
+    compact_size, _ = _allocated(lambda: records.parse_tickers(raw))
+    print(f"{'ticker':<26}{raw_size / symbols:>12.0f}{compact_size / symbols:>12.0f}{raw_size / compact_size:>7.1f}x")
+
+    stacked = {}
+    for candles, label in ((24, 'klines, 24 x 1h'), (500, 'candle store, 500 candles')):
+        payloads = [_kline_payload(candles, seed) for seed in range(symbols)]
+        raw_size, raw = _allocated(lambda: [json.loads(p) for p in payloads])
+        compact_size, compact = _allocated(lambda: [records.parse_klines(k) for k in raw])
+        print(f"{label:<26}{raw_size / symbols:>12.0f}{compact_size / symbols:>12.0f}{raw_size / compact_size:>7.1f}x")
+        stacked[candles] = (raw, compact)
+
+    print(f"\nstacking close and volume for analysis, {symbols} symbols")
+    print(f"{'candles':<26}{'raw ms':>12}{'compact ms':>12}{'speedup':>8}")
+    for candles, (raw, compact) in stacked.items():
+        raw_by_symbol = {f"S{i}": k for i, k in enumerate(raw)}
+        compact_by_symbol = {f"S{i}": k for i, k in enumerate(compact)}
+        assert np.allclose(_stack_raw(raw_by_symbol)[1], data_fetcher.stack_klines(compact_by_symbol)[1])
+        raw_time = _best_of(lambda: _stack_raw(raw_by_symbol))
+        compact_time = _best_of(lambda: data_fetcher.stack_klines(compact_by_symbol))
+        print(f"{candles:<26}{raw_time * 1000:>12.1f}{compact_time * 1000:>12.1f}{raw_time / compact_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
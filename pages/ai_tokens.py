@@ -1,8 +1,8 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from pages.utils import *
 from pages.api_functions import *
+from pages.charts import *
 
 def show_ai_tokens(api_base_url, cache_duration):
     """Display AI tokens tracking page"""
@@ -22,12 +22,12 @@ def show_ai_tokens(api_base_url, cache_duration):
     with col2:
         token_count = st.slider("Number of tokens to display", 5, 50, 20)
     
-    # Fetch AI tokens
-    ai_tokens = fetch_ai_tokens(api_base_url, min_market_cap=min_market_cap, limit=token_count)
+    # Filter the shared snapshot locally; moving the widgets costs no requests
+    df = filter_ai_tokens(current_snapshot(api_base_url)['ai_tokens'], min_market_cap=min_market_cap, limit=token_count)
     
-    if ai_tokens:
-        # Create dataframe
-        df = pd.DataFrame(ai_tokens)
+    if not df.empty:
+        # Charts and table are rebuilt only when the token data changes
+        key = frame_key(df)
         
         # Performance overview
         st.markdown("<h2 class='sub-header'>AI Token Performance</h2>", unsafe_allow_html=True)
@@ -36,26 +36,13 @@ def show_ai_tokens(api_base_url, cache_duration):
         
         with col1:
             # Performance chart
-            performance_df = df[['symbol', 'price_change_24h']].sort_values('price_change_24h', ascending=False)
-            
-            fig = px.bar(
-                performance_df,
-                x='symbol',
-                y='price_change_24h',
-                title='24h Price Change (%)',
-                labels={'symbol': 'Token', 'price_change_24h': '24h Change (%)'},
-                color='price_change_24h',
-                color_continuous_scale=['red', 'lightgray', 'green'],
-                range_color=[-10, 10]
-            )
-            
-            fig.update_layout(xaxis_tickangle=-45)
-            st.plotly_chart(fig, use_container_width=True)
+            show_figure(ai_token_performance_figure(key, df))
         
         with col2:
             # Key metrics
-            pos_tokens = len([t for t in ai_tokens if t.get('price_change_24h', 0) > 0])
-            neg_tokens = len([t for t in ai_tokens if t.get('price_change_24h', 0) < 0])
+            changes = df['price_change_24h'].fillna(0)
+            pos_tokens = int((changes > 0).sum())
+            neg_tokens = int((changes < 0).sum())
             
             st.metric(
                 "Overall AI Token Sentiment",
@@ -63,60 +50,41 @@ def show_ai_tokens(api_base_url, cache_duration):
                 f"{pos_tokens}/{neg_tokens} (Positive/Negative)"
             )
             
-            avg_change = sum(t.get('price_change_24h', 0) for t in ai_tokens) / len(ai_tokens)
+            avg_change = changes.mean()
             st.metric("Average 24h Change", f"{avg_change:.2f}%")
             
             # Best and worst performers
-            best_token = max(ai_tokens, key=lambda x: x.get('price_change_24h', 0))
-            worst_token = min(ai_tokens, key=lambda x: x.get('price_change_24h', 0))
+            best_token = df.loc[changes.idxmax()]
+            worst_token = df.loc[changes.idxmin()]
             
             st.metric(
                 "Best Performer",
                 best_token['symbol'],
-                f"{best_token.get('price_change_24h', 0):.2f}%",
+                f"{changes[best_token.name]:.2f}%",
                 delta_color="normal"
             )
             
             st.metric(
                 "Worst Performer",
                 worst_token['symbol'],
-                f"{worst_token.get('price_change_24h', 0):.2f}%", 
+                f"{changes[worst_token.name]:.2f}%", 
                 delta_color="inverse"
             )
         
         # Market cap comparison
         st.markdown("<h2 class='sub-header'>Market Cap Distribution</h2>", unsafe_allow_html=True)
         
-        market_cap_fig = px.treemap(
-            df,
-            path=['symbol'],
-            values='market_cap',
-            color='price_change_24h',
-            color_continuous_scale=['red', 'lightgray', 'green'],
-            range_color=[-10, 10],
-            title='AI Token Market Cap Distribution',
-            hover_data=['current_price', 'price_change_24h']
-        )
-        
-        market_cap_fig.update_layout(height=500)
-        st.plotly_chart(market_cap_fig, use_container_width=True)
+        show_figure(ai_token_treemap_figure(key, df))
         
         # Token details table
         st.markdown("<h2 class='sub-header'>AI Token Details</h2>", unsafe_allow_html=True)
         
-        display_df = df[['symbol', 'name', 'current_price', 'price_change_24h', 'market_cap', 'volume_24h']]
-        display_df.columns = ['Symbol', 'Name', 'Current Price', '24h Change (%)', 'Market Cap', '24h Volume']
-        
-        st.dataframe(
-            display_df.style.format({
-                'Current Price': '${:.4f}',
-                '24h Change (%)': '{:.2f}',
-                'Market Cap': '${:,.0f}',
-                '24h Volume': '${:,.0f}'
-            }),
-            height=400,
-            use_container_width=True
-        )
+        show_table(table_view(
+            key, df,
+            {'symbol': 'Symbol', 'name': 'Name', 'current_price': 'Current Price',
+             'price_change_24h': '24h Change (%)', 'market_cap': 'Market Cap', 'volume_24h': '24h Volume'},
+            {'Current Price': '$%.4f', '24h Change (%)': '%.2f', 'Market Cap': 'dollar', '24h Volume': 'dollar'}
+        ))
         
         # Download button for CSV
         csv = df.to_csv(index=False).encode('utf-8')
@@ -1,57 +1,168 @@
 import streamlit as st
 import requests
+import pandas as pd
+from pages.snapshot_reader import load_snapshot
+
+# Dashboard snapshot tables, published by the backend under each version
+SNAPSHOT_TABLES = ("pairs", "ai_tokens", "signals")
+SNAPSHOT_MAX_AGE = 3600  # a version identifies the data, so only very old files are ignored
+
+EMPTY_SNAPSHOT = {"version": None, "stale_since": None, "trends": {}, **{table: pd.DataFrame() for table in SNAPSHOT_TABLES}}
+
+@st.cache_data(ttl=15)
+def fetch_snapshot_version(api_base_url):
+    """Version of the backend's current dashboard snapshot"""
+    try:
+        response = requests.get(f"{api_base_url}/snapshot/version")
+        return response.json()["version"]
+    except Exception as e:
+        st.error(f"Error fetching snapshot version: {str(e)}")
+        return None
+
+@st.cache_resource(max_entries=2)
+def load_dashboard_snapshot(api_base_url, version):
+    """
+    Dashboard snapshot of one backend version, shared by all sessions. Tables
+    come from local Arrow files when available, everything else over HTTP.
+    The returned frames are shared, so callers must not modify them.
+    """
+    frames = {table: load_snapshot(f"/snapshot/{table}", {"version": version}, SNAPSHOT_MAX_AGE)
+              for table in SNAPSHOT_TABLES}
+    missing = [table for table, df in frames.items() if df is None]
+
+    response = requests.get(f"{api_base_url}/snapshot", params={"tables": ",".join(["trends"] + missing)})
+    response.raise_for_status()
+    body = response.json()
+    if body["version"] != version:
+        # Rebuilt in between; take every table over HTTP so they stay consistent
+        response = requests.get(f"{api_base_url}/snapshot")
+        response.raise_for_status()
+        body = response.json()
+        missing = list(SNAPSHOT_TABLES)
+
+    for table in missing:
+        frames[table] = pd.DataFrame(body[table])
+    return {"version": body["version"], "stale_since": body.get("stale_since"), "trends": body["trends"], **frames}
+
+def current_snapshot(api_base_url):
+    """The current dashboard snapshot; fetched once per backend version, not per widget change"""
+    version = fetch_snapshot_version(api_base_url)
+    if version is None:
+        return EMPTY_SNAPSHOT
+    try:
+        snapshot = load_dashboard_snapshot(api_base_url, version)
+    except Exception as e:
+        st.error(f"Error fetching dashboard snapshot: {str(e)}")
+        return EMPTY_SNAPSHOT
+    if snapshot["stale_since"]:
+        since = pd.Timestamp(snapshot["stale_since"]).strftime('%Y-%m-%d %H:%M')
+        st.warning(f"Market data sources are unavailable; showing the last good data from {since}")
+    return snapshot
+
+def filter_grid_pairs(pairs, min_volatility=0.5, max_volatility=5.0, min_volume=1000000, limit=20):
+    """Same selection as /trading-pairs, applied locally to the snapshot's pairs"""
+    if pairs.empty:
+        return pairs
+    mask = pairs['avg_hourly_volatility'].between(min_volatility, max_volatility) & (pairs['volume_24h'] >= min_volume)
+    return pairs[mask].nlargest(limit, 'liquidity_adjusted_profit').reset_index(drop=True)
+
+def filter_ai_tokens(tokens, min_market_cap=1000000, limit=20):
+    """Same selection as /ai-tokens, applied locally to the snapshot's tokens"""
+    if tokens.empty:
+        return tokens
+    return tokens[tokens['market_cap'] >= min_market_cap].nlargest(limit, 'market_cap').reset_index(drop=True)
 
 @st.cache_data(ttl=60)
-def fetch_trading_pairs(api_base_url, min_volatility=0.5, max_volatility=5.0, min_volume=1000000, limit=20):
-    """Fetch trading pairs from the API"""
+def fetch_price_history(api_base_url, symbol, interval="1h", candles=720, max_points=800):
+    """Fetch a price history, downsampled by the backend to about the chart width"""
     try:
         response = requests.get(
-            f"{api_base_url}/trading-pairs",
-            params={
-                "min_volatility": min_volatility,
-                "max_volatility": max_volatility, 
-                "min_volume": min_volume,
-                "limit": limit
-            }
+            f"{api_base_url}/price-history",
+            params={"symbol": symbol, "interval": interval, "candles": candles, "max_points": max_points}
         )
-        return response.json()["pairs"]
+        return response.json()["history"]
     except Exception as e:
-        st.error(f"Error fetching trading pairs: {str(e)}")
-        return []
+        st.error(f"Error fetching price history: {str(e)}")
+        return {}
 
 @st.cache_data(ttl=60)
-def fetch_ai_tokens(api_base_url, min_market_cap=1000000, limit=20):
-    """Fetch AI tokens from the API"""
+def fetch_history(api_base_url, series, hours=24, resolution=None):
+    """Fetch a recorded metric series; the backend picks the resolution unless one is given"""
     try:
         response = requests.get(
-            f"{api_base_url}/ai-tokens",
-            params={"min_market_cap": min_market_cap, "limit": limit}
+            f"{api_base_url}/history/{series}",
+            params={"hours": hours, "resolution": resolution}
         )
-        return response.json()["tokens"]
+        if response.status_code == 404:
+            # Nothing recorded yet
+            return {}
+        return response.json()["history"]
     except Exception as e:
-        st.error(f"Error fetching AI tokens: {str(e)}")
-        return []
+        st.error(f"Error fetching {series} history: {str(e)}")
+        return {}
 
-@st.cache_data(ttl=60)
-def fetch_market_trends(api_base_url):
-    """Fetch market trends from the API"""
+def submit_scan(api_base_url, min_volatility=0.5, max_volatility=5.0, min_volume=1000000, limit=20, simulate=False):
+    """Start a background grid pair scan; identical pending or recent scans are reused by the backend"""
     try:
-        response = requests.get(f"{api_base_url}/market-trends")
-        return response.json()["trends"]
+        response = requests.post(
+            f"{api_base_url}/scans",
+            params={"min_volatility": min_volatility, "max_volatility": max_volatility,
+                    "min_volume": min_volume, "limit": limit, "simulate": simulate}
+        )
+        if response.status_code != 200:
+            st.error(f"Error starting scan: {response.json().get('detail', response.status_code)}")
+            return None
+        return response.json()["scan"]
     except Exception as e:
-        st.error(f"Error fetching market trends: {str(e)}")
-        return {}
+        st.error(f"Error starting scan: {str(e)}")
+        return None
 
-@st.cache_data(ttl=60)
-def fetch_trade_signals(api_base_url, pairs=None, limit=10):
-    """Fetch trade signals from the API"""
-    try:
-        params = {"limit": limit}
-        if pairs:
-            params["pairs"] = ",".join(pairs)
-            
-        response = requests.get(f"{api_base_url}/trade-signals", params=params)
-        return response.json()["signals"]
-    except Exception as e:
-        st.error(f"Error fetching trade signals: {str(e)}")
-        return []
\ No newline at end of file
+def fetch_scan(api_base_url, scan_id):
+    """Current state of a background scan, including its partial results"""
+    try:
+        response = requests.get(f"{api_base_url}/scans/{scan_id}")
+        if response.status_code == 404:
+            return None
+        return response.json()["scan"]
+    except Exception as e:
+        st.error(f"Error fetching scan: {str(e)}")
+        return None
+
+def fetch_watchlist(api_base_url, name):
+    """Fetch a server-side watch list; None if it does not exist yet"""
+    try:
+        response = requests.get(f"{api_base_url}/watchlists/{name}")
+        if response.status_code == 404:
+            return None
+        return response.json()["watchlist"]
+    except Exception as e:
+        st.error(f"Error fetching watch list: {str(e)}")
+        return None
+
+def save_watchlist(api_base_url, name, symbols, interval="1h", webhook=None):
+    """Create or replace a server-side watch list"""
+    try:
+        params = {"symbols": ",".join(symbols), "interval": interval}
+        if webhook:
+            params["webhook"] = webhook
+        response = requests.put(f"{api_base_url}/watchlists/{name}", params=params)
+        if response.status_code != 200:
+            st.error(f"Error saving watch list: {response.json().get('detail', response.status_code)}")
+            return False
+        fetch_watchlist_alerts.clear()
+        return True
+    except Exception as e:
+        st.error(f"Error saving watch list: {str(e)}")
+        return False
+
+@st.cache_data(ttl=15)
+def fetch_watchlist_alerts(api_base_url, name, limit=20):
+    """Fetch the recent alerts of a watch list"""
+    try:
+        response = requests.get(f"{api_base_url}/watchlists/{name}/alerts", params={"limit": limit})
+        if response.status_code == 404:
+            return []
+        return response.json()["alerts"]
+    except Exception as e:
+        st.error(f"Error fetching alerts: {str(e)}")
+        return []
@@ -0,0 +1,136 @@
+import json
+import hashlib
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Figure builders return Plotly JSON and are memoized on their input data, so
+# reruns with unchanged data skip building and serializing the figure.
+# Builders taking a DataFrame are keyed by `frame_key(df)`; the frame itself
+# is passed as `_df`, which Streamlit leaves out of the cache key.
+
+def frame_key(df):
+    """Content hash of a DataFrame, used as the cache key of the builders below"""
+    hashed = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    header = "\x1f".join(map(str, df.columns)).encode()
+    return hashlib.sha1(header + hashed.tobytes()).hexdigest()
+
+@st.cache_data(max_entries=64)
+def price_history_figure(history, range_low=None, range_high=None):
+    """Close price line of a (downsampled) history, with an optional grid range band"""
+    series = history['series']
+    fig = go.Figure(go.Scatter(
+        x=pd.to_datetime(series['open_time'], unit='ms'),
+        y=series['close'],
+        mode='lines',
+        line=dict(color='#1E88E5', width=1.5),
+        name='Close',
+    ))
+
+    if range_low is not None and range_high is not None:
+        fig.add_hrect(y0=range_low, y1=range_high, fillcolor='rgba(173, 216, 230, 0.3)', line_width=0)
+
+    title = f"{history['symbol']} {history['interval']} close"
+    if history.get('method'):
+        title += f" ({history['points']} of {history['candles']} candles, {history['method']})"
+    fig.update_layout(title=title, height=350, showlegend=False, margin=dict(l=20, r=20, t=50, b=20))
+    return fig.to_json()
+
+@st.cache_data(max_entries=32)
+def history_figure(history, title, columns=None, colors=None):
+    """Lines of recorded metrics over time, all columns unless `columns` is given"""
+    times = pd.to_datetime(history['time'], unit='s')
+    names = [name for name in (columns or history['columns']) if name in history['columns']]
+    fig = go.Figure([go.Scatter(x=times, y=history['columns'][name], mode='lines', name=name,
+                                line=dict(color=(colors or {}).get(name)), connectgaps=False)
+                     for name in names])
+    fig.update_layout(title=f"{title} ({history['resolution']})", height=400,
+                      margin=dict(l=20, r=20, t=50, b=20))
+    return fig.to_json()
+
+@st.cache_data(max_entries=64)
+def grid_levels_figure(symbol, range_low, range_high, current_price, grid_levels):
+    """Grid range, levels and current price; all shapes are added in one layout update"""
+    step = (range_high - range_low) / grid_levels
+    grid_prices = [range_low + i * step for i in range(grid_levels + 1)]
+
+    shapes = [dict(type="rect", x0=0, x1=1, y0=range_low, y1=range_high, layer="below",
+                   fillcolor="rgba(173, 216, 230, 0.3)", line_width=0)]
+    shapes += [dict(type="line", x0=0, x1=1, y0=price, y1=price,
+                    line=dict(color="rgba(70, 130, 180, 0.5)", width=1, dash="dash"))
+               for price in grid_prices]
+    shapes.append(dict(type="line", x0=0, x1=1, y0=current_price, y1=current_price,
+                       line=dict(color="black", width=2)))
+
+    annotations = [dict(x=1.01, y=price, text=f"${price:.4f}", showarrow=False, xanchor='left')
+                   for price in grid_prices]
+    annotations.append(dict(x=0, y=current_price, text=f"Current Price: ${current_price:.4f}",
+                            showarrow=False, xanchor='left', bgcolor="rgba(255, 255, 255, 0.8)"))
+
+    # Invisible trace so the y axis autoranges over the grid
+    fig = go.Figure(go.Scatter(x=[0, 1], y=[range_low, range_high], mode='markers',
+                               marker_opacity=0, hoverinfo='skip'))
+    fig.update_layout(
+        title=f"Grid Trading Visualization for {symbol}",
+        height=400,
+        showlegend=False,
+        xaxis=dict(visible=False, showticklabels=False, range=[0, 1]),
+        margin=dict(l=20, r=100, t=50, b=20),
+        shapes=shapes,
+        annotations=annotations,
+    )
+    return fig.to_json()
+
+@st.cache_data(max_entries=16)
+def ai_token_performance_figure(key, _df):
+    """24h price change bar chart of AI tokens"""
+    performance_df = _df[['symbol', 'price_change_24h']].sort_values('price_change_24h', ascending=False)
+    fig = px.bar(
+        performance_df,
+        x='symbol',
+        y='price_change_24h',
+        title='24h Price Change (%)',
+        labels={'symbol': 'Token', 'price_change_24h': '24h Change (%)'},
+        color='price_change_24h',
+        color_continuous_scale=['red', 'lightgray', 'green'],
+        range_color=[-10, 10]
+    )
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig.to_json()
+
+@st.cache_data(max_entries=16)
+def ai_token_treemap_figure(key, _df):
+    """Market cap treemap of AI tokens, colored by 24h change"""
+    fig = px.treemap(
+        _df,
+        path=['symbol'],
+        values='market_cap',
+        color='price_change_24h',
+        color_continuous_scale=['red', 'lightgray', 'green'],
+        range_color=[-10, 10],
+        title='AI Token Market Cap Distribution',
+        hover_data=['current_price', 'price_change_24h']
+    )
+    fig.update_layout(height=500)
+    return fig.to_json()
+
+@st.cache_data(max_entries=32)
+def table_view(key, _df, columns, formats):
+    """
+    Display frame and column config for `st.dataframe`. `columns` maps source
+    to display names and `formats` display names to number formats, which the
+    browser applies, so no Styler is built on reruns.
+    """
+    display_df = _df[list(columns)].rename(columns=columns)
+    column_config = {name: st.column_config.NumberColumn(name, format=fmt) for name, fmt in formats.items()}
+    return display_df, column_config
+
+def show_table(table, height=400):
+    """Render a cached table view"""
+    display_df, column_config = table
+    st.dataframe(display_df, column_config=column_config, height=height, use_container_width=True)
+
+def show_figure(figure_json):
+    """Render a cached figure"""
+    st.plotly_chart(json.loads(figure_json), use_container_width=True)
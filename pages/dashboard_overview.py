@@ -8,11 +8,12 @@ def show_dashboard_overview(api_base_url, cache_duration):
     """Display dashboard overview page"""
     st.markdown("<h1 class='main-header'>Crypto Trading Insights Dashboard</h1>", unsafe_allow_html=True)
     
-    # Load data for the dashboard
-    trading_pairs = fetch_trading_pairs(api_base_url, limit=5)
-    ai_tokens = fetch_ai_tokens(api_base_url, limit=5)
-    market_trends = fetch_market_trends(api_base_url)
-    trade_signals = fetch_trade_signals(api_base_url, limit=5)
+    # Load data for the dashboard from the shared snapshot
+    snapshot = current_snapshot(api_base_url)
+    trading_pairs = filter_grid_pairs(snapshot['pairs'], limit=5).to_dict('records')
+    ai_tokens = filter_ai_tokens(snapshot['ai_tokens'], limit=5).to_dict('records')
+    market_trends = snapshot['trends']
+    trade_signals = snapshot['signals'].head(5).to_dict('records')
     
     # Dashboard metrics row
     col1, col2, col3, col4 = st.columns(4)
@@ -33,7 +34,7 @@ def show_dashboard_overview(api_base_url, cache_duration):
             best_pair = trading_pairs[0]
             st.metric("Best Grid Trading Pair", 
                      best_pair['symbol'], 
-                     f"{best_pair['estimated_profit_potential']}% potential")
+                     f"{best_pair['liquidity_adjusted_profit']}% potential")
         else:
             st.metric("Best Grid Trading Pair", "N/A", "0%")
     
@@ -99,7 +100,7 @@ def show_dashboard_overview(api_base_url, cache_duration):
             with cols[i]:
                 st.markdown(f"**{pair['symbol']}**")
                 st.markdown(f"Volatility: {pair['avg_hourly_volatility']}%")
-                st.markdown(f"Profit Potential: {pair['estimated_profit_potential']}%")
+                st.markdown(f"Profit Potential: {pair['liquidity_adjusted_profit']}%")
                 st.markdown(f"Volume: {format_large_number(pair['volume_24h'])}")
     else:
         st.markdown("No grid trading pairs available")
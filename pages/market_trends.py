@@ -4,13 +4,14 @@ import plotly.express as px
 import plotly.graph_objects as go
 from pages.utils import *
 from pages.api_functions import *
+from pages.charts import *
 
 def show_market_trends(api_base_url, cache_duration):
     """Display market trends page"""
     st.markdown("<h1>Early Market Trend Detection</h1>", unsafe_allow_html=True)
     
     # Fetch market trends
-    market_trends = fetch_market_trends(api_base_url)
+    market_trends = current_snapshot(api_base_url)['trends']
     
     if market_trends and 'market_metrics' in market_trends:
         market_metrics = market_trends['market_metrics']
@@ -56,6 +57,20 @@ def show_market_trends(api_base_url, cache_duration):
             fig.update_layout(height=300, margin=dict(l=10, r=10, t=50, b=10))
             st.plotly_chart(fig, use_container_width=True)
         
+        # Recorded history, served from the backend's time-series store
+        st.markdown("<h2>Market History</h2>", unsafe_allow_html=True)
+        history_hours = st.select_slider("History", options=[24, 168, 720, 2160], value=168,
+                                         format_func=lambda h: f"{h // 24} days")
+        market_history = fetch_history(api_base_url, "market", hours=history_hours)
+        sector_history = fetch_history(api_base_url, "sectors", hours=history_hours)
+        if market_history.get('time'):
+            show_figure(history_figure(market_history, "Average 24h Change (%)",
+                                       ['avg_top20_change', 'avg_ai_token_change']))
+        if sector_history.get('time'):
+            show_figure(history_figure(sector_history, "Sector Average 24h Change (%)"))
+        if not market_history.get('time') and not sector_history.get('time'):
+            st.info("No market history has been recorded yet.")
+        
         # Key metrics
         st.markdown("<h2>Key Market Metrics</h2>", unsafe_allow_html=True)
         
@@ -0,0 +1,43 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import streamlit as st
+import pyarrow as pa
+import pandas as pd
+
+# Directory the backend publishes Arrow snapshots to (same host only)
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", os.path.join(tempfile.gettempdir(), "eolas_snapshots"))
+
+def snapshot_name(endpoint, params):
+    """File name of a snapshot; must stay in sync with backend/snapshots.py"""
+    canonical = {k: float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else v
+                 for k, v in params.items() if v is not None}
+    digest = hashlib.sha1(json.dumps(canonical, sort_keys=True).encode()).hexdigest()[:16]
+    return f"{endpoint.strip('/').replace('-', '_')}-{digest}.arrow"
+
+@st.cache_resource(max_entries=32)
+def _map_snapshot(path, mtime):
+    """Memory-map a snapshot file; cached per file version so reruns reuse the mapping"""
+    source = pa.memory_map(path, 'r')
+    return pa.ipc.open_file(source).read_all()
+
+def load_snapshot(endpoint, params, max_age):
+    """
+    DataFrame view of a local snapshot no older than `max_age` seconds, or
+    None when there is none (e.g. the backend runs on another host)
+    """
+    path = os.path.join(SNAPSHOT_DIR, snapshot_name(endpoint, params))
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if time.time() - mtime > max_age:
+        return None
+    try:
+        table = _map_snapshot(path, mtime)
+    except Exception:
+        return None
+    # Arrow-backed columns reference the mapped buffers instead of copying them
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
@@ -1,38 +1,25 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import requests
 from datetime import datetime
+from pages.api_functions import current_snapshot, fetch_watchlist, save_watchlist, fetch_watchlist_alerts, fetch_history
+from pages.charts import history_figure, show_figure
 
 def show_trade_signals(api_base_url, cache_duration):
     """Display trade signals page"""
     st.markdown("<h1>Trade Signals</h1>", unsafe_allow_html=True)
     
-    # Fetch trade signals
-    @st.cache_data(ttl=cache_duration)
-    def fetch_signals():
-        try:
-            response = requests.get(f"{api_base_url}/trade_signals")
-            if response.status_code == 200:
-                return response.json()
-            else:
-                st.error(f"Error fetching trade signals: {response.status_code}")
-                return None
-        except Exception as e:
-            st.error(f"Failed to fetch trade signals: {str(e)}")
-            return None
-    
-    signals = fetch_signals()
+    # Current signals come from the dashboard snapshot, shared with the other pages
+    all_signals = current_snapshot(api_base_url)['signals'].to_dict('records')
     
-    if signals and 'signals' in signals:
+    if all_signals:
         # Tabs for different signal types
-        tabs = st.tabs(["All Signals", "Bullish", "Bearish", "Technical Patterns"])
+        tabs = st.tabs(["All Signals", "Buy", "Sell", "Neutral"])
         
         # Filter signals by type
-        all_signals = signals['signals']
-        bullish_signals = [s for s in all_signals if s['signal_type'] == 'bullish']
-        bearish_signals = [s for s in all_signals if s['signal_type'] == 'bearish']
-        pattern_signals = [s for s in all_signals if s['signal_type'] == 'pattern']
+        buy_signals = [s for s in all_signals if s['signal'] == 'buy']
+        sell_signals = [s for s in all_signals if s['signal'] == 'sell']
+        neutral_signals = [s for s in all_signals if s['signal'] == 'neutral']
         
         # Display signals table
         def display_signals_table(signal_list):
@@ -41,17 +28,14 @@ def show_trade_signals(api_base_url, cache_duration):
                 df = pd.DataFrame(signal_list)
                 
                 # Format columns for display
-                if 'timestamp' in df.columns:
-                    df['timestamp'] = pd.to_datetime(df['timestamp']).dt.strftime('%Y-%m-%d %H:%M')
-                
                 if 'confidence' in df.columns:
-                    df['confidence'] = df['confidence'].apply(lambda x: f"{x:.2f}%")
+                    df['confidence'] = df['confidence'].apply(lambda x: f"{x * 100:.1f}%")
                 
                 # Apply color highlighting based on signal type
                 def highlight_signals(row):
-                    if row['signal_type'] == 'bullish':
+                    if row['signal'] == 'buy':
                         return ['background-color: rgba(0, 255, 0, 0.2)'] * len(row)
-                    elif row['signal_type'] == 'bearish':
+                    elif row['signal'] == 'sell':
                         return ['background-color: rgba(255, 0, 0, 0.2)'] * len(row)
                     else:
                         return ['background-color: rgba(255, 255, 0, 0.1)'] * len(row)
@@ -69,9 +53,9 @@ def show_trade_signals(api_base_url, cache_duration):
             
             # Signal distribution chart
             signal_counts = {
-                'Bullish': len(bullish_signals),
-                'Bearish': len(bearish_signals),
-                'Patterns': len(pattern_signals)
+                'Buy': len(buy_signals),
+                'Sell': len(sell_signals),
+                'Neutral': len(neutral_signals)
             }
             
             fig = px.pie(
@@ -79,136 +63,118 @@ def show_trade_signals(api_base_url, cache_duration):
                 names=list(signal_counts.keys()),
                 title="Signal Distribution",
                 color=list(signal_counts.keys()),
-                color_discrete_map={'Bullish': 'green', 'Bearish': 'red', 'Patterns': 'yellow'}
+                color_discrete_map={'Buy': 'green', 'Sell': 'red', 'Neutral': 'yellow'}
             )
             fig.update_layout(height=400)
             st.plotly_chart(fig, use_container_width=True)
         
-        # Bullish Signals tab
+        # Buy Signals tab
         with tabs[1]:
-            st.markdown("<h3>Bullish Signals</h3>", unsafe_allow_html=True)
-            display_signals_table(bullish_signals)
+            st.markdown("<h3>Buy Signals</h3>", unsafe_allow_html=True)
+            display_signals_table(buy_signals)
             
-            # Top bullish assets bar chart if data available
-            if bullish_signals:
-                top_bullish = pd.DataFrame(bullish_signals).sort_values('confidence', ascending=False).head(10)
+            # Top buy signals bar chart if data available
+            if buy_signals:
+                top_buy = pd.DataFrame(buy_signals).sort_values('confidence', ascending=False).head(10)
                 fig = px.bar(
-                    top_bullish,
+                    top_buy,
                     x='symbol',
                     y='confidence',
-                    title="Top Bullish Signals by Confidence",
+                    title="Top Buy Signals by Confidence",
                     color='confidence',
                     color_continuous_scale=['lightgreen', 'darkgreen']
                 )
                 fig.update_layout(height=400)
                 st.plotly_chart(fig, use_container_width=True)
         
-        # Bearish Signals tab
+        # Sell Signals tab
         with tabs[2]:
-            st.markdown("<h3>Bearish Signals</h3>", unsafe_allow_html=True)
-            display_signals_table(bearish_signals)
+            st.markdown("<h3>Sell Signals</h3>", unsafe_allow_html=True)
+            display_signals_table(sell_signals)
             
-            # Top bearish assets bar chart if data available
-            if bearish_signals:
-                top_bearish = pd.DataFrame(bearish_signals).sort_values('confidence', ascending=False).head(10)
+            # Top sell signals bar chart if data available
+            if sell_signals:
+                top_sell = pd.DataFrame(sell_signals).sort_values('confidence', ascending=False).head(10)
                 fig = px.bar(
-                    top_bearish,
+                    top_sell,
                     x='symbol',
                     y='confidence',
-                    title="Top Bearish Signals by Confidence",
+                    title="Top Sell Signals by Confidence",
                     color='confidence',
                     color_continuous_scale=['pink', 'darkred']
                 )
                 fig.update_layout(height=400)
                 st.plotly_chart(fig, use_container_width=True)
         
-        # Technical Patterns tab
+        # Neutral Signals tab
         with tabs[3]:
-            st.markdown("<h3>Technical Patterns</h3>", unsafe_allow_html=True)
-            display_signals_table(pattern_signals)
-            
-            # Pattern distribution if data available
-            if pattern_signals:
-                pattern_df = pd.DataFrame(pattern_signals)
-                pattern_counts = pattern_df['pattern_name'].value_counts().reset_index()
-                pattern_counts.columns = ['pattern', 'count']
-                
-                fig = px.bar(
-                    pattern_counts,
-                    x='pattern',
-                    y='count',
-                    title="Pattern Distribution",
-                    color='count',
-                    color_continuous_scale=['yellow', 'orange']
-                )
-                fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
-        
-        # Signal timeline
-        st.markdown("<h2>Signal Timeline</h2>", unsafe_allow_html=True)
-        if 'signal_timeline' in signals:
-            timeline_df = pd.DataFrame(signals['signal_timeline'])
-            timeline_df['date'] = pd.to_datetime(timeline_df['date'])
-            
-            fig = px.line(
-                timeline_df, 
-                x='date', 
-                y=['bullish_count', 'bearish_count', 'pattern_count'],
-                title='Signal Count Over Time',
-                labels={'value': 'Signal Count', 'variable': 'Signal Type'},
-                color_discrete_map={
-                    'bullish_count': 'green',
-                    'bearish_count': 'red',
-                    'pattern_count': 'yellow'
-                }
-            )
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
-        
-        # Watch list section
-        st.markdown("<h2>Your Watch List</h2>", unsafe_allow_html=True)
-        
-        # Input for adding symbols to watch list
-        watch_list = st.session_state.get('watch_list', [])
+            st.markdown("<h3>Neutral Signals</h3>", unsafe_allow_html=True)
+            display_signals_table(neutral_signals)
         
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            new_symbol = st.text_input("Add symbol to watch list", "")
-        with col2:
-            if st.button("Add Symbol"):
-                if new_symbol and new_symbol not in watch_list:
-                    watch_list.append(new_symbol.upper())
-                    st.session_state.watch_list = watch_list
+    else:
+        st.info("No trade signals available yet. Please try again later.")
+    
+    # Signal timeline, recorded by the backend whether or not current signals are available
+    st.markdown("<h2>Signal Timeline</h2>", unsafe_allow_html=True)
+    signal_history = fetch_history(api_base_url, "signals", hours=168)
+    if signal_history.get('time'):
+        show_figure(history_figure(
+            signal_history, 'Signal Count Over Time', ['buy_count', 'sell_count', 'neutral_count'],
+            {'buy_count': 'green', 'sell_count': 'red', 'neutral_count': 'gray'}
+        ))
+    else:
+        st.info("No signal history has been recorded yet.")
+    
+    # Watch list section
+    show_watch_list(api_base_url, all_signals)
+
+def show_watch_list(api_base_url, all_signals):
+    """Server-side watch list; the backend alerts on signal changes at each candle close"""
+    st.markdown("<h2>Your Watch List</h2>", unsafe_allow_html=True)
+    
+    name = st.text_input("Watch list name", st.session_state.get('watch_list_name', 'default'))
+    st.session_state.watch_list_name = name
+    watchlist = fetch_watchlist(api_base_url, name) or {'symbols': [], 'interval': '1h', 'webhook': None}
+    watch_list = watchlist['symbols']
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        new_symbol = st.text_input("Add symbol to watch list", "")
+    with col2:
+        if st.button("Add Symbol"):
+            if new_symbol and new_symbol.upper() not in watch_list:
+                if save_watchlist(api_base_url, name, watch_list + [new_symbol.upper()], watchlist['interval'], watchlist['webhook']):
                     st.rerun()
+    
+    # Display watch list signals
+    if watch_list:
+        watch_signals = [s for s in all_signals if s['symbol'] in watch_list]
+        st.write(f"Signals for your {len(watch_list)} watched symbols:")
         
-        # Display watch list signals
-        if watch_list:
-            watch_signals = [s for s in all_signals if s['symbol'] in watch_list]
-            st.write(f"Signals for your {len(watch_list)} watched symbols:")
-            
-            if watch_signals:
-                display_signals_table(watch_signals)
-            else:
-                st.info("No signals for your watched symbols at this time.")
-                
-            # Show current watch list with delete buttons
-            st.write("Your watch list:")
-            cols = st.columns(4)
-            for i, symbol in enumerate(watch_list):
-                col_idx = i % 4
-                with cols[col_idx]:
-                    if st.button(f"❌ {symbol}", key=f"remove_{symbol}"):
-                        watch_list.remove(symbol)
-                        st.session_state.watch_list = watch_list
-                        st.rerun()
+        if watch_signals:
+            st.dataframe(pd.DataFrame(watch_signals), use_container_width=True)
         else:
-            st.info("Your watch list is empty. Add symbols above to track specific assets.")
+            st.info("No signals for your watched symbols at this time.")
+        
+        # Alerts raised by the backend when a watched symbol's signal changes
+        alerts = fetch_watchlist_alerts(api_base_url, name)
+        st.write(f"Recent alerts ({watchlist['interval']} candle closes):")
+        if alerts:
+            alerts_df = pd.DataFrame(alerts)
+            alerts_df['time'] = pd.to_datetime(alerts_df['timestamp'], unit='s').dt.strftime('%Y-%m-%d %H:%M')
+            st.dataframe(alerts_df[['time', 'symbol', 'previous_signal', 'signal', 'confidence', 'price']], use_container_width=True)
+        else:
+            st.info("No alerts yet. Alerts are raised when a watched symbol's signal changes.")
             
+        # Show current watch list with delete buttons
+        st.write("Your watch list:")
+        cols = st.columns(4)
+        for i, symbol in enumerate(watch_list):
+            col_idx = i % 4
+            with cols[col_idx]:
+                if st.button(f"❌ {symbol}", key=f"remove_{symbol}"):
+                    remaining = [s for s in watch_list if s != symbol]
+                    if save_watchlist(api_base_url, name, remaining, watchlist['interval'], watchlist['webhook']):
+                        st.rerun()
     else:
-        st.error("Failed to fetch trade signals. Please try again later.")
-        
-        # Demo data option
-        if st.button("Load Demo Data"):
-            # Load demo data here
-            st.warning("Demo data loaded. Note: This is sample data and not real-time signals.")
-            # Implementation for demo data would go here
\ No newline at end of file
+        st.info("Your watch list is empty. Add symbols above to track specific assets.")
@@ -1,9 +1,8 @@
 import streamlit as st
 import pandas as pd
-#import plotly.express as px
-import plotly.graph_objects as go
 from pages.utils import *
 from pages.api_functions import *
+from pages.charts import *
 
 def show_trading_pairs(api_base_url, cache_duration):
     """Display grid trading pairs page"""
@@ -23,9 +22,9 @@ def show_trading_pairs(api_base_url, cache_duration):
                               100_000, 10_000_000, 1_000_000, 100_000,
                               format="$%d")
     
-    # Fetch trading pairs
-    trading_pairs = fetch_trading_pairs(
-        api_base_url,
+    # Filter the shared snapshot locally; moving the sliders costs no requests
+    df = filter_grid_pairs(
+        current_snapshot(api_base_url)['pairs'],
         min_volatility=min_volatility,
         max_volatility=max_volatility,
         min_volume=min_volume,
@@ -35,9 +34,9 @@ def show_trading_pairs(api_base_url, cache_duration):
     # Show results
     st.markdown("<h2 class='sub-header'>Grid Trading Opportunities</h2>", unsafe_allow_html=True)
     
-    if trading_pairs:
+    if not df.empty:
         # Show top pair details
-        top_pair = trading_pairs[0]
+        top_pair = df.iloc[0]
         
         st.markdown(f"### Best Grid Trading Pair: {top_pair['symbol']}")
         
@@ -52,115 +51,38 @@ def show_trading_pairs(api_base_url, cache_duration):
             st.metric("Range Width", f"{top_pair['range_width_percent']:.2f}%")
         
         with col3:
-            st.metric("Profit Potential", f"{top_pair['estimated_profit_potential']:.2f}%")
+            st.metric("Profit Potential", f"{top_pair['liquidity_adjusted_profit']:.2f}%",
+                      f"{top_pair['liquidity_adjusted_profit'] - top_pair['estimated_profit_potential']:.2f}% book costs")
             st.metric("Recommended Grids", f"{top_pair['suggested_grid_levels']}")
         
-        # Create a visualization of the grid levels
-        price_range = [top_pair['price_range_low'], top_pair['price_range_high']]
-        current_price = top_pair['current_price']
-        grid_levels = top_pair['suggested_grid_levels']
-        
-        # Calculate grid lines
-        grid_prices = []
-        price_step = (price_range[1] - price_range[0]) / grid_levels
-        
-        for i in range(grid_levels + 1):
-            grid_prices.append(price_range[0] + i * price_step)
-        
-        # Create the plot
-        fig = go.Figure()
-        
-        # Add price range area
-        fig.add_trace(go.Scatter(
-            x=[0, 1],
-            y=[price_range[0], price_range[0]],
-            fill=None,
-            mode='lines',
-            line_color='rgba(0,0,0,0)',
-            showlegend=False,
-            hoverinfo='skip',
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=[0, 1],
-            y=[price_range[1], price_range[1]],
-            fill='tonexty',
-            mode='lines',
-            line_color='rgba(0,0,0,0)',
-            fillcolor='rgba(173, 216, 230, 0.3)',
-            showlegend=False,
-            hoverinfo='skip',
+        # Visualize the grid levels; the figure is rebuilt only when the top pair changes
+        price_range = [float(top_pair['price_range_low']), float(top_pair['price_range_high'])]
+        show_figure(grid_levels_figure(
+            top_pair['symbol'], price_range[0], price_range[1],
+            float(top_pair['current_price']), int(top_pair['suggested_grid_levels'])
         ))
         
-        # Add grid lines
-        for price in grid_prices:
-            fig.add_shape(
-                type="line",
-                x0=0, y0=price,
-                x1=1, y1=price,
-                line=dict(color="rgba(70, 130, 180, 0.5)", width=1, dash="dash"),
-            )
-            
-            # Add price labels
-            fig.add_annotation(
-                x=1.01,
-                y=price,
-                text=f"${price:.4f}",
-                showarrow=False,
-                xanchor='left',
-            )
-            
-        # Add current price line
-        fig.add_shape(
-            type="line",
-            x0=0, y0=current_price,
-            x1=1, y1=current_price,
-            line=dict(color="black", width=2),
-        )
-        
-        fig.add_annotation(
-            x=0,
-            y=current_price,
-            text=f"Current Price: ${current_price:.4f}",
-            showarrow=False,
-            xanchor='left',
-            bgcolor="rgba(255, 255, 255, 0.8)",
-        )
-        
-        # Update layout
-        fig.update_layout(
-            title=f"Grid Trading Visualization for {top_pair['symbol']}",
-            height=400,
-            showlegend=False,
-            xaxis_visible=False,
-            xaxis_showticklabels=False,
-            margin=dict(l=20, r=100, t=50, b=20),
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        # Price history of the top pair, downsampled by the backend
+        history_days = st.select_slider("Price history", options=[7, 30, 90, 180], value=30,
+                                        format_func=lambda d: f"{d} days")
+        history = fetch_price_history(api_base_url, top_pair['symbol'], interval="1h", candles=history_days * 24)
+        if history.get('points'):
+            show_figure(price_history_figure(history, float(price_range[0]), float(price_range[1])))
         
         # Display the trading pairs table
         st.markdown("### All Grid Trading Pairs")
         
-        df = pd.DataFrame(trading_pairs)
-        
         # Format the data for display
-        display_df = df[['symbol', 'current_price', 'avg_hourly_volatility', 
-                        'range_width_percent', 'estimated_profit_potential', 'suggested_grid_levels']]
-        
-        display_df.columns = ['Symbol', 'Current Price', 'Avg Volatility (%)', 
-                            'Range Width (%)', 'Profit Potential (%)', 'Grid Levels']
-        
-        st.dataframe(
-            display_df.style.format({
-                'Current Price': '${:.4f}',
-                'Avg Volatility (%)': '{:.2f}',
-                'Range Width (%)': '{:.2f}',
-                'Profit Potential (%)': '{:.2f}'
-            }),
-            height=400,
-            use_container_width=True
-        )
+        show_table(table_view(
+            frame_key(df), df,
+            {'symbol': 'Symbol', 'current_price': 'Current Price', 'avg_hourly_volatility': 'Avg Volatility (%)',
+             'range_width_percent': 'Range Width (%)', 'estimated_profit_potential': 'Profit Potential (%)',
+             'liquidity_adjusted_profit': 'Net of Book Costs (%)', 'spread_percent': 'Spread (%)',
+             'slippage_percent': 'Slippage (%)', 'depth_1pct': 'Depth ±1% (USD)', 'suggested_grid_levels': 'Grid Levels'},
+            {'Current Price': '$%.4f', 'Avg Volatility (%)': '%.2f', 'Range Width (%)': '%.2f',
+             'Profit Potential (%)': '%.2f', 'Net of Book Costs (%)': '%.2f', 'Spread (%)': '%.3f',
+             'Slippage (%)': '%.3f', 'Depth ±1% (USD)': '$%.0f'}
+        ))
         
         # Download button for CSV
         csv = df.to_csv(index=False).encode('utf-8')
@@ -170,5 +92,62 @@ def show_trading_pairs(api_base_url, cache_duration):
             file_name=f"grid_trading_pairs_{pd.Timestamp.now().strftime('%Y-%m-%d')}.csv",
             mime="text/csv",
         )
+        
+        # Simulated ranking runs as a background scan, so the page stays responsive
+        if st.checkbox("Rank by simulated grid bot profit"):
+            show_simulated_ranking(api_base_url, {
+                'min_volatility': min_volatility,
+                'max_volatility': max_volatility,
+                'min_volume': min_volume,
+                'limit': 50
+            })
     else:
-        st.error("No grid trading pairs match your criteria. Try adjusting the filters.")
\ No newline at end of file
+        st.error("No grid trading pairs match your criteria. Try adjusting the filters.")
+
+def show_simulated_ranking(api_base_url, params):
+    """Start a simulated scan for the current filters, or keep following the running one"""
+    scan = st.session_state.get('grid_scan')
+    if scan is None or scan['params'] != params:
+        job = submit_scan(api_base_url, simulate=True, **params)
+        if job is None:
+            return
+        scan = {'params': params, 'id': job['id']}
+        st.session_state.grid_scan = scan
+    show_scan_progress(api_base_url, scan['id'])
+
+@st.fragment(run_every=2)
+def show_scan_progress(api_base_url, scan_id):
+    """Poll a background scan; only this fragment reruns while it is in progress"""
+    scan = fetch_scan(api_base_url, scan_id)
+    if scan is None:
+        st.session_state.pop('grid_scan', None)
+        st.warning("The scan has expired. Toggle the option to start a new one.")
+        return
+    
+    st.markdown("### Simulated Grid Bot Ranking")
+    columns = {'symbol': 'Symbol', 'avg_hourly_volatility': 'Avg Volatility (%)',
+               'estimated_profit_potential': 'Profit Potential (%)',
+               'liquidity_adjusted_profit': 'Net of Book Costs (%)', 'suggested_grid_levels': 'Grid Levels'}
+    formats = {'Avg Volatility (%)': '%.2f', 'Profit Potential (%)': '%.2f', 'Net of Book Costs (%)': '%.2f'}
+    
+    if scan['status'] == 'failed':
+        st.error(f"Scan failed: {scan['error']}")
+        return
+    if scan['status'] != 'completed':
+        progress = scan['progress']
+        total = progress['symbols_total']
+        if total:
+            st.progress(progress['symbols_done'] / total,
+                        text=f"Scanned {progress['symbols_done']} of {total} pairs, {progress['candidates']} candidates")
+        else:
+            st.progress(0.0, text="Waiting for the scan to start")
+        st.caption("Ranked by profit net of order book costs until the simulation finishes")
+    else:
+        # A grid fit on the previous day and replayed on the last one
+        columns.update({'simulated_profit_percent': 'Simulated Profit (%)', 'simulated_fills': 'Fills',
+                        'simulated_grid_levels': 'Fitted Levels', 'simulated_grid_spacing': 'Spacing'})
+        formats['Simulated Profit (%)'] = '%.2f'
+    
+    df = pd.DataFrame(scan['result'])
+    if not df.empty:
+        show_table(table_view(frame_key(df), df, columns, formats))
\ No newline at end of file
@@ -0,0 +1,53 @@
+import asyncio
+import numpy as np
+from urllib.parse import urlparse, parse_qs
+import backtester
+import data_fetcher
+import records
+import workers
+
+HOUR_MS = 3_600_000
+LATEST_OPEN = 1_700_000_000_000
+
+def _klines(count, end_open):
+    """`count` hourly candles ending with the one opened at `end_open`"""
+    rng = np.random.default_rng(end_open % 997)
+    candles = np.zeros(count, dtype=records.CANDLE_DTYPE)
+    candles['open_time'] = end_open - HOUR_MS * np.arange(count)[::-1]
+    candles['close'] = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    candles['volume'] = rng.uniform(1e3, 1e4, count)
+    return candles
+
+def test_backtest_pages_past_the_kline_limit(monkeypatch):
+    requests = []
+
+    async def fetch_with_cache(url, *args, transform=None, **kwargs):
+        query = parse_qs(urlparse(url).query)
+        requests.append(query)
+        limit = int(query['limit'][0])
+        assert limit <= data_fetcher.BINANCE_KLINE_PAGE
+        end_open = int(query['endTime'][0]) - HOUR_MS + 1 if 'endTime' in query else LATEST_OPEN
+        return _klines(limit, end_open)
+
+    monkeypatch.setattr(data_fetcher, "fetch_with_cache", fetch_with_cache)
+    results = asyncio.run(backtester.backtest_signals(['BTCUSDT', 'ETHUSDT'], candles=2500))
+    assert [r['candles'] for r in results] == [2500, 2500]
+    assert len(requests) == 6
+
+def test_parallel_simulation_reuses_one_pool():
+    rng = np.random.default_rng(0)
+    symbols = backtester.MIN_SYMBOLS_PER_WORKER * 2
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (symbols, 200)), axis=1))
+    volume = rng.uniform(1e3, 1e4, (symbols, 200))
+    try:
+        first = backtester.simulate_parallel(close, volume, max_workers=2)
+        pool = workers._pool
+        second = backtester.simulate_parallel(close, volume, max_workers=2)
+        assert pool is not None and workers._pool is pool
+    finally:
+        workers.shutdown()
+    assert workers._pool is None
+    expected = backtester.simulate(close, volume)
+    for key in expected:
+        np.testing.assert_allclose(first[key], expected[key])
+        np.testing.assert_allclose(second[key], expected[key])
@@ -0,0 +1,46 @@
+import time
+import asyncio
+import numpy as np
+import pytest
+from urllib.parse import urlparse, parse_qs
+import correlations
+import data_fetcher
+import records
+
+HOUR_MS = 3_600_000
+SYMBOLS = ('BTCUSDT', 'ETHUSDT', 'SOLUSDT')
+
+@pytest.fixture(autouse=True)
+def binance(monkeypatch):
+    """Hourly klines ending with the open candle, served up to Binance's page limit"""
+    correlations._states.clear()
+    now_ms = int(time.time() * 1000)
+    open_now = now_ms - now_ms % HOUR_MS
+    requested = []
+
+    async def fetch_with_cache(url, *args, transform=None, **kwargs):
+        if '/ticker/24hr' in url:
+            return [records.Ticker(s, 1.0, 0.0, 1.0, 1.0, 1.0, 1.0) for s in SYMBOLS]
+        query = parse_qs(urlparse(url).query)
+        limit = min(int(query['limit'][0]), data_fetcher.BINANCE_KLINE_PAGE)
+        requested.append(int(query['limit'][0]))
+        rng = np.random.default_rng(len(query['symbol'][0]))
+        candles = np.zeros(limit, dtype=records.CANDLE_DTYPE)
+        candles['open_time'] = open_now - HOUR_MS * np.arange(limit)[::-1]
+        candles['close_time'] = candles['open_time'] + HOUR_MS - 1
+        candles['close'] = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, limit)))
+        return candles
+
+    monkeypatch.setattr(data_fetcher, "fetch_with_cache", fetch_with_cache)
+    yield requested
+    correlations._states.clear()
+
+def test_state_builds_at_the_maximum_window(binance):
+    state = asyncio.run(correlations.get_correlation_state("1h", correlations.MAX_WINDOW))
+    assert state is not None and state['window'] == correlations.MAX_WINDOW
+    assert state['symbols'] == list(SYMBOLS)
+    assert max(binance) <= data_fetcher.BINANCE_KLINE_PAGE
+
+def test_larger_windows_are_capped(binance):
+    state = asyncio.run(correlations.get_correlation_state("1h", correlations.MAX_WINDOW + 50))
+    assert state is not None and state['window'] == correlations.MAX_WINDOW
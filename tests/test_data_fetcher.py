@@ -0,0 +1,59 @@
+import asyncio
+import data_fetcher
+import upstream
+
+def _full_page(page):
+    return [{'id': f"coin-{page}-{i}"} for i in range(data_fetcher.COINGECKO_PAGE_SIZE)]
+
+def _collect(max_pages):
+    async def run():
+        with upstream.track() as tracker:
+            pages = [page async for page in data_fetcher.iter_coingecko_markets(max_pages=max_pages, concurrency=2)]
+        return pages, tracker['failed']
+    return asyncio.run(run())
+
+def test_failed_page_is_skipped_and_recorded(monkeypatch):
+    async def fetch(page, category=None):
+        if page == 2:
+            return None
+        return _full_page(page) if page < 4 else [{'id': 'last'}]
+
+    monkeypatch.setattr(data_fetcher, "_fetch_coingecko_page", fetch)
+    pages, failed = _collect(max_pages=6)
+    assert [p[0]['id'] for p in pages] == ['coin-1-0', 'coin-3-0', 'last']
+    assert failed
+
+def test_short_page_ends_the_stream(monkeypatch):
+    requested = []
+
+    async def fetch(page, category=None):
+        requested.append(page)
+        return _full_page(page) if page == 1 else []
+
+    monkeypatch.setattr(data_fetcher, "_fetch_coingecko_page", fetch)
+    pages, failed = _collect(max_pages=6)
+    assert len(pages) == 1 and not failed
+    assert max(requested) == 2
+
+def test_sparse_coins_keep_their_defaults(monkeypatch):
+    raw = [
+        {'id': 'deep-ai', 'symbol': 'dai', 'name': 'Deep AI', 'current_price': 2.0,
+         'market_cap': 5e7, 'total_volume': 1e6, 'price_change_percentage_24h': 1.5, 'image': 'x.png'},
+        {'id': 'sparse-ai', 'name': 'Sparse AI', 'market_cap': 3e7, 'symbol': None,
+         'current_price': None, 'price_change_percentage_24h': None},
+        {'symbol': 'noid', 'name': 'No Id AI', 'market_cap': 4e7},
+    ]
+
+    async def fetch_with_cache(url, expiry=None, transform=None, hedge=True):
+        return transform(raw) if 'page=1&' in url or url.endswith('page=1') else transform([])
+
+    async def throttle(url, interval):
+        pass
+
+    monkeypatch.setattr(data_fetcher, "fetch_with_cache", fetch_with_cache)
+    monkeypatch.setattr(data_fetcher, "_throttle", throttle)
+    tokens = asyncio.run(data_fetcher.get_ai_tokens(min_market_cap=1e6))
+    assert [t['id'] for t in tokens] == ['deep-ai', 'sparse-ai']
+    sparse = tokens[1]
+    assert sparse['symbol'] == '' and sparse['current_price'] == 0 and sparse['price_change_24h'] == 0
+    assert sparse['volume_24h'] == 0 and sparse['image'] == ''
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+import downsample
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(0)
+    x = np.arange(500, dtype=float)
+    return x, np.cumsum(rng.normal(0, 1, len(x)))
+
+@pytest.mark.parametrize("method", downsample.DOWNSAMPLE_METHODS)
+@pytest.mark.parametrize("max_points", [1, 2, 3, 4, 5, 50, 499])
+def test_budget_is_honored(series, method, max_points):
+    x, y = series
+    keep = downsample.downsample_indices(x, y, max_points, method)
+    assert 1 <= len(keep) <= max_points
+    assert np.all(np.diff(keep) > 0)
+    assert keep[-1] == len(y) - 1
+    if max_points > 1:
+        assert keep[0] == 0
+
+@pytest.mark.parametrize("method", downsample.DOWNSAMPLE_METHODS)
+def test_large_budget_keeps_everything(series, method):
+    x, y = series
+    np.testing.assert_array_equal(downsample.downsample_indices(x, y, 500, method), np.arange(500))
+    np.testing.assert_array_equal(downsample.downsample_indices(x, y, None, method), np.arange(500))
+
+def test_min_max_keeps_the_extremes(series):
+    x, y = series
+    keep = downsample.min_max(y, 40)
+    assert np.argmin(y) in keep and np.argmax(y) in keep
@@ -0,0 +1,57 @@
+import numpy as np
+import grid_simulator
+import records
+import workers
+
+def _candles(closes):
+    """Candle arrays of pairs x time closes, each candle opening at the previous close"""
+    close = np.atleast_2d(np.asarray(closes, dtype=float))
+    open_ = np.concatenate([close[:, :1], close[:, :-1]], axis=1)
+    return open_, np.maximum(open_, close) * 1.001, np.minimum(open_, close) * 0.999, close
+
+def _oscillating(low, high, candles):
+    return np.where(np.arange(candles) % 2 == 0, low, high).astype(float)
+
+def test_replayed_candles_do_not_shape_the_grid():
+    # Oscillates in 100-110 during the fit window, then in 200-220 afterwards
+    fit = _oscillating(100, 110, grid_simulator.FIT_CANDLES)
+    replay = _oscillating(200, 220, grid_simulator.REPLAY_CANDLES)
+    open_, high, low, close = _candles(np.concatenate([fit, replay]))
+
+    results = grid_simulator.walk_forward(open_, high, low, close, parallel=False)
+    # The grid from the fit window sits below every replayed price, so it never trades
+    assert results['round_trips'][0] == 0
+
+    # Fit in sample on the replayed candles themselves, the same grid would look profitable
+    window = slice(grid_simulator.FIT_CANDLES, None)
+    in_sample = grid_simulator.simulate_grid(open_[:, window], high[:, window], low[:, window], close[:, window],
+                                             low[:, window].min(), high[:, window].max(), results['levels'])
+    assert in_sample['round_trips'][0] > 0
+
+def test_parallel_sweep_matches_serial():
+    rng = np.random.default_rng(0)
+    open_, high, low, close = _candles(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (40, 48)), axis=1)))
+    args = (open_, high, low, close, low.min(axis=1), high.max(axis=1))
+    try:
+        parallel = grid_simulator.optimize_grid(*args)
+    finally:
+        workers.shutdown()
+    serial = grid_simulator.optimize_grid(*args, parallel=False)
+    for key in serial:
+        np.testing.assert_array_equal(parallel[key], serial[key])
+
+def test_short_histories_are_not_simulated():
+    history = grid_simulator.FIT_CANDLES + grid_simulator.REPLAY_CANDLES
+    rng = np.random.default_rng(1)
+    klines = {}
+    for symbol, length in (('LONGUSDT', history + 5), ('SHORTUSDT', history - 1)):
+        candles = np.zeros(length, dtype=records.CANDLE_DTYPE)
+        candles['open'], candles['high'], candles['low'], candles['close'] = \
+            _candles(100 * np.exp(np.cumsum(rng.normal(0, 0.01, length))))
+        klines[symbol] = candles
+    candidates = [{'symbol': 'LONGUSDT'}, {'symbol': 'SHORTUSDT'}, {'symbol': 'MISSINGUSDT'}]
+
+    grid_simulator.simulate_candidates(klines, candidates)
+    assert candidates[0]['simulated_grid_levels'] in grid_simulator.DEFAULT_LEVEL_OPTIONS
+    assert candidates[0]['simulated_profit_percent'] is not None
+    assert candidates[1]['simulated_profit_percent'] is None and candidates[2]['simulated_fills'] is None
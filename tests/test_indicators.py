@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+import indicators
+
+def _series(candles, seed=0, pad=0):
+    """(high, low, close) of one symbol, the first `pad` candles missing"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, candles)))
+    high = close * (1 + rng.uniform(0, 0.02, candles))
+    low = close * (1 - rng.uniform(0, 0.02, candles))
+    for values in (high, low, close):
+        values[:pad] = np.nan
+    return high, low, close
+
+def _pandas_rsi(s, period):
+    delta = s.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    return 100 - 100 / (1 + gain / loss)
+
+def _pandas_atr(h, l, c, period):
+    prev = c.shift()
+    tr = pd.concat([h - l, (h - prev).abs(), (l - prev).abs()], axis=1).max(axis=1)
+    tr[(h - l).isna()] = np.nan
+    return tr.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+
+CASES = {
+    'sma': (lambda h, l, c: indicators.sma(c, 20),
+            lambda h, l, c: c.rolling(20).mean()),
+    'rolling_std': (lambda h, l, c: indicators.rolling_std(c, 20, ddof=1),
+                    lambda h, l, c: c.rolling(20).std()),
+    'ema': (lambda h, l, c: indicators.ema(c, 20),
+            lambda h, l, c: c.ewm(span=20, adjust=False).mean()),
+    'rsi': (lambda h, l, c: indicators.rsi(c, 14),
+            lambda h, l, c: _pandas_rsi(c, 14)),
+    'atr': (lambda h, l, c: indicators.atr(h, l, c, 14),
+            lambda h, l, c: _pandas_atr(h, l, c, 14)),
+    'bollinger_lower': (lambda h, l, c: indicators.bollinger(c, 20)[2],
+                        lambda h, l, c: c.rolling(20).mean() - 2 * c.rolling(20).std(ddof=0)),
+    'hl_volatility': (lambda h, l, c: indicators.hl_volatility(h, l),
+                      lambda h, l, c: (h - l) / l * 100),
+}
+
+@pytest.fixture(params=[False, True], ids=['numpy', 'numba'])
+def numba(request, monkeypatch):
+    if request.param and not indicators.NUMBA_AVAILABLE:
+        pytest.skip("numba is not installed")
+    monkeypatch.setattr(indicators, "NUMBA_AVAILABLE", request.param)
+
+def _check(name, high, low, close):
+    kernel, reference = CASES[name]
+    expected = reference(pd.Series(high), pd.Series(low), pd.Series(close)).to_numpy()
+    np.testing.assert_allclose(kernel(high, low, close), expected, rtol=1e-9, atol=1e-9)
+
+@pytest.mark.parametrize("name", CASES)
+@pytest.mark.parametrize("pad", [0, 37])
+def test_kernel_matches_pandas(name, pad, numba):
+    _check(name, *_series(300, pad=pad))
+
+@pytest.mark.parametrize("name", CASES)
+@pytest.mark.parametrize("candles", [0, 1, 5, 19])
+def test_short_series(name, candles, numba):
+    _check(name, *_series(candles))
+
+@pytest.mark.parametrize("name", CASES)
+def test_all_missing(name, numba):
+    _check(name, *_series(40, pad=40))
+
+@pytest.mark.parametrize("name", CASES)
+def test_symbols_are_independent(name, numba):
+    kernel, _ = CASES[name]
+    symbols = [_series(120, seed=seed, pad=pad) for seed, pad in enumerate((0, 30, 119))]
+    stacked = kernel(*(np.vstack(values) for values in zip(*symbols)))
+    for row, values in enumerate(symbols):
+        np.testing.assert_allclose(stacked[row], kernel(*values), rtol=1e-12, atol=1e-12)
+
+def test_ewm_skips_missing_values_inside_the_history(numba):
+    values = np.array([1.0, 2.0, np.nan, 4.0, np.nan, np.nan, 7.0])
+    expected = pd.Series(values).ewm(alpha=0.3, adjust=False, ignore_na=True).mean()
+    np.testing.assert_allclose(indicators.ewm(values, 0.3), expected, rtol=1e-12)
+
+def test_sma_needs_a_full_window_of_valid_values():
+    values = np.arange(10, dtype=float)
+    values[6] = np.nan
+    np.testing.assert_allclose(indicators.sma(values, 3), pd.Series(values).rolling(3).mean())
@@ -0,0 +1,30 @@
+import os
+import sys
+import subprocess
+import backtester
+import correlations
+import main
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+DEFERRED = ('backtester', 'correlations', 'grid_simulator', 'concurrent.futures.process')
+
+def _query_params(path):
+    return {p['name']: p['schema'] for p in main.app.openapi()['paths'][path]['get']['parameters']}
+
+def test_rarely_used_modules_load_on_first_use():
+    result = subprocess.run(
+        [sys.executable, '-c', f"import sys, main; print(','.join(m for m in {DEFERRED!r} if m in sys.modules))"],
+        cwd=BACKEND, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == ''
+
+def test_backtest_parameters_match_the_backtester():
+    params = _query_params('/backtest')
+    assert params['candles']['minimum'] == backtester.MIN_CANDLES
+    assert params['candles']['maximum'] == backtester.MAX_CANDLES
+    assert params['fee_rate']['default'] == backtester.DEFAULT_FEE_RATE
+
+def test_correlation_parameters_match_the_engine():
+    for path in ('/correlations', '/correlations/clusters'):
+        assert _query_params(path)['window']['default'] == correlations.DEFAULT_WINDOW
+    assert _query_params('/correlations/clusters')['threshold']['default'] == correlations.DEFAULT_CLUSTER_THRESHOLD
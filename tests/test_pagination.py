@@ -0,0 +1,29 @@
+import pytest
+import pagination
+
+ITEMS = [{'rank': i, 'name': f"item{i}"} for i in range(7)]
+
+def test_pages_cover_every_item_once():
+    seen, cursor = [], None
+    while True:
+        offset = pagination.decode_cursor(cursor)
+        body = pagination.paginate(ITEMS[:offset + 3 + 1], offset, 3, key="rows")
+        seen += [row['rank'] for row in body['rows']]
+        cursor = body['next_cursor']
+        if cursor is None:
+            break
+    assert seen == list(range(7))
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_limit_below_one_is_rejected(limit):
+    with pytest.raises(ValueError):
+        pagination.paginate(ITEMS, 0, limit)
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", pagination.encode_cursor(-5)])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        pagination.decode_cursor(cursor)
+
+def test_columns_layout_projects_fields():
+    body = pagination.paginate(ITEMS, 0, 2, fields=['name'], response_format="columns", key="rows")
+    assert body['rows'] == {'name': ['item0', 'item1']} and body['count'] == 2
@@ -0,0 +1,46 @@
+import asyncio
+import pytest
+import candle_store
+import trading_logic
+import upstream
+
+SIGNAL = {'symbol': 'BTCUSDT', 'signal': 'buy', 'confidence': 0.7}
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    trading_logic._mtf_cache.clear()
+    yield
+    trading_logic._mtf_cache.clear()
+
+def _generate(monkeypatch, candles_failed=False, signals=(SIGNAL,)):
+    async def get_candles(symbols, interval, count):
+        if candles_failed:
+            upstream.note_failed()
+        return {}
+
+    monkeypatch.setattr(candle_store, "get_candles", get_candles)
+    monkeypatch.setattr(trading_logic, "_combine_timeframes", lambda *args: list(signals))
+    return asyncio.run(trading_logic.generate_multi_timeframe_signals(['BTCUSDT'], ('1h',)))
+
+def test_complete_result_is_cached(monkeypatch):
+    assert _generate(monkeypatch) == [SIGNAL]
+    assert list(trading_logic._mtf_cache) == [(('BTCUSDT',), ('1h',))]
+
+def test_failed_or_empty_result_is_not_cached(monkeypatch):
+    _generate(monkeypatch, candles_failed=True)
+    _generate(monkeypatch, signals=())
+    assert trading_logic._mtf_cache == {}
+
+def test_expired_entries_are_pruned(monkeypatch):
+    trading_logic._mtf_cache[(('ETHUSDT',), ('1h',))] = {'signals': [SIGNAL], 'expires_ms': 0}
+    _generate(monkeypatch)
+    assert list(trading_logic._mtf_cache) == [(('BTCUSDT',), ('1h',))]
+
+def test_nested_tracker_reports_to_enclosing_tracker(monkeypatch):
+    async def run():
+        with upstream.track() as outer:
+            await trading_logic.generate_multi_timeframe_signals(['BTCUSDT'], ('1h',))
+        return outer['failed']
+
+    _generate(monkeypatch, candles_failed=True)
+    assert asyncio.run(run())
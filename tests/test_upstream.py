@@ -0,0 +1,57 @@
+import json
+import time
+import asyncio
+import pytest
+import upstream
+
+HOST = "api.example.test"
+URL = f"https://{HOST}/ping"
+
+@pytest.fixture(autouse=True)
+def half_open_breaker():
+    upstream._breakers.clear()
+    upstream._breakers[HOST] = {
+        'failures': upstream.BREAKER_THRESHOLD,
+        'opened_at': time.time() - upstream.BREAKER_COOLDOWN - 1,
+        'probing': False
+    }
+    yield upstream._breakers[HOST]
+    upstream._breakers.clear()
+
+def test_cancelled_probe_releases_half_open_circuit(monkeypatch, half_open_breaker):
+    async def hang(session, url):
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(upstream, "_hedged_get_json", hang)
+
+    async def run():
+        probe = asyncio.create_task(upstream.fetch_json(URL))
+        await asyncio.sleep(0.05)
+        assert half_open_breaker['probing']
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+    asyncio.run(run())
+    assert not half_open_breaker['probing']
+    assert upstream._allow(HOST)
+
+def test_undecodable_probe_reopens_circuit(monkeypatch, half_open_breaker):
+    async def bad_body(session, url):
+        raise json.JSONDecodeError("Expecting value", "<html>", 0)
+
+    monkeypatch.setattr(upstream, "_hedged_get_json", bad_body)
+
+    with pytest.raises(upstream.UpstreamError):
+        asyncio.run(upstream.fetch_json(URL))
+    assert not half_open_breaker['probing']
+    assert upstream.circuit_open(URL)
+
+def test_successful_probe_closes_circuit(monkeypatch, half_open_breaker):
+    async def ok(session, url):
+        return {'ok': True}
+
+    monkeypatch.setattr(upstream, "_hedged_get_json", ok)
+
+    assert asyncio.run(upstream.fetch_json(URL)) == {'ok': True}
+    assert upstream.breaker_status()[HOST]['state'] == 'closed'